@@ -0,0 +1,219 @@
+"""
+NFL data pipeline benchmark on synthetic seasons.
+
+Generates 1-5 seasons of synthetic PBP, weekly rosters, schedules, player
+stats and snap counts (benchmarks/synthetic.py), seeds a scratch data
+directory with them the way the ingest tasks would, and times the pipeline
+tasks called directly (no broker, no workers):
+
+    calculate_opportunity_data(year)
+    calculate_all_stat_leaders(year)
+    update_weekly_team_data(team, year)
+    process_team_fpa(team, year)
+    update_team_snap_counts(team, year)
+
+nflreadpy is replaced by a stand-in that serves the synthetic frames, and the
+raw cache is seeded before anything runs, so no run touches the network or
+Redis. Results are written as JSON; pass a previous run as --baseline to
+compare medians (exit status 1 if anything regressed past --tolerance).
+
+    cd app && python -m benchmarks.bench_pipelines --seasons 3 --output pipelines.json
+    cd app && python -m benchmarks.bench_pipelines --seasons 3 --baseline pipelines.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from nickknows.celery_setup import raw_data_cache
+from nickknows.celery_setup.datasets import publish_csv
+from nickknows.celery_setup.opportunity_tasks import calculate_opportunity_data
+from nickknows.celery_setup.snap_count_tasks import update_team_snap_counts
+from nickknows.celery_setup.stat_aggregation_tasks import calculate_all_stat_leaders
+from nickknows.celery_setup.team_analysis_tasks import (
+    process_team_fpa, update_team_schedule, update_weekly_team_data,
+)
+
+from .bench_tables import TEAMS
+from .synthetic import install_fake_nflreadpy, synthetic_season
+
+LAST_SEASON = 2024
+# Season-level and per-team pipelines, in the order the orchestrator runs them
+SEASON_PIPELINES = {
+    'calculate_opportunity_data': calculate_opportunity_data,
+    'calculate_all_stat_leaders': calculate_all_stat_leaders,
+}
+TEAM_PIPELINES = {
+    'update_weekly_team_data': update_weekly_team_data,
+    'process_team_fpa': process_team_fpa,
+    'update_team_snap_counts': update_team_snap_counts,
+}
+
+
+def seed_season(year, seed):
+    """
+    Put one synthetic season where the ingest tasks would: every dataset in
+    the raw cache, plus the rosters, schedule and weekly stats CSVs.
+    Returns {dataset: rows}.
+    """
+    data = synthetic_season(year, seed)
+    for dataset, frame in data.items():
+        # What fetch_raw_dataset does after a download, minus the Redis lock
+        raw_data_cache._store(dataset, year, frame, raw_data_cache.get_raw_dataset_info(dataset, year))
+    data_dir = os.getcwd() + '/nickknows/nfl/data/'
+    publish_csv(data['rosters_weekly'], f'{data_dir}{year}_rosters.csv')
+    publish_csv(data['schedules'], f'{data_dir}{year}_schedule.csv')
+    publish_csv(data['player_stats'], f'{data_dir}{year}_weekly_data.csv')
+    return {dataset: frame.height for dataset, frame in data.items()}
+
+
+def environment():
+    """Interpreter and library versions, recorded with every report"""
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'cpus': os.cpu_count(), 'pandas': pd.__version__, 'polars': pl.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def _run(func, args):
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    if isinstance(result, dict) and result.get('error'):  # calculate_all_stat_leaders reports, not raises
+        raise RuntimeError(f"{func.name}{args}: {result['error']}")
+    return elapsed
+
+
+def _summary(samples):
+    return {
+        'calls': len(samples),
+        'median_s': round(statistics.median(samples), 4),
+        'min_s': round(min(samples), 4),
+        'max_s': round(max(samples), 4),
+        'total_s': round(sum(samples), 3),
+    }
+
+
+def run(seasons, teams, repeat, seed=0, keep=False):
+    years = list(range(LAST_SEASON - seasons + 1, LAST_SEASON + 1))
+    install_fake_nflreadpy(years, seed)
+    samples = {name: [] for name in [*SEASON_PIPELINES, *TEAM_PIPELINES]}
+    rows = {}
+
+    workdir = tempfile.mkdtemp(prefix='nickknows-bench-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # every task resolves its paths from the working directory
+    try:
+        started = time.perf_counter()
+        for year in years:
+            rows[year] = seed_season(year, seed)
+            for team in teams:
+                update_team_schedule(team, year)
+        setup_seconds = time.perf_counter() - started
+
+        # Untimed pass so imports (matplotlib, ...) and first-call costs don't skew the samples
+        for func in SEASON_PIPELINES.values():
+            _run(func, (years[0],))
+        for func in TEAM_PIPELINES.values():
+            _run(func, (teams[0], years[0]))
+
+        for _ in range(repeat):
+            for year in years:
+                for name, func in SEASON_PIPELINES.items():
+                    samples[name].append(_run(func, (year,)))
+                for team in teams:
+                    for name, func in TEAM_PIPELINES.items():
+                        samples[name].append(_run(func, (team, year)))
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f'data kept in {workdir}', file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'benchmark': 'pipelines',
+        'created_at': time.time(),
+        'config': {'seasons': seasons, 'years': years, 'teams': teams, 'repeat': repeat, 'seed': seed},
+        'environment': environment(),
+        'rows': rows,
+        'setup_seconds': round(setup_seconds, 3),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'results': {name: _summary(values) for name, values in samples.items()},
+    }
+
+
+def compare(report, baseline, tolerance):
+    """[(pipeline, baseline median, current median, ratio, regressed)] for pipelines in both"""
+    rows = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        ratio = current['median_s'] / previous['median_s'] if previous['median_s'] else float('inf')
+        rows.append((name, previous['median_s'], current['median_s'], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_report(report, comparison=None):
+    config = report['config']
+    print(f"{config['seasons']} season(s) {config['years'][0]}-{config['years'][-1]}, "
+          f"{len(config['teams'])} team(s), repeat {config['repeat']}; "
+          f"setup {report['setup_seconds']}s, max RSS {report['max_rss_mb']} MB\n")
+    print(f"{'pipeline':<28} {'calls':>5} {'median s':>9} {'min s':>8} {'max s':>8}")
+    for name, result in report['results'].items():
+        print(f"{name:<28} {result['calls']:>5} {result['median_s']:>9} {result['min_s']:>8} {result['max_s']:>8}")
+    if comparison:
+        print(f"\n{'pipeline':<28} {'baseline':>9} {'current':>9} {'ratio':>6}")
+        for name, before, after, ratio, regressed in comparison:
+            flag = '  REGRESSED' if regressed else ''
+            print(f"{name:<28} {before:>9} {after:>9} {ratio:>6.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type=int, default=1, choices=range(1, 6), metavar='1-5',
+                        help='number of seasons, ending with %d' % LAST_SEASON)
+    parser.add_argument('--teams', type=int, default=4, choices=range(1, len(TEAMS) + 1), metavar='N',
+                        help='teams to run the per-team pipelines for (default 4, 32 for the league)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help="don't delete the scratch data directory")
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    parser.add_argument('--baseline', help='report JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown of a median before it counts as a regression (default 0.25)')
+    args = parser.parse_args()
+
+    report = run(args.seasons, TEAMS[:args.teams], args.repeat, args.seed, args.keep)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('years') != report['config']['years'] or \
+                baseline.get('config', {}).get('teams') != report['config']['teams']:
+            print('warning: baseline was run with different seasons or teams', file=sys.stderr)
+        comparison = compare(report, baseline, args.tolerance)
+        report['baseline'] = {'path': args.baseline, 'tolerance': args.tolerance,
+                              'ratios': {name: round(ratio, 3) for name, _, _, ratio, _ in comparison}}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print_report(report, comparison)
+    if comparison and any(regressed for *_, regressed in comparison):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
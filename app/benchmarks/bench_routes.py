@@ -0,0 +1,350 @@
+"""
+Route latency benchmark for the heavy NFL pages.
+
+Seeds a scratch data directory with one synthetic season at real size (the
+raw Parquet cache, the ingest CSVs and everything the pipelines derive from
+them), points nfl_api_client at a local fake NFL-API server, and drives the
+pages through the Flask test client:
+
+    /NFL
+    /NFL/PbP/<game>
+    /NFL/Player/<name>
+    /NFL/Team/<team>
+    /NFL/SnapCounts/<team>/<fullname>
+    /NFL/Opportunities/<team>
+
+Each page is measured twice: warm (steady state: fragment and dataset
+caches populated) and cold (this process's caches cleared before every
+request, so the CSV parse and the render are paid each time). Reports
+p50/p95/p99 latency, peak and retained Python allocations per request
+(tracemalloc, in a separate pass so it doesn't slow the timed one) and the
+time per request in each metrics span.
+
+Pass an earlier run as --baseline to gate on it: the run exits with status 1
+if any page's p95 slowed down by more than --tolerance or a page stopped
+returning 200.
+
+    cd app && python -m benchmarks.bench_routes --repeat 50 --output routes.json
+    cd app && python -m benchmarks.bench_routes --repeat 50 --baseline routes.json
+
+Redis is optional. REDIS_ENV defaults to 127.0.0.1 here: an unresolvable
+host costs seconds per connection attempt. When Redis is reachable, cold
+requests can still be served from its fragment cache.
+"""
+import os
+
+os.environ.setdefault('REDIS_ENV', '127.0.0.1')
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import math  # noqa: E402
+import shutil  # noqa: E402
+import statistics  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+from urllib.parse import quote, urlsplit  # noqa: E402
+
+import polars as pl  # noqa: E402
+
+from nickknows import app, metrics  # noqa: E402
+from nickknows.celery_setup.datasets import clear_read_cache, publish_csv  # noqa: E402
+from nickknows.celery_setup.opportunity_tasks import calculate_opportunity_data  # noqa: E402
+from nickknows.celery_setup.raw_data_cache import scan_raw_dataset  # noqa: E402
+from nickknows.celery_setup.snap_count_tasks import update_team_snap_counts  # noqa: E402
+from nickknows.celery_setup.stat_aggregation_tasks import calculate_all_stat_leaders  # noqa: E402
+from nickknows.celery_setup.team_analysis_tasks import (  # noqa: E402
+    update_team_schedule, update_weekly_team_data,
+)
+from nickknows.nfl import fragment_cache, nfl_api_client  # noqa: E402
+from nickknows.nfl.views import get_available_years, get_team_fullname  # noqa: E402
+
+from .bench_pipelines import environment, seed_season  # noqa: E402
+from .bench_tables import TEAMS  # noqa: E402
+from .synthetic import install_fake_nflreadpy, player_pool, schedule  # noqa: E402
+
+MODES = ('warm', 'cold')
+
+
+# ── Fake NFL-API ───────────────────────────────────────────────────────────────
+
+def team_payload(abbr):
+    """/teams/<abbr> response body"""
+    return {'data': {
+        'team_abbr': abbr, 'team_name': abbr, 'team_conf': 'NFC', 'team_division': 'West',
+        'team_color': '#97233F', 'team_color2': '#000000',
+        'team_logo_squared': f'https://a.espncdn.com/i/teamlogos/nfl/500/{abbr}.png',
+        'team_logo_espn': f'https://a.espncdn.com/i/teamlogos/nfl/500/{abbr}.png',
+    }}
+
+
+class _FakeNflApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'teams':
+            body = team_payload(parts[1])
+        else:
+            body = {'status': 'no_data'}
+        raw = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_api(latency=0.0):
+    """Serve the fake NFL-API on a free local port; returns the server (shutdown() when done)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeNflApiHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.requests = 0
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ── Fixtures ───────────────────────────────────────────────────────────────────
+
+def seed_fixtures(year, team, seed=0):
+    """
+    Everything the benchmarked pages read for (year, team), produced by the
+    real ingest and pipeline code from a synthetic season. Returns {dataset: rows}.
+    """
+    rows = seed_season(year, seed)
+    publish_csv(scan_raw_dataset('pbp', year), os.getcwd() + f'/nickknows/nfl/data/{year}_pbp_data.csv',
+                index=False)  # as update_pbp_data writes it
+    calculate_opportunity_data(year)
+    calculate_all_stat_leaders(year)
+    update_team_schedule(team, year)
+    update_weekly_team_data(team, year)
+    update_team_snap_counts(team, year)
+    return rows
+
+
+def benchmark_routes(year, team, seed=0):
+    """[(URL rule, URL)] for the pages under test, with a real game and player of `team`"""
+    games = schedule(year, seed)
+    game = games.filter((pl.col('home_team') == team) | (pl.col('away_team') == team))['game_id'][0]
+    player = player_pool().filter((pl.col('team') == team) & (pl.col('position') == 'QB'))['full_name'][0]
+    fullname = get_team_fullname(team)
+    return [
+        ('/NFL', '/NFL'),
+        ('/NFL/PbP/<game>', f'/NFL/PbP/{game}'),
+        ('/NFL/Player/<name>', f'/NFL/Player/{quote(player)}'),
+        ('/NFL/Team/<team>', f'/NFL/Team/{team}'),
+        ('/NFL/SnapCounts/<team>/<fullname>', f'/NFL/SnapCounts/{team}/{quote(fullname)}'),
+        ('/NFL/Opportunities/<team>', f'/NFL/Opportunities/{team}'),
+    ]
+
+
+# ── Measurement ────────────────────────────────────────────────────────────────
+
+def clear_process_caches():
+    """What a freshly started web process has: no parsed datasets, no fragments"""
+    fragment_cache.clear_memory()
+    clear_read_cache()
+
+
+def percentile(samples, p):
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _span_totals(rule):
+    return {span: totals for (span, scope), totals in metrics.SPAN_SECONDS.totals().items() if scope == rule}
+
+
+def time_route(client, rule, url, repeat, cold):
+    """Latency percentiles, status codes and per-span time for `repeat` requests"""
+    before = _span_totals(rule)
+    samples, statuses = [], {}
+    for _ in range(repeat):
+        if cold:
+            clear_process_caches()
+        started = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    spans = {}
+    for span, (count, total) in _span_totals(rule).items():
+        count0, total0 = before.get(span, (0, 0.0))
+        if count > count0:
+            spans[span] = round((total - total0) * 1000 / repeat, 3)
+    return {
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(statistics.mean(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'statuses': statuses,
+        'span_ms_per_request': spans,
+    }
+
+
+def measure_allocations(client, url, repeat, cold):
+    """Median peak and retained bytes of Python allocations per request (tracemalloc)"""
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            if cold:
+                clear_process_caches()
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            client.get(url)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            retained.append(current - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_alloc_kb': round(statistics.median(peaks) / 1024, 1),
+        'retained_kb': round(statistics.median(retained) / 1024, 1),
+    }
+
+
+def run(team='KC', repeat=30, alloc_repeat=5, api_latency_ms=0.0, seed=0, keep=False, verbose=False):
+    if not verbose:
+        logging.disable(logging.WARNING)  # the pages log a warning per request for what the fixture lacks
+    year = max(get_available_years())  # the current season: /NFL checks its freshness too
+    real_nflreadpy = sys.modules.get('nflreadpy')
+    install_fake_nflreadpy([year], seed)
+    api = start_fake_api(api_latency_ms / 1000)
+    api_url, nfl_api_client.BASE_URL = nfl_api_client.BASE_URL, api.url
+
+    workdir = tempfile.mkdtemp(prefix='nickknows-bench-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # the views and tasks resolve data paths from the working directory
+    try:
+        started = time.perf_counter()
+        rows = seed_fixtures(year, team, seed)
+        setup_seconds = time.perf_counter() - started
+
+        results = {}
+        with app.test_client() as client:
+            client.get(f'/NFL/set_year/{year}')
+            for rule, url in benchmark_routes(year, team, seed):
+                client.get(url)  # first request pays for imports and template compilation
+                results[rule] = {'url': url}
+                for mode in MODES:
+                    cold = mode == 'cold'
+                    results[rule][mode] = time_route(client, rule, url, repeat, cold)
+                    results[rule][mode].update(measure_allocations(client, url, alloc_repeat, cold))
+    finally:
+        os.chdir(cwd)
+        nfl_api_client.BASE_URL = api_url
+        api.shutdown()
+        clear_process_caches()
+        logging.disable(logging.NOTSET)
+        if real_nflreadpy is not None:
+            sys.modules['nflreadpy'] = real_nflreadpy
+        else:
+            sys.modules.pop('nflreadpy', None)
+        if keep:
+            print(f'data kept in {workdir}', file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'benchmark': 'routes',
+        'created_at': time.time(),
+        'config': {'year': year, 'team': team, 'repeat': repeat, 'alloc_repeat': alloc_repeat,
+                   'api_latency_ms': api_latency_ms, 'seed': seed},
+        'environment': environment(),
+        'rows': rows,
+        'setup_seconds': round(setup_seconds, 3),
+        'api_requests': api.requests,
+        'results': results,
+    }
+
+
+def failures(report):
+    """[(rule, mode, statuses)] for pages that answered anything but 200"""
+    return [(rule, mode, result[mode]['statuses'])
+            for rule, result in report['results'].items() for mode in MODES
+            if set(result[mode]['statuses']) != {'200'}]
+
+
+def compare(report, baseline, tolerance):
+    """[(rule, mode, baseline p95, current p95, ratio, regressed)] for pages in both reports"""
+    rows = []
+    for rule, result in report['results'].items():
+        for mode in MODES:
+            previous = baseline.get('results', {}).get(rule, {}).get(mode)
+            if not previous:
+                continue
+            before, after = previous['p95_ms'], result[mode]['p95_ms']
+            ratio = after / before if before else float('inf')
+            rows.append((rule, mode, before, after, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_report(report, comparison=None):
+    config = report['config']
+    print(f"season {config['year']}, team {config['team']}, {config['repeat']} requests per page "
+          f"({config['alloc_repeat']} under tracemalloc); setup {report['setup_seconds']}s, "
+          f"{report['api_requests']} NFL-API requests\n")
+    print(f"{'page':<36} {'mode':<5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak KB':>9} {'kept KB':>8}  status")
+    for rule, result in report['results'].items():
+        for mode in MODES:
+            r = result[mode]
+            statuses = ','.join(f'{code}x{n}' for code, n in sorted(r['statuses'].items()))
+            print(f"{rule:<36} {mode:<5} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+                  f"{r['peak_alloc_kb']:>9} {r['retained_kb']:>8}  {statuses}")
+    if comparison:
+        print(f"\n{'page':<36} {'mode':<5} {'base p95':>9} {'p95':>9} {'ratio':>6}")
+        for rule, mode, before, after, ratio, regressed in comparison:
+            flag = '  REGRESSED' if regressed else ''
+            print(f"{rule:<36} {mode:<5} {before:>9} {after:>9} {ratio:>6.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--team', default='KC', choices=TEAMS)
+    parser.add_argument('--repeat', type=int, default=30, help='timed requests per page and mode')
+    parser.add_argument('--alloc-repeat', type=int, default=5, help='requests per page and mode under tracemalloc')
+    parser.add_argument('--api-latency-ms', type=float, default=0.0, help='added latency of the fake NFL-API')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help="don't delete the scratch data directory")
+    parser.add_argument('--verbose', action='store_true', help='show warnings logged by the pages')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    parser.add_argument('--baseline', help='report JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown of a p95 before it counts as a regression (default 0.25)')
+    args = parser.parse_args()
+
+    report = run(args.team, args.repeat, args.alloc_repeat, args.api_latency_ms, args.seed, args.keep, args.verbose)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare(report, json.load(f), args.tolerance)
+        report['baseline'] = {'path': args.baseline, 'tolerance': args.tolerance,
+                              'ratios': {f'{rule} {mode}': round(ratio, 3)
+                                         for rule, mode, _, _, ratio, _ in comparison}}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print_report(report, comparison)
+
+    failed = failures(report)
+    for rule, mode, statuses in failed:
+        print(f'{rule} ({mode}) answered {statuses}', file=sys.stderr)
+    if failed or (comparison and any(regressed for *_, regressed in comparison)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
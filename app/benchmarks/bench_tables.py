@@ -0,0 +1,119 @@
+"""
+Table rendering benchmark: pandas Styler vs nfl/html_tables.render_table.
+
+Builds a synthetic opportunity-trends frame and renders the same leader
+board tables the opportunity pages do, once through the old
+df.style.hide(axis="index").to_html() path and once through render_table.
+Reports per-table and per-page (ten tables) timings as JSON.
+
+    cd app && python -m benchmarks.bench_tables --players 600 --repeat 50
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from nickknows.nfl.html_tables import render_table
+
+METRICS = ['targets', 'carries', 'touches', 'red_zone_targets', 'red_zone_carries',
+           'goal_line_touches', 'target_share', 'deep_targets']
+POSITIONS = ['QB', 'RB', 'WR', 'TE']
+TEAMS = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB',
+         'HOU', 'IND', 'JAX', 'KC', 'LA', 'LAC', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+         'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS']
+
+
+def synthetic_trends(players, seed=0):
+    """Frame shaped like <year>_opportunity_trends.csv"""
+    rng = np.random.default_rng(seed)
+    data = {
+        'player_id': [f'00-{i:07d}' for i in range(players)],
+        'player_name': [f'P.Player{i}' for i in range(players)],
+        'position': rng.choice(POSITIONS, players),
+        'team': rng.choice(TEAMS, players),
+        'weeks_played': rng.integers(1, 18, players),
+    }
+    for metric in METRICS:
+        avg = rng.gamma(2.0, 2.0, players)
+        data[f'{metric}_avg'] = avg
+        data[f'{metric}_latest'] = rng.poisson(avg).astype(float)
+        data[f'{metric}_max'] = data[f'{metric}_latest'] + rng.poisson(2, players)
+        data[f'{metric}_trend'] = rng.normal(0, 30, players)
+    return pd.DataFrame(data)
+
+
+def _board(trends, metric, top_n):
+    """Display columns and leaders, as get_leaderboard_view selects them"""
+    leaders = trends[(trends['weeks_played'] >= 2) & (trends[f'{metric}_avg'] > 0)]
+    leaders = leaders.nlargest(top_n, f'{metric}_avg')
+    columns = ['player_name', 'position', 'team', 'weeks_played', f'{metric}_avg',
+               f'{metric}_latest', f'{metric}_max', f'{metric}_trend']
+    rename = {'player_name': 'Player', 'position': 'Pos', 'team': 'Team', 'weeks_played': 'Weeks',
+              f'{metric}_avg': 'Avg', f'{metric}_latest': 'Latest', f'{metric}_max': 'Max',
+              f'{metric}_trend': 'Trend %'}
+    return leaders, columns, rename
+
+
+def render_styler(leaders, columns, rename):
+    display = leaders[columns].copy()
+    numeric = display.select_dtypes(include=[np.number]).columns
+    display[numeric] = display[numeric].round(2)
+    display = display.rename(columns=rename)
+    return display.style.hide(axis="index").to_html(classes="table table-sm", escape=False)
+
+
+def render_fast(leaders, columns, rename):
+    return render_table(leaders, columns=columns, rename=rename, precision=2,
+                        classes="table table-sm", escape=False)
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(sorted(samples)[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    }
+
+
+def run(players, top_n, repeat):
+    trends = synthetic_trends(players)
+    boards = [_board(trends, metric, top_n) for metric in METRICS[:7]]
+    boards += [_board(trends, metric, 10) for metric in METRICS[:3]]  # the trending tables
+
+    def page(renderer):
+        return [renderer(*board) for board in boards]
+
+    page(render_styler), page(render_fast)  # warm up imports and template caches
+    report = {
+        'players': players,
+        'rows_per_table': top_n,
+        'tables_per_page': len(boards),
+        'styler': {'table': _time(lambda: render_styler(*boards[0]), repeat),
+                   'page': _time(lambda: page(render_styler), repeat)},
+        'render_table': {'table': _time(lambda: render_fast(*boards[0]), repeat),
+                         'page': _time(lambda: page(render_fast), repeat)},
+    }
+    report['page_speedup'] = round(report['styler']['page']['median_ms'] /
+                                   report['render_table']['page']['median_ms'], 1)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=600)
+    parser.add_argument('--top-n', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+    run(args.players, args.top_n, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
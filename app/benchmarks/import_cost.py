@@ -0,0 +1,95 @@
+"""
+Startup import-cost report.
+
+Imports the app (or any module) in a fresh interpreter with -X importtime
+and reports the slowest modules by cumulative import time, plus the total
+per top-level package. Run it before and after touching imports to see what
+a pod restart or worker recycle pays:
+
+    cd app && python -m benchmarks.import_cost
+    cd app && python -m benchmarks.import_cost --module nickknows.celery_setup --top 30
+    cd app && python -m benchmarks.import_cost --json > import_cost.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Imports the web path should not pay for; reported if they show up
+HEAVY_MODULES = ['pandas', 'numpy', 'polars', 'matplotlib', 'seaborn', 'scipy', 'IPython', 'nflreadpy']
+
+
+def measure(module):
+    """[(name, self_us, cumulative_us, depth)] in import order, and wall seconds"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=app_dir, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise SystemExit(f'import {module} failed:\n{proc.stderr[-2000:]}')
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows, wall
+
+
+def build_report(module, top):
+    rows, wall = measure(module)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split('.')[0]] += self_us
+    imported = {name for name, _, _, _ in rows}
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        'module': module,
+        'wall_seconds': round(wall, 3),
+        'import_seconds': round(sum(self_us for _, self_us, _, _ in rows) / 1e6, 3),
+        'modules_imported': len(rows),
+        'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in imported],
+        'slowest': [{'module': name, 'cumulative_ms': round(cum / 1000, 1), 'self_ms': round(own / 1000, 1)}
+                    for name, own, cum, _ in slowest],
+        'by_package_ms': {name: round(us / 1000, 1) for name, us in
+                          sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]},
+    }
+
+
+def print_report(report):
+    print(f"import {report['module']}: {report['import_seconds']}s in imports, "
+          f"{report['wall_seconds']}s wall, {report['modules_imported']} modules")
+    heavy = ', '.join(report['heavy_modules_loaded']) or 'none'
+    print(f"heavy modules loaded: {heavy}\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in report['slowest']:
+        print(f"{row['cumulative_ms']:>14} {row['self_ms']:>9}  {row['module']}")
+    print(f"\n{'ms':>14}  package (self time)")
+    for name, ms in report['by_package_ms'].items():
+        print(f"{ms:>14}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='nickknows', help='module to import (default: the app)')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    report = build_report(args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
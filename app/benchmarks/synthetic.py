@@ -0,0 +1,305 @@
+"""
+Synthetic nflreadpy seasons for the benchmarks.
+
+Builds polars frames shaped like what nflreadpy's loaders return (the
+columns the pipelines read, plus enough filler to make the files a
+realistic width) at roughly real-season size: 32 teams, 17 weeks, about
+170 plays a game. Everything is derived from a seed, so the same
+(season, seed) always gives the same data.
+
+    data = synthetic_season(2024)          # {raw dataset name: frame}
+    install_fake_nflreadpy([2023, 2024])   # import nflreadpy -> these frames
+"""
+import sys
+import types
+from functools import lru_cache
+
+import numpy as np
+import polars as pl
+
+from .bench_tables import TEAMS
+
+WEEKS = 17
+PLAYS_PER_GAME = 170
+
+# Roster spots per team, in depth-chart order within each position
+ROSTER_SLOTS = [('QB', 3), ('RB', 4), ('WR', 6), ('TE', 3), ('OL', 9), ('DL', 9),
+                ('LB', 7), ('CB', 6), ('S', 4), ('K', 1), ('P', 1), ('LS', 1)]
+OFFENSE = {'QB', 'RB', 'WR', 'TE', 'OL'}
+DEFENSE = {'DL', 'LB', 'CB', 'S'}
+
+# Numeric PBP columns the pipelines never read; the real file has ~370
+PBP_FILLER = ['epa', 'wpa', 'wp', 'def_wp', 'home_wp', 'away_wp', 'vegas_wp', 'cpoe', 'xpass',
+              'pass_oe', 'qb_epa', 'air_epa', 'yac_epa', 'comp_air_epa', 'comp_yac_epa',
+              'total_home_epa', 'total_away_epa', 'ydstogo', 'yards_gained', 'yards_after_catch',
+              'score_differential', 'posteam_score', 'defteam_score', 'half_seconds_remaining',
+              'game_seconds_remaining', 'quarter_seconds_remaining']
+STATS_FILLER = ['passing_air_yards', 'passing_yards_after_catch', 'passing_first_downs', 'passing_epa',
+                'pacr', 'rushing_fumbles', 'rushing_first_downs', 'rushing_epa', 'receiving_air_yards',
+                'receiving_yards_after_catch', 'receiving_first_downs', 'receiving_epa', 'racr',
+                'target_share', 'air_yards_share', 'wopr', 'special_teams_tds', 'sack_yards', 'sack_fumbles',
+                'sack_fumbles_lost', 'passing_2pt_conversions', 'rushing_fumbles_lost', 'rushing_2pt_conversions',
+                'receiving_fumbles', 'receiving_fumbles_lost', 'receiving_2pt_conversions', 'dakota']
+
+PLAY_TYPES = ['pass', 'run', 'punt', 'field_goal', 'kickoff', 'extra_point', 'no_play', 'qb_kneel']
+PLAY_WEIGHTS = [0.5, 0.36, 0.04, 0.02, 0.03, 0.02, 0.02, 0.01]
+
+
+def _rng(season, seed, salt):
+    return np.random.default_rng([seed, season, salt])
+
+
+@lru_cache(maxsize=None)
+def player_pool():
+    """One row per rostered player: team, position, depth, gsis id and name"""
+    rows = []
+    for t, team in enumerate(TEAMS):
+        for position, count in ROSTER_SLOTS:
+            for depth in range(count):
+                n = len(rows)
+                rows.append({
+                    'team': team, 'position': position, 'depth': depth,
+                    'gsis_id': f'00-{n + 30000:07d}',
+                    'first_name': f'{position}{depth + 1}', 'last_name': f'{team}{t}',
+                    'pfr_id': f'{team}{position}{depth:02d}',
+                })
+    pool = pl.DataFrame(rows)
+    return pool.with_columns(
+        (pl.col('first_name') + ' ' + pl.col('last_name')).alias('full_name'),
+        (pl.col('first_name').str.slice(0, 1) + '.' + pl.col('last_name')).alias('short_name'),
+    )
+
+
+def schedule(season, seed=0):
+    """nflreadpy load_schedules(): every team plays once a week"""
+    rng = _rng(season, seed, 1)
+    rows = []
+    for week in range(1, WEEKS + 1):
+        order = rng.permutation(len(TEAMS))
+        for i in range(0, len(order), 2):
+            away, home = TEAMS[order[i]], TEAMS[order[i + 1]]
+            away_score, home_score = (int(x) for x in rng.poisson(22, 2))
+            rows.append({
+                'game_id': f'{season}_{week:02d}_{away}_{home}', 'season': season, 'game_type': 'REG',
+                'week': week, 'gameday': f'{season}-09-{week:02d}', 'weekday': 'Sunday',
+                'gametime': '13:00', 'away_team': away, 'away_score': away_score,
+                'home_team': home, 'home_score': home_score, 'location': 'Home',
+                'result': home_score - away_score, 'total': home_score + away_score,
+                'overtime': 0, 'spread_line': round(float(rng.normal(0, 5)), 1),
+                'total_line': round(float(rng.normal(45, 4)), 1), 'roof': 'outdoors',
+                'surface': 'grass', 'stadium': f'{home} Stadium',
+            })
+    return pl.DataFrame(rows)
+
+
+def _games_by_team(games):
+    """(game_id, week, team, opponent) twice per game"""
+    home = games.select('game_id', 'week', pl.col('home_team').alias('team'),
+                        pl.col('away_team').alias('opponent'))
+    away = games.select('game_id', 'week', pl.col('away_team').alias('team'),
+                        pl.col('home_team').alias('opponent'))
+    return pl.concat([home, away])
+
+
+def _pick(rng, ids, weights, size):
+    weights = np.asarray(weights, dtype=float)
+    return ids[rng.choice(len(ids), size=size, p=weights / weights.sum())]
+
+
+def play_by_play(season, seed=0):
+    """nflreadpy load_pbp(): PLAYS_PER_GAME plays per game, alternating possession"""
+    rng = _rng(season, seed, 2)
+    games = schedule(season, seed)
+    pool = player_pool()
+    n_games = games.height
+    n = n_games * PLAYS_PER_GAME
+
+    game_index = np.repeat(np.arange(n_games), PLAYS_PER_GAME)
+    home_has_ball = (np.arange(n) // 6) % 2 == 0
+    posteam = np.where(home_has_ball, games['home_team'].to_numpy()[game_index],
+                       games['away_team'].to_numpy()[game_index])
+    defteam = np.where(home_has_ball, games['away_team'].to_numpy()[game_index],
+                       games['home_team'].to_numpy()[game_index])
+    play_type = rng.choice(PLAY_TYPES, size=n, p=PLAY_WEIGHTS)
+    is_pass, is_run = play_type == 'pass', play_type == 'run'
+
+    receiver = np.full(n, None, dtype=object)
+    rusher = np.full(n, None, dtype=object)
+    for team in TEAMS:
+        roster = pool.filter(pl.col('team') == team)
+        targets = roster.filter(pl.col('position').is_in(['WR', 'TE', 'RB']))
+        carriers = roster.filter(pl.col('position').is_in(['RB', 'QB']))
+        on_team = posteam == team
+        # Depth charts: starters get most of the work
+        pass_rows = np.flatnonzero(on_team & is_pass & (rng.random(n) < 0.85))
+        receiver[pass_rows] = _pick(rng, targets['gsis_id'].to_numpy(),
+                                    0.6 ** targets['depth'].to_numpy(), len(pass_rows))
+        run_rows = np.flatnonzero(on_team & is_run)
+        rusher[run_rows] = _pick(rng, carriers['gsis_id'].to_numpy(),
+                                 np.where(carriers['position'].to_numpy() == 'QB', 0.15, 0.5 ** carriers['depth'].to_numpy()),
+                                 len(run_rows))
+
+    down = rng.integers(1, 5, n).astype(float)
+    down[np.isin(play_type, ['kickoff', 'extra_point'])] = np.nan
+    air_yards = np.where(is_pass, rng.normal(8, 9, n).clip(-5, 60).round(), np.nan)
+
+    play_number = np.arange(n) % PLAYS_PER_GAME
+    data = {
+        'play_id': play_number * 25 + 1,
+        'game_id': games['game_id'].to_numpy()[game_index],
+        'old_game_id': np.char.add(str(season), (game_index + 10000).astype(str)),
+        'home_team': games['home_team'].to_numpy()[game_index],
+        'away_team': games['away_team'].to_numpy()[game_index],
+        'season_type': np.full(n, 'REG'),
+        'week': games['week'].to_numpy()[game_index],
+        'posteam': posteam,
+        'posteam_type': np.where(home_has_ball, 'home', 'away'),
+        'defteam': defteam,
+        'side_of_field': np.where(rng.random(n) < 0.5, posteam, defteam),
+        'game_date': games['gameday'].to_numpy()[game_index],
+        'qtr': play_number * 4 // PLAYS_PER_GAME + 1,
+        'game_half': np.where(play_number < PLAYS_PER_GAME // 2, 'Half1', 'Half2'),
+        'quarter_end': (play_number + 1) % (PLAYS_PER_GAME // 4) == 0,
+        'drive': play_number // 6 + 1,
+        'sp': np.zeros(n, dtype=int),
+        'goal_to_go': np.zeros(n, dtype=int),
+        'ydsnet': rng.integers(-10, 80, n),
+        'qb_kneel': (play_type == 'qb_kneel').astype(int),
+        'qb_spike': np.zeros(n, dtype=int),
+        'qb_scramble': np.zeros(n, dtype=int),
+        'season': np.full(n, season),
+        'play_type': play_type,
+        'down': down,
+        'yardline_100': rng.integers(1, 100, n),
+        'air_yards': air_yards,
+        'receiver_player_id': pl.Series(receiver.tolist(), dtype=pl.String),
+        'rusher_player_id': pl.Series(rusher.tolist(), dtype=pl.String),
+        'desc': np.char.add(np.char.add(posteam.astype(str), ' '), play_type.astype(str)),
+    }
+    for column in PBP_FILLER:
+        data[column] = rng.normal(0, 1, n)
+    return pl.DataFrame(data)
+
+
+def weekly_rosters(season, seed=0):
+    """nflreadpy load_rosters_weekly(): every rostered player, every week"""
+    pool = player_pool()
+    weeks = pl.DataFrame({'week': list(range(1, WEEKS + 1))})
+    rosters = pool.join(weeks, how='cross')
+    return rosters.select(
+        pl.lit(season).alias('season'), 'team', 'position',
+        pl.col('position').alias('depth_chart_position'),
+        (pl.col('depth') + 1).alias('jersey_number'), pl.lit('ACT').alias('status'),
+        'full_name', 'first_name', 'last_name', pl.lit('1998-01-01').alias('birth_date'),
+        pl.lit(74).alias('height'), pl.lit(220).alias('weight'), pl.lit('State').alias('college'),
+        'gsis_id', pl.col('pfr_id').alias('pfr_id'), 'week', pl.lit('REG').alias('game_type'),
+        (pl.col('depth') + 2).alias('years_exp'),
+    )
+
+
+def player_stats(season, seed=0):
+    """nflreadpy load_player_stats(): skill players with a line each week"""
+    rng = _rng(season, seed, 3)
+    pool = player_pool().filter(
+        (pl.col('position') == 'QB') & (pl.col('depth') == 0)
+        | (pl.col('position') == 'RB') & (pl.col('depth') < 2)
+        | (pl.col('position') == 'WR') & (pl.col('depth') < 4)
+        | (pl.col('position') == 'TE') & (pl.col('depth') < 2)
+    )
+    lines = _games_by_team(schedule(season, seed)).join(pool, on='team')
+    n = lines.height
+    position = lines['position'].to_numpy()
+    qb, rb, catcher = position == 'QB', position == 'RB', np.isin(position, ['WR', 'TE', 'RB'])
+
+    passing_yards = np.where(qb, rng.normal(240, 60, n).clip(0), 0).round()
+    passing_tds = np.where(qb, rng.poisson(1.6, n), 0)
+    rushing_yards = np.where(rb, rng.gamma(2, 25, n), np.where(qb, rng.gamma(1, 12, n), 0)).round()
+    rushing_tds = np.where(rb, rng.poisson(0.4, n), 0)
+    receptions = np.where(catcher, rng.poisson(3.5, n), 0)
+    receiving_yards = (receptions * rng.gamma(3, 4, n)).round()
+    receiving_tds = np.where(catcher, rng.poisson(0.3, n), 0)
+    interceptions = np.where(qb, rng.poisson(0.8, n), 0)
+    fantasy_points = (passing_yards / 25 + passing_tds * 4 - interceptions * 2 + rushing_yards / 10
+                      + rushing_tds * 6 + receiving_yards / 10 + receiving_tds * 6)
+
+    data = {
+        'player_id': lines['gsis_id'], 'player_name': lines['short_name'],
+        'player_display_name': lines['full_name'], 'position': lines['position'],
+        'position_group': lines['position'], 'headshot_url': 'https://static.www.nfl.com/image/upload/' + lines['gsis_id'],
+        'season': np.full(n, season), 'week': lines['week'], 'season_type': np.full(n, 'REG'),
+        'team': lines['team'], 'opponent_team': lines['opponent'],
+        'completions': np.where(qb, rng.poisson(22, n), 0), 'attempts': np.where(qb, rng.poisson(34, n), 0),
+        'passing_yards': passing_yards, 'passing_tds': passing_tds, 'interceptions': interceptions,
+        'sacks': np.where(qb, rng.poisson(2, n), 0), 'carries': np.where(rb, rng.poisson(10, n), 0),
+        'rushing_yards': rushing_yards, 'rushing_tds': rushing_tds,
+        'receptions': receptions, 'targets': receptions + rng.poisson(1.5, n) * catcher,
+        'receiving_yards': receiving_yards, 'receiving_tds': receiving_tds,
+        'fantasy_points': fantasy_points.round(2), 'fantasy_points_ppr': (fantasy_points + receptions).round(2),
+    }
+    for column in STATS_FILLER:
+        data[column] = rng.normal(0, 1, n)
+    return pl.DataFrame(data)
+
+
+def snap_counts(season, seed=0):
+    """nflreadpy load_snap_counts(): everyone who took a snap, per game"""
+    rng = _rng(season, seed, 4)
+    lines = _games_by_team(schedule(season, seed)).join(player_pool(), on='team')
+    n = lines.height
+    position = lines['position'].to_numpy()
+    depth = lines['depth'].to_numpy()
+    starter_share = np.clip(1.0 - depth * 0.3 + rng.normal(0, 0.05, n), 0, 1)
+    offense_pct = np.where(np.isin(position, list(OFFENSE)), starter_share, 0).round(2)
+    defense_pct = np.where(np.isin(position, list(DEFENSE)), starter_share, 0).round(2)
+    st_pct = np.clip(rng.normal(0.3, 0.15, n), 0, 1).round(2)
+    team_plays = rng.integers(55, 75, n)
+    return pl.DataFrame({
+        'game_id': lines['game_id'], 'pfr_game_id': lines['game_id'], 'season': np.full(n, season),
+        'game_type': np.full(n, 'REG'), 'week': lines['week'], 'player': lines['full_name'],
+        'pfr_player_id': lines['pfr_id'], 'position': position, 'team': lines['team'],
+        'opponent': lines['opponent'],
+        'offense_snaps': (offense_pct * team_plays).round(), 'offense_pct': offense_pct,
+        'defense_snaps': (defense_pct * team_plays).round(), 'defense_pct': defense_pct,
+        'st_snaps': (st_pct * 25).round(), 'st_pct': st_pct,
+    })
+
+
+# raw_data_cache dataset name -> builder
+BUILDERS = {
+    'pbp': play_by_play,
+    'rosters_weekly': weekly_rosters,
+    'schedules': schedule,
+    'player_stats': player_stats,
+    'snap_counts': snap_counts,
+}
+
+
+def synthetic_season(season, seed=0):
+    """{raw dataset name: polars frame} for one season"""
+    return {name: build(season, seed) for name, build in BUILDERS.items()}
+
+
+def install_fake_nflreadpy(seasons, seed=0):
+    """
+    Put a stand-in nflreadpy in sys.modules whose load_* functions return
+    the synthetic seasons, so nothing in the benchmark can reach the network.
+    """
+    module = types.ModuleType('nflreadpy')
+    module.__doc__ = 'Synthetic stand-in installed by benchmarks.synthetic'
+
+    def loader(build):
+        def load(seasons=None):
+            frames = [build(season, seed) for season in (seasons or [max(seasons_available)])]
+            return pl.concat(frames)
+        return load
+
+    seasons_available = list(seasons)
+    module.load_pbp = loader(play_by_play)
+    module.load_rosters_weekly = loader(weekly_rosters)
+    module.load_schedules = loader(schedule)
+    module.load_player_stats = loader(player_stats)
+    module.load_snap_counts = loader(snap_counts)
+    module.load_players = lambda: player_pool().select(
+        'gsis_id', pl.col('full_name').alias('display_name'), 'position', pl.col('team').alias('latest_team'))
+    sys.modules['nflreadpy'] = module
+    return module
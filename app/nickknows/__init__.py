@@ -18,6 +18,9 @@ app.config["NFL_API_URL"] = os.environ.get(
 celery = Celery(app.name, broker=app.config["CELERY_BROKER_URL"])
 celery.conf.update(app.config)
 
+from nickknows import metrics
+metrics.init_app(app)
+
 from nickknows.main import views
 from nickknows.nfl import views
 from nickknows.fahrtbags import views
@@ -9,9 +9,14 @@ Task Organization:
 - opportunity_tasks: Opportunity tracking and trends
 - snap_count_tasks: Snap count processing
 - task_orchestrator: High-level workflows and coordination
+- job_status: Status and stage progress of jobs started from the web app
+- routing: Queues each task is sent to (see routing.py for the worker pools)
 
 """
 
+# Queues and priorities first, so every task sent from here on is routed
+from . import routing
+
 # Import all task modules to register them with Celery
 from . import core_data_tasks
 from . import stat_aggregation_tasks
@@ -19,6 +24,7 @@ from . import team_analysis_tasks
 from . import opportunity_tasks
 from . import snap_count_tasks
 from . import task_orchestrator
+from . import job_status
 
 # Export commonly used tasks for easy access
 from .core_data_tasks import (
@@ -71,7 +77,14 @@ from .task_orchestrator import (
     update_opportunities_only,
     update_snap_counts_only,
     system_health_check,
-    update_multiple_years
+    update_multiple_years,
+    get_backfill_status
+)
+
+from .job_status import (
+    job_stage_started,
+    job_complete,
+    job_failed
 )
 
 __all__ = [
@@ -120,7 +133,13 @@ __all__ = [
     'update_opportunities_only',
     'update_snap_counts_only',
     'system_health_check',
-    'update_multiple_years'
+    'update_multiple_years',
+    'get_backfill_status',
+    
+    # Jobs
+    'job_stage_started',
+    'job_complete',
+    'job_failed'
 ]
 
 # Task name mapping for easy reference
@@ -170,7 +189,13 @@ TASK_REGISTRY = {
     'orchestrator.opportunities': 'nfl.orchestrator.update_opportunities_only',
     'orchestrator.snaps': 'nfl.orchestrator.update_snap_counts_only',
     'orchestrator.health': 'nfl.orchestrator.health_check',
-    'orchestrator.multi_year': 'nfl.orchestrator.multi_year_update'
+    'orchestrator.multi_year': 'nfl.orchestrator.multi_year_update',
+    'orchestrator.backfill_status': 'nfl.orchestrator.backfill_status',
+    
+    # Job status markers
+    'jobs.stage_started': 'nfl.jobs.stage_started',
+    'jobs.complete': 'nfl.jobs.complete',
+    'jobs.failed': 'nfl.jobs.failed'
 }
 
 
@@ -4,16 +4,25 @@ Handles base data imports from nflreadpy
 """
 from nickknows import celery
 import os
-import nflreadpy as nfl
-import pandas as pd
 from celery.utils.log import get_task_logger
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.error import HTTPError
+import time
+
+from .datasets import publish_csv
+from .raw_data_cache import AVAILABILITY_MAX_AGE, fetch_raw_dataset, scan_raw_dataset
 
 logger = get_task_logger(__name__)
 
 SITE_DOMAIN = "https://www.nickknows.net"
 
+# Threads for the smaller core datasets (PBP always loads on its own first).
+# Every dataset in flight holds its whole frame in memory, so peak memory is
+# roughly the sum of the frames loading at once: more threads finish sooner
+# but need more headroom in the ingest worker's limit.
+CORE_INGEST_MAX_WORKERS = int(os.environ.get('NFL_CORE_INGEST_WORKERS', '2'))
+
 def get_available_years():
     """Get available NFL years from 2020 to current available year"""
     return list(range(2020, 2026))
@@ -42,14 +51,10 @@ def update_pbp_data(year=None):
     logger.info(f"Updating PBP data for {season_display}")
     
     try:
-        # nflreadpy uses load_pbp() and returns polars DataFrame
-        pbp_data = nfl.load_pbp(seasons=[year])
-        
-        # Convert polars to pandas if needed
-        if hasattr(pbp_data, 'to_pandas'):
-            pbp_data = pbp_data.to_pandas()
-        
-        pbp_data.to_csv(file_path, index=False)
+        # Fresh download into the shared raw cache, then stream it to CSV
+        # without materializing a pandas copy of the whole season
+        pbp_data = scan_raw_dataset('pbp', year, refresh=True)
+        publish_csv(pbp_data, file_path, index=False)
         logger.info(f"✅ PBP data for {season_display} saved to {file_path}")
         return f"Successfully updated PBP data for {season_display}"
     except Exception as e:
@@ -67,11 +72,8 @@ def update_roster_data(year=None):
     logger.info(f"Updating roster data for {season_display}")
     
     try:
-        # nflreadpy uses load_rosters_weekly()
-        roster_data = nfl.load_rosters_weekly(seasons=[year])
-        if hasattr(roster_data, 'to_pandas'):
-            roster_data = roster_data.to_pandas()
-        roster_data.to_csv(file_path)
+        roster_data = scan_raw_dataset('rosters_weekly', year, refresh=True)
+        publish_csv(roster_data, file_path)
         logger.info(f"✅ Roster data for {season_display} saved to {file_path}")
         return f"Successfully updated roster data for {season_display}"
     except Exception as e:
@@ -90,11 +92,8 @@ def update_schedule_data(year=None):
     logger.info(f"Updating schedule data for {season_display}")
     
     try:
-        # nflreadpy uses load_schedules()
-        schedule = nfl.load_schedules(seasons=[year])
-        if hasattr(schedule, 'to_pandas'):
-            schedule = schedule.to_pandas()
-        schedule.to_csv(file_path)
+        schedule = scan_raw_dataset('schedules', year, refresh=True)
+        publish_csv(schedule, file_path)
         logger.info(f"✅ Schedule data for {season_display} saved to {file_path}")
         return f"Successfully updated schedule data for {season_display}"
     except Exception as e:
@@ -113,12 +112,10 @@ def update_player_stats_data(year=None):
     logger.info(f"Updating player stats for {season_display}")
     
     try:
-        player_stats = nfl.load_player_stats(seasons=[year])
-        if hasattr(player_stats, 'to_pandas'):
-            player_stats = player_stats.to_pandas()
-        player_stats.to_csv(file_path)
+        manifest = fetch_raw_dataset('player_stats', year, refresh=True)
+        publish_csv(scan_raw_dataset('player_stats', year), file_path)
         logger.info(f"✅ Player stats for {season_display} saved to {file_path}")
-        logger.info(f"Created {len(player_stats)} player-week records")
+        logger.info(f"Created {manifest['rows']} player-week records")
         return f"Successfully updated player stats for {season_display}"
     except Exception as e:
         logger.error(f"❌ Error updating player stats for {season_display}: {str(e)}")
@@ -136,11 +133,8 @@ def update_snap_counts_data(year=None):
     logger.info(f"Updating snap counts for {season_display}")
     
     try:
-        # nflreadpy uses load_snap_counts()
-        snap_counts = nfl.load_snap_counts(seasons=[year])
-        if hasattr(snap_counts, 'to_pandas'):
-            snap_counts = snap_counts.to_pandas()
-        snap_counts.to_csv(file_path)
+        snap_counts = scan_raw_dataset('snap_counts', year, refresh=True)
+        publish_csv(snap_counts, file_path)
         logger.info(f"✅ Snap counts for {season_display} saved to {file_path}")
         return f"Successfully updated snap counts for {season_display}"
     except Exception as e:
@@ -155,11 +149,8 @@ def update_players_data():
     logger.info("Updating player information database")
     
     try:
-        # nflreadpy uses load_players()
-        players = nfl.load_players()
-        if hasattr(players, 'to_pandas'):
-            players = players.to_pandas()
-        players.to_csv(file_path)
+        players = scan_raw_dataset('players', refresh=True)
+        publish_csv(players, file_path)
         logger.info(f"✅ Player database saved to {file_path}")
         return "Successfully updated player database"
     except Exception as e:
@@ -167,35 +158,74 @@ def update_players_data():
         raise
 
 
+def _timed_update(update_func, year):
+    """Run one core update and return (message, error, seconds)"""
+    started = time.perf_counter()
+    try:
+        return update_func(year), None, time.perf_counter() - started
+    except Exception as e:
+        return None, str(e), time.perf_counter() - started
+
+
 @celery.task(name='nfl.core.update_all_base_data')
-def update_all_base_data(year=None):
-    """Update all base NFL data for a specific year"""
+def update_all_base_data(year=None, parallel=True):
+    """
+    Update all base NFL data for a specific year
+    
+    The loads are I/O bound (downloads and CSV writes). PBP, by far the
+    largest, runs alone; the rest then share a pool of CORE_INGEST_MAX_WORKERS
+    threads, so memory peaks at PBP rather than at every frame at once. A
+    failed dataset is reported under 'errors' without discarding the ones
+    that succeeded.
+    """
     if year is None:
         year = get_selected_year()
     
     season_display = format_nfl_season(year)
-    logger.info(f"Starting full base data update for {season_display}")
+    mode = 'parallel' if parallel else 'sequential'
+    logger.info(f"Starting full base data update for {season_display} ({mode})")
     
     results = {
         'year': year,
         'season_display': season_display,
-        'tasks': {}
+        'mode': mode,
+        'tasks': {},
+        'timings': {},
+        'errors': {}
     }
     
-    # Update core data sequentially
-    try:
-        results['tasks']['pbp'] = update_pbp_data(year)
-        results['tasks']['rosters'] = update_roster_data(year)
-        results['tasks']['schedules'] = update_schedule_data(year)
-        results['tasks']['player_stats'] = update_player_stats_data(year)
-        results['tasks']['snap_counts'] = update_snap_counts_data(year)
-        
-        logger.info(f"✅ Completed all base data updates for {season_display}")
-        return results
-    except Exception as e:
-        logger.error(f"❌ Error in base data update for {season_display}: {str(e)}")
-        results['error'] = str(e)
-        return results
+    updates = {
+        'rosters': update_roster_data,
+        'schedules': update_schedule_data,
+        'player_stats': update_player_stats_data,
+        'snap_counts': update_snap_counts_data
+    }
+    
+    started = time.perf_counter()
+    outcomes = {'pbp': _timed_update(update_pbp_data, year)}
+    if parallel:
+        with ThreadPoolExecutor(max_workers=CORE_INGEST_MAX_WORKERS) as pool:
+            futures = {name: pool.submit(_timed_update, func, year) for name, func in updates.items()}
+            outcomes.update((name, future.result()) for name, future in futures.items())
+    else:
+        outcomes.update((name, _timed_update(func, year)) for name, func in updates.items())
+    
+    for name, (message, error, seconds) in outcomes.items():
+        results['timings'][name] = round(seconds, 2)
+        if error is None:
+            results['tasks'][name] = message
+        else:
+            results['errors'][name] = error
+    results['timings']['total'] = round(time.perf_counter() - started, 2)
+    
+    if results['errors']:
+        failed = ', '.join(sorted(results['errors']))
+        logger.error(f"❌ Base data update for {season_display} finished with failures: {failed}")
+        results['error'] = f"Failed datasets: {failed}"
+    else:
+        logger.info(f"✅ Completed all base data updates for {season_display} "
+                    f"in {results['timings']['total']}s")
+    return results
 
 
 @celery.task(name='nfl.core.check_data_availability')
@@ -207,10 +237,10 @@ def check_data_availability(year=None):
     season_display = format_nfl_season(year)
     
     try:
-        # Try to load schedule data as a lightweight check
-        test_data = nfl.load_schedules(seasons=[year])
+        # Schedule data is the lightweight check; a stale cached copy is re-fetched
+        test_data = fetch_raw_dataset('schedules', year, max_age=AVAILABILITY_MAX_AGE)
         
-        if test_data.empty:
+        if test_data['rows'] == 0:
             return {
                 'year': year,
                 'season_display': season_display,
@@ -222,8 +252,8 @@ def check_data_availability(year=None):
                 'year': year,
                 'season_display': season_display,
                 'available': True,
-                'message': f'Data available for {season_display} ({len(test_data)} games)',
-                'games': len(test_data)
+                'message': f'Data available for {season_display} ({test_data["rows"]} games)',
+                'games': test_data['rows']
             }
     except Exception as e:
         return {
@@ -0,0 +1,244 @@
+"""
+Dataset Publishing
+Tasks and web pods share the data volume, so published CSVs must never be
+seen half-written. Every write goes to a temp file in the same directory,
+is fsync'd and then renamed over the final path. Each dataset gets a
+manifest next to it:
+
+    <name>.csv
+    <name>.manifest.json   {version, rows, schema_hash, published_at, ...}
+
+The data file is renamed into place before its manifest, so a reader may
+briefly see new data under the previous version, but never old data under
+a new version. Readers and caches key on the manifest version.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from nickknows import metrics
+from nickknows.lazy_imports import lazy_module
+
+from .frames import write_csv
+
+pd = lazy_module('pandas')
+pl = lazy_module('polars')
+
+# Parsed frames kept per web/worker process, keyed on (path, version, options)
+# and capped by their in-memory size. A frame bigger than a quarter of the
+# budget is never cached; pages over the season-wide PBP and weekly stats
+# files read just their rows with read_dataset_rows instead.
+READ_CACHE_MAX_BYTES = int(os.environ.get('NICKKNOWS_READ_CACHE_MB', '128')) * 1024 * 1024
+READ_CACHE_MAX_ENTRY_BYTES = READ_CACHE_MAX_BYTES // 4
+READ_CHUNK_ROWS = 50_000
+
+_read_cache = OrderedDict()  # key -> (frame, bytes)
+_read_cache_bytes = 0
+_read_cache_lock = threading.Lock()
+
+
+def get_manifest_path(path):
+    """Manifest sitting next to a dataset file"""
+    return os.path.splitext(path)[0] + '.manifest.json'
+
+
+def _fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_replace(tmp_path, path):
+    """Flush tmp_path to disk and atomically rename it over path"""
+    fd = os.open(tmp_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+    # Persist the rename itself
+    _fsync_dir(os.path.dirname(path) or '.')
+
+
+def _temp_path(path):
+    """Unique temp file beside path (rename is only atomic within a filesystem)"""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.',
+        prefix=f'.{os.path.basename(path)}.',
+        suffix='.tmp'
+    )
+    os.close(fd)
+    # mkstemp creates 0600; published files must stay readable by the web pods
+    os.chmod(tmp_path, 0o644)
+    return tmp_path
+
+
+def write_file_atomic(path, write):
+    """Call write(tmp_path) on a temp file beside path, then rename it over path"""
+    tmp_path = _temp_path(path)
+    try:
+        write(tmp_path)
+        fsync_replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+
+def write_json_atomic(data, path):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+    write_file_atomic(path, write)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def schema_hash(frame):
+    """Short hash of column names and dtypes (changes when the layout does)"""
+    if isinstance(frame, (pl.DataFrame, pl.LazyFrame)):
+        schema = [(name, str(dtype)) for name, dtype in frame.collect_schema().items()]
+    else:
+        schema = [(str(name), str(dtype)) for name, dtype in frame.dtypes.items()]
+    return hashlib.sha1(json.dumps(schema).encode()).hexdigest()[:16]
+
+
+def _count_rows(frame, written_path):
+    if isinstance(frame, pl.LazyFrame):
+        # Streamed writes never held the rows in memory; count what landed
+        return pl.scan_csv(written_path).select(pl.len()).collect().item()
+    return frame.height if isinstance(frame, pl.DataFrame) else len(frame)
+
+
+def publish_csv(frame, path, index=True):
+    """
+    Atomically publish a pandas DataFrame or polars DataFrame/LazyFrame as
+    a CSV (same layout as pandas' to_csv(path, index=index)) and bump its
+    manifest. Returns the new manifest.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _temp_path(path)
+    try:
+        if isinstance(frame, (pl.DataFrame, pl.LazyFrame)):
+            write_csv(frame, tmp_path, index=index)
+        else:
+            frame.to_csv(tmp_path, index=index)
+        rows = _count_rows(frame, tmp_path)
+        fsync_replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+    previous = get_dataset_manifest(path)
+    manifest = {
+        'path': path,
+        'version': (previous or {}).get('version', 0) + 1,
+        'rows': rows,
+        'schema_hash': schema_hash(frame),
+        'published_at': time.time(),
+    }
+    write_json_atomic(manifest, get_manifest_path(path))
+    return manifest
+
+
+def get_dataset_manifest(path):
+    """Manifest for a published dataset, or None (missing, or written before manifests)"""
+    try:
+        with open(get_manifest_path(path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def dataset_version(path):
+    manifest = get_dataset_manifest(path)
+    return manifest['version'] if manifest else None
+
+
+def dataset_age(path):
+    """
+    Seconds since the dataset was last published, or None if it doesn't
+    exist. Files from before manifests existed fall back to their mtime.
+    """
+    manifest = get_dataset_manifest(path)
+    if manifest:
+        return time.time() - manifest['published_at']
+    try:
+        return time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def read_dataset(path, **read_csv_kwargs):
+    """
+    pd.read_csv for published datasets, parsed once per manifest version.
+    Callers share the cached data: the result is a shallow copy, so adding,
+    replacing or dropping columns is safe, but values must not be modified
+    in place (.loc[...] = ..., inplace=True on a column) without a .copy()
+    first. Files without a manifest are read directly every time.
+    """
+    global _read_cache_bytes
+    manifest = get_dataset_manifest(path)
+    if manifest is None:
+        with metrics.span('csv_read'):
+            return pd.read_csv(path, **read_csv_kwargs)
+
+    # published_at also separates two publishes that raced to the same version
+    version = (manifest['version'], manifest['published_at'])
+    key = (path, version, tuple(sorted(read_csv_kwargs.items())))
+    with _read_cache_lock:
+        cached = _read_cache.get(key)
+        if cached is not None:
+            _read_cache.move_to_end(key)
+            return cached[0].copy(deep=False)
+
+    with metrics.span('csv_read'):
+        df = pd.read_csv(path, **read_csv_kwargs)
+    size = _frame_bytes(df)
+    if size > READ_CACHE_MAX_ENTRY_BYTES:
+        return df
+    with _read_cache_lock:
+        # Older versions of the same file are never asked for again
+        for stale in [k for k in _read_cache if k[0] == path and (k[1] != version or k == key)]:
+            _read_cache_bytes -= _read_cache.pop(stale)[1]
+        _read_cache[key] = (df, size)
+        _read_cache_bytes += size
+        while _read_cache_bytes > READ_CACHE_MAX_BYTES:
+            _read_cache_bytes -= _read_cache.popitem(last=False)[1][1]
+    return df.copy(deep=False)
+
+
+def read_dataset_rows(path, column, value, **read_csv_kwargs):
+    """
+    Rows of a dataset where `column` == value, for files too big to hold
+    whole (season PBP, weekly stats). The CSV is read in chunks and only
+    matching rows are kept; nothing is cached.
+    """
+    with metrics.span('csv_read'):
+        chunks = [chunk.loc[chunk[column] == value]
+                  for chunk in pd.read_csv(path, chunksize=READ_CHUNK_ROWS, **read_csv_kwargs)]
+    if not chunks:
+        return pd.read_csv(path, nrows=0, **read_csv_kwargs)
+    return pd.concat(chunks)
+
+
+def clear_read_cache():
+    """Drop this process's parsed datasets"""
+    global _read_cache_bytes
+    with _read_cache_lock:
+        _read_cache.clear()
+        _read_cache_bytes = 0
@@ -0,0 +1,41 @@
+"""
+Polars Frame Helpers
+Shared by the task modules so the pipeline can stay on (lazy) polars frames
+while still writing CSVs in the layout pandas' to_csv produced - the web
+views keep reading those files unchanged.
+"""
+from nickknows.lazy_imports import lazy_module
+
+pl = lazy_module('polars')
+
+
+def _flatten_nested(frame):
+    """CSV has no nested types: lists become 'a, b' strings, structs JSON"""
+    exprs = []
+    for name, dtype in frame.collect_schema().items():
+        if not dtype.is_nested():
+            continue
+        if isinstance(dtype, pl.Struct):
+            exprs.append(pl.col(name).struct.json_encode())
+        else:
+            exprs.append(
+                pl.col(name).cast(pl.List(dtype.inner))
+                .list.eval(pl.element().cast(pl.String))
+                .list.join(', ')
+            )
+    return frame.with_columns(exprs) if exprs else frame
+
+
+def write_csv(frame, path, index=True):
+    """
+    Write a polars DataFrame or LazyFrame like pandas' to_csv(path, index=index).
+    LazyFrames are streamed to disk without materializing the whole table.
+    """
+    frame = _flatten_nested(frame)
+    if index:
+        # pandas writes the RangeIndex as an unnamed first column
+        frame = frame.with_row_index('')
+    if isinstance(frame, pl.LazyFrame):
+        frame.sink_csv(path)
+    else:
+        frame.write_csv(path)
@@ -0,0 +1,270 @@
+"""
+Job status for work started from the web app
+
+A job is one Celery task sent with a fresh id; the same id goes back to the
+client, which polls /NFL/jobs/<job_id> instead of holding a web worker open
+on AsyncResult.get(). Status comes from the Celery result backend, plus a
+small Redis hash per job (what was asked for, and when) that multi-step
+workflows update through marker tasks as each stage starts and finishes:
+
+    chain(job_stage_started.si(job_id, 'core_data'), group(...),
+          job_stage_started.si(job_id, 'stat_leaders'), ...,
+          job_complete.si(job_id))
+    workflow.on_error(job_failed.si(job_id))
+
+Jobs are de-duplicated on task name and args: while one is queued or
+running, an in-flight marker (nfl:inflight:<task>:<args hash>) holds its id,
+and starting the same task with the same args again returns that id instead
+of sending another task. The marker is released when the task finishes (for
+staged jobs, when the workflow does) and expires after INFLIGHT_TTL
+regardless, so a lost task can't block its refresh for long. Staged jobs
+renew it as each stage starts, so INFLIGHT_TTL only has to cover one stage.
+"""
+import hashlib
+import json
+import time
+import uuid
+
+import redis
+from celery.signals import task_postrun
+from celery.utils.log import get_task_logger
+
+from nickknows import celery
+
+from .redis_state import get_redis
+from .routing import INTERACTIVE_PRIORITY
+
+logger = get_task_logger(__name__)
+
+JOB_KEY_PREFIX = 'nfl:job'
+JOB_STATE_TTL = 24 * 60 * 60
+INFLIGHT_KEY_PREFIX = 'nfl:inflight'
+INFLIGHT_TTL = 30 * 60
+# Message header carrying the in-flight marker key to the worker
+INFLIGHT_HEADER = 'nfl_inflight'
+# Skip Redis this long after an error; jobs are then sent untracked
+REDIS_RETRY_SECONDS = 30
+
+_redis_down_until = 0.0
+
+# Return the job holding the marker, or take it for ARGV[1] and return nil
+_CLAIM_INFLIGHT = (
+    "local holder = redis.call('get', KEYS[1]) "
+    "if holder then return holder end "
+    "redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2]) return false"
+)
+# Delete the marker only if it still belongs to this job
+_RELEASE_INFLIGHT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+# Push back the marker's expiry only if it still belongs to this job
+_RENEW_INFLIGHT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('expire', KEYS[1], ARGV[2]) else return 0 end"
+)
+
+# Celery task state -> job status, for jobs without stages
+TASK_STATES = {
+    'PENDING': 'queued',
+    'RECEIVED': 'queued',
+    'STARTED': 'running',
+    'RETRY': 'running',
+    'SUCCESS': 'complete',
+    'FAILURE': 'failed',
+    'REVOKED': 'failed',
+}
+
+
+def _job_key(job_id):
+    return f"{JOB_KEY_PREFIX}:{job_id}"
+
+
+def _read_job(job_id):
+    """Decode the job hash into (config, {stage: stage_state})"""
+    raw = get_redis().hgetall(_job_key(job_id))
+    config = json.loads(raw.pop('_config', '{}'))
+    stages = {stage: json.loads(value) for stage, value in raw.items()}
+    return config, stages
+
+
+def _write_stage(job_id, stage, stage_state):
+    r = get_redis()
+    r.hset(_job_key(job_id), stage, json.dumps(stage_state))
+    r.expire(_job_key(job_id), JOB_STATE_TTL)
+
+
+def _inflight_key(task_name, args):
+    digest = hashlib.sha1(json.dumps(list(args), default=str).encode()).hexdigest()
+    return f"{INFLIGHT_KEY_PREFIX}:{task_name}:{digest}"
+
+
+def _release_inflight(key, job_id):
+    if key:
+        get_redis().register_script(_RELEASE_INFLIGHT)(keys=[key], args=[job_id])
+
+
+def _renew_inflight(key, job_id):
+    if key:
+        get_redis().register_script(_RENEW_INFLIGHT)(keys=[key], args=[job_id, INFLIGHT_TTL])
+
+
+def _track_job(job_id, kind, inflight_key, args, stages):
+    """
+    Claim the in-flight marker and record the job. Returns the id of the job
+    already holding the marker, or None if this one is new.
+    """
+    r = get_redis()
+    # One script, so two racing requests can't both see the marker free
+    existing = r.register_script(_CLAIM_INFLIGHT)(keys=[inflight_key], args=[job_id, INFLIGHT_TTL])
+    if existing:
+        return existing
+    config = {
+        'kind': kind,
+        'args': list(args),
+        'stages': list(stages or []),
+        'created_at': time.time(),
+        'inflight_key': inflight_key,
+    }
+    r.hset(_job_key(job_id), '_config', json.dumps(config))
+    r.expire(_job_key(job_id), JOB_STATE_TTL)
+    return None
+
+
+def start_job(kind, task, *args, stages=None, queue=None):
+    """
+    Send `task` with a new job id as its Celery task id and return the id.
+    Tasks run with `stages` are passed job_id= so they can report progress.
+    Jobs are sent at interactive priority, ahead of any bulk work, to the
+    task's routed queue unless `queue` is given.
+    
+    If the same task is already queued or running with the same args,
+    nothing is sent and that job's id is returned. Without Redis the task
+    is still sent, just untracked.
+    """
+    global _redis_down_until
+    job_id = str(uuid.uuid4())
+    inflight_key = _inflight_key(task.name, args)
+    headers = {}
+    if time.monotonic() >= _redis_down_until:
+        try:
+            existing = _track_job(job_id, kind, inflight_key, args, stages)
+        except redis.RedisError as e:
+            _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning(f"❌ Job tracking unavailable, sending {kind} untracked: {e}")
+        else:
+            if existing:
+                logger.info(f"Job {kind} {list(args)} already in flight ({existing})")
+                return existing
+            headers[INFLIGHT_HEADER] = inflight_key
+
+    kwargs = {'job_id': job_id} if stages else {}
+    options = {'queue': queue} if queue else {}
+    try:
+        task.apply_async(args, kwargs, task_id=job_id, priority=INTERACTIVE_PRIORITY, headers=headers, **options)
+    except Exception:
+        if headers:
+            _release_inflight(inflight_key, job_id)
+        raise
+    logger.info(f"Started job {kind} {list(args)} ({job_id})")
+    return job_id
+
+
+def get_job_status(job_id):
+    """
+    Status of a job as a JSON-serializable dict, or None for an id that was
+    never issued (or has expired). Reads Redis only - never waits on a task.
+    """
+    config, stages = _read_job(job_id)
+    result = celery.AsyncResult(job_id)
+    state = result.state
+    if not config and state == 'PENDING':
+        return None
+
+    status = {
+        'job_id': job_id,
+        'kind': config.get('kind'),
+        'args': config.get('args', []),
+        'created_at': config.get('created_at'),
+        'task_state': state,
+        'status': TASK_STATES.get(state, 'running'),
+        'error': None,
+    }
+    if state == 'FAILURE':
+        status['error'] = str(result.result)
+
+    stage_names = config.get('stages') or []
+    if stage_names:
+        # The task itself only launches the workflow; the stages say how far it got
+        status['stages'] = [{'name': name, **stages.get(name, {'status': 'pending'})} for name in stage_names]
+        done = sum(1 for s in status['stages'] if s['status'] == 'complete')
+        status['progress'] = round(done / len(stage_names), 2)
+        failed = stages.get('_failed')
+        if failed or state == 'FAILURE':
+            status['status'] = 'failed'
+            status['error'] = status['error'] or (failed or {}).get('error')
+        elif done == len(stage_names):
+            status['status'] = 'complete'
+        elif done or any(s['status'] == 'running' for s in status['stages']):
+            status['status'] = 'running'
+        else:
+            status['status'] = 'queued'
+    elif state == 'SUCCESS':
+        status['result'] = result.result
+    return status
+
+
+def _finish_running_stages(job_id, stages, stage_status):
+    for name, stage_state in stages.items():
+        if name != '_failed' and stage_state.get('status') == 'running':
+            stage_state.update({'status': stage_status, 'finished_at': time.time()})
+            _write_stage(job_id, name, stage_state)
+
+
+@celery.task(name='nfl.jobs.stage_started')
+def job_stage_started(job_id, stage):
+    """Mark the running stage of a job complete and `stage` running"""
+    config, stages = _read_job(job_id)
+    _renew_inflight(config.get('inflight_key'), job_id)
+    _finish_running_stages(job_id, stages, 'complete')
+    _write_stage(job_id, stage, {'status': 'running', 'started_at': time.time(), 'finished_at': None})
+    return {'job_id': job_id, 'stage': stage}
+
+
+@celery.task(name='nfl.jobs.complete')
+def job_complete(job_id):
+    """Mark the last stage of a job complete"""
+    config, stages = _read_job(job_id)
+    _finish_running_stages(job_id, stages, 'complete')
+    _release_inflight(config.get('inflight_key'), job_id)
+    logger.info(f"✅ Job {job_id} complete")
+    return {'job_id': job_id, 'status': 'complete'}
+
+
+@celery.task(name='nfl.jobs.failed')
+def job_failed(job_id, error='Workflow failed; see task logs'):
+    """Record a failed job (errback - runs inline on the failing worker)"""
+    config, stages = _read_job(job_id)
+    # A chain can report several failing steps - only the first one counts.
+    if '_failed' in stages:
+        return {'job_id': job_id, 'status': 'failed'}
+    _finish_running_stages(job_id, stages, 'failed')
+    _write_stage(job_id, '_failed', {'status': 'failed', 'finished_at': time.time(), 'error': error})
+    _release_inflight(config.get('inflight_key'), job_id)
+    logger.error(f"❌ Job {job_id} failed")
+    return {'job_id': job_id, 'status': 'failed'}
+
+
+@task_postrun.connect
+def _release_finished_job(task_id=None, task=None, kwargs=None, state=None, **extra):
+    """Let the next start_job for these args send a new task"""
+    key = task.request.get(INFLIGHT_HEADER)
+    if not key or state == 'RETRY':
+        return
+    # A staged job's task only launches the workflow; job_complete/job_failed release it
+    if (kwargs or {}).get('job_id') and state == 'SUCCESS':
+        return
+    try:
+        _release_inflight(key, task_id)
+    except redis.RedisError as e:  # the marker expires on its own
+        logger.warning(f"❌ Could not release {key}: {e}")
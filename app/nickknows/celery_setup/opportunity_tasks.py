@@ -4,14 +4,17 @@ Handles calculation and analysis of player opportunities (targets, carries, etc.
 FIXED: Compatible with Polars DataFrames from nflreadpy
 """
 from nickknows import celery
+from nickknows.lazy_imports import lazy_module
 import os
-import pandas as pd
-import numpy as np
-from collections import defaultdict
 from celery.utils.log import get_task_logger
 
+from .datasets import publish_csv
+from .raw_data_cache import scan_raw_dataset
+
 logger = get_task_logger(__name__)
 
+pl = lazy_module('polars')
+
 
 def get_data_path(year, data_type):
     """Get standardized data file path"""
@@ -23,6 +26,26 @@ def format_nfl_season(year):
     return f"{year-1}-{year} Season"
 
 
+# Only these PBP columns are read - the full season file has ~370
+OPPORTUNITY_PBP_COLUMNS = [
+    'season_type', 'week', 'play_type', 'down', 'yardline_100',
+    'air_yards', 'posteam', 'receiver_player_id', 'rusher_player_id'
+]
+
+OPPORTUNITY_COUNT_COLUMNS = [
+    'targets', 'red_zone_targets', 'end_zone_targets',
+    'carries', 'red_zone_carries', 'goal_line_carries',
+    'air_yards', 'touches', 'goal_line_touches',
+    'third_down_targets', 'deep_targets', 'short_targets'
+]
+
+TREND_METRICS = [
+    'targets', 'carries', 'touches', 'target_share', 'carry_share',
+    'red_zone_targets', 'red_zone_carries', 'goal_line_touches',
+    'deep_targets', 'short_targets'
+]
+
+
 @celery.task(name='nfl.opportunity.calculate_opportunities')
 def calculate_opportunity_data(year):
     """Calculate opportunity metrics from PBP data"""
@@ -30,67 +53,42 @@ def calculate_opportunity_data(year):
     logger.info(f"Calculating opportunity data for {season_display}")
     
     try:
-        # Load PBP data
-        import nflreadpy as nfl
-        
-        # nflreadpy returns Polars DataFrames, convert to Pandas
-        if year >= 2024:
-            pbp_data = nfl.load_pbp(seasons=[year])
-        else:
-            pbp_data = nfl.load_pbp(seasons=[year])
-        
-        # Convert Polars to Pandas
-        if hasattr(pbp_data, 'to_pandas'):
-            pbp_data = pbp_data.to_pandas()
-        # Otherwise it's already a Pandas DataFrame
-        
-        logger.info(f"Loaded {len(pbp_data)} PBP records")
+        # Lazy scan of the shared raw cache (downloaded by update_pbp_data):
+        # only the opportunity columns and regular season rows are loaded
+        reg_season = (
+            scan_raw_dataset('pbp', year)
+            .select(OPPORTUNITY_PBP_COLUMNS)
+            .filter(pl.col('season_type') == 'REG')
+        )
         
         # Load roster data for player info
         try:
-            roster_data = nfl.load_rosters_weekly(seasons=[year])
-            # Convert Polars to Pandas
-            if hasattr(roster_data, 'to_pandas'):
-                roster_data = roster_data.to_pandas()
+            roster_data = scan_raw_dataset('rosters_weekly', year)
             has_roster = True
         except Exception as e:
             logger.warning(f"Could not load roster data: {e}")
-            roster_data = pd.DataFrame()
+            roster_data = None
             has_roster = False
         
-        # Filter to regular season (now using Pandas syntax)
-        reg_season = pbp_data[pbp_data['season_type'] == 'REG'].copy()
-        logger.info(f"Processing {len(reg_season)} regular season plays")
-        
-        # Process opportunities by week
-        opportunity_records = []
-        weeks = sorted(reg_season['week'].unique())
-        
-        for week in weeks:
-            week_data = reg_season[reg_season['week'] == week]
-            week_opps = process_week_opportunities(week_data, week, year)
-            opportunity_records.extend(week_opps)
-            logger.debug(f"Processed week {week}: {len(week_opps)} opportunity records")
-        
-        # Convert to DataFrame
-        opportunity_df = pd.DataFrame(opportunity_records)
+        opportunity_df = build_weekly_opportunities(reg_season, year).collect()
+        logger.info(f"Built {opportunity_df.height} player-week opportunity records")
         
         # Add roster information
-        if has_roster and len(roster_data) > 0:
+        if has_roster and opportunity_df.height > 0:
             opportunity_df = add_roster_info(opportunity_df, roster_data)
         
         # Save opportunity data
         output_path = get_data_path(year, 'opportunity_data')
-        opportunity_df.to_csv(output_path, index=False)
+        publish_csv(opportunity_df, output_path, index=False)
         
-        logger.info(f"✅ Opportunity data saved: {len(opportunity_df)} records")
+        logger.info(f"✅ Opportunity data saved: {opportunity_df.height} records")
         
         # Calculate trends
         trend_data = calculate_opportunity_trends(opportunity_df)
         trend_path = get_data_path(year, 'opportunity_trends')
-        trend_data.to_csv(trend_path, index=False)
+        publish_csv(trend_data, trend_path, index=False)
         
-        logger.info(f"✅ Trend data saved: {len(trend_data)} records")
+        logger.info(f"✅ Trend data saved: {trend_data.height} records")
         
         return f"Successfully calculated opportunity data for {season_display}"
         
@@ -101,165 +99,152 @@ def calculate_opportunity_data(year):
         raise
 
 
-def process_week_opportunities(week_data, week, year):
-    """Process opportunities for a single week"""
-    opportunities = defaultdict(lambda: {
-        'player_id': '',
-        'week': week,
-        'season': year,
-        'targets': 0,
-        'red_zone_targets': 0,
-        'end_zone_targets': 0,
-        'carries': 0,
-        'red_zone_carries': 0,
-        'goal_line_carries': 0,
-        'air_yards': 0,
-        'touches': 0,
-        'goal_line_touches': 0,
-        'third_down_targets': 0,
-        'deep_targets': 0,
-        'short_targets': 0,
-        'team': ''
-    })
+def _flag(condition):
+    """Boolean play condition as a 0/1 count; missing values count as 0"""
+    return condition.fill_null(False).cast(pl.Int64)
+
+
+def build_weekly_opportunities(plays, year):
+    """
+    Per player, per week opportunity counts and team shares (LazyFrame in,
+    LazyFrame out). A player's team is the offense on their last touch of
+    the week; rows come out by week, then by each player's first touch.
+    """
+    plays = plays.with_row_index('play_order')
+    yardline = pl.col('yardline_100')
+    air_yards = pl.col('air_yards').fill_nan(0).fill_null(0)
+    zero = pl.lit(0, dtype=pl.Int64)
     
-    # Team totals for share calculations
-    team_totals = defaultdict(lambda: {
-        'total_targets': 0,
-        'total_carries': 0
-    })
+    # PASSING OPPORTUNITIES
+    targets = plays.filter(
+        (pl.col('play_type') == 'pass') & pl.col('receiver_player_id').is_not_null()
+    ).select(
+        'week', 'play_order', 'posteam',
+        pl.col('receiver_player_id').alias('player_id'),
+        pl.lit(1, dtype=pl.Int64).alias('targets'),
+        _flag(yardline <= 20).alias('red_zone_targets'),
+        _flag(yardline <= 10).alias('end_zone_targets'),
+        zero.alias('carries'),
+        zero.alias('red_zone_carries'),
+        zero.alias('goal_line_carries'),
+        air_yards.cast(pl.Float64).alias('air_yards'),
+        _flag(yardline <= 10).alias('goal_line_touches'),
+        _flag(pl.col('down') == 3).alias('third_down_targets'),
+        _flag(air_yards >= 20).alias('deep_targets'),
+        _flag(air_yards < 10).alias('short_targets'),
+    )
     
-    # Process each play
-    for _, play in week_data.iterrows():
-        play_type = play.get('play_type', '')
-        down = play.get('down', 0)
-        yardline_100 = play.get('yardline_100', 100)
-        air_yards = play.get('air_yards', 0) if pd.notna(play.get('air_yards')) else 0
-        
-        # PASSING OPPORTUNITIES
-        if play_type == 'pass':
-            receiver_id = play.get('receiver_player_id')
-            posteam = play.get('posteam')
-            
-            if pd.notna(receiver_id):
-                opp = opportunities[receiver_id]
-                opp['player_id'] = receiver_id
-                opp['targets'] += 1
-                opp['touches'] += 1
-                opp['air_yards'] += air_yards
-                opp['team'] = posteam
-                
-                if pd.notna(posteam):
-                    team_totals[posteam]['total_targets'] += 1
-                
-                # Situational opportunities
-                if yardline_100 <= 20:
-                    opp['red_zone_targets'] += 1
-                if yardline_100 <= 10:
-                    opp['end_zone_targets'] += 1
-                    opp['goal_line_touches'] += 1
-                if down == 3:
-                    opp['third_down_targets'] += 1
-                if air_yards >= 20:
-                    opp['deep_targets'] += 1
-                elif air_yards < 10:
-                    opp['short_targets'] += 1
-        
-        # RUSHING OPPORTUNITIES
-        elif play_type == 'run':
-            rusher_id = play.get('rusher_player_id')
-            posteam = play.get('posteam')
-            
-            if pd.notna(rusher_id):
-                opp = opportunities[rusher_id]
-                opp['player_id'] = rusher_id
-                opp['carries'] += 1
-                opp['touches'] += 1
-                opp['team'] = posteam
-                
-                if pd.notna(posteam):
-                    team_totals[posteam]['total_carries'] += 1
-                
-                # Situational opportunities
-                if yardline_100 <= 20:
-                    opp['red_zone_carries'] += 1
-                if yardline_100 <= 5:
-                    opp['goal_line_carries'] += 1
-                    opp['goal_line_touches'] += 1
+    # RUSHING OPPORTUNITIES
+    carries = plays.filter(
+        (pl.col('play_type') == 'run') & pl.col('rusher_player_id').is_not_null()
+    ).select(
+        'week', 'play_order', 'posteam',
+        pl.col('rusher_player_id').alias('player_id'),
+        zero.alias('targets'),
+        zero.alias('red_zone_targets'),
+        zero.alias('end_zone_targets'),
+        pl.lit(1, dtype=pl.Int64).alias('carries'),
+        _flag(yardline <= 20).alias('red_zone_carries'),
+        _flag(yardline <= 5).alias('goal_line_carries'),
+        pl.lit(0.0).alias('air_yards'),
+        _flag(yardline <= 5).alias('goal_line_touches'),
+        zero.alias('third_down_targets'),
+        zero.alias('deep_targets'),
+        zero.alias('short_targets'),
+    )
     
-    # Calculate shares
-    records = []
-    for player_id, stats in opportunities.items():
-        team = stats['team']
-        
-        if team and team in team_totals:
-            total_targets = team_totals[team]['total_targets']
-            total_carries = team_totals[team]['total_carries']
-            
-            stats['target_share'] = (stats['targets'] / total_targets * 100) if total_targets > 0 else 0
-            stats['carry_share'] = (stats['carries'] / total_carries * 100) if total_carries > 0 else 0
-        else:
-            stats['target_share'] = 0
-            stats['carry_share'] = 0
-        
-        records.append(stats)
+    touches = pl.concat([targets, carries]).with_columns(
+        (pl.col('targets') + pl.col('carries')).alias('touches')
+    )
     
-    return records
+    # Team totals for share calculations
+    team_totals = (
+        touches.filter(pl.col('posteam').is_not_null())
+        .group_by(['week', 'posteam'])
+        .agg(
+            pl.col('targets').sum().alias('total_targets'),
+            pl.col('carries').sum().alias('total_carries')
+        )
+        .rename({'posteam': 'team'})
+    )
+    
+    def share(count, total):
+        return (
+            pl.when(pl.col(total) > 0)
+            .then(pl.col(count) / pl.col(total) * 100)
+            .otherwise(0.0)
+            .fill_null(0.0)
+        )
+    
+    return (
+        touches.group_by(['week', 'player_id'])
+        .agg(
+            pl.col('play_order').min().alias('first_play'),
+            pl.col('posteam').sort_by('play_order').last().alias('team'),
+            *[pl.col(col).sum() for col in OPPORTUNITY_COUNT_COLUMNS]
+        )
+        .join(team_totals, on=['week', 'team'], how='left')
+        .with_columns(
+            share('targets', 'total_targets').alias('target_share'),
+            share('carries', 'total_carries').alias('carry_share'),
+            pl.lit(year).alias('season')
+        )
+        .sort(['week', 'first_play'])
+        .select(
+            'player_id', 'week', 'season', *OPPORTUNITY_COUNT_COLUMNS,
+            'team', 'target_share', 'carry_share'
+        )
+    )
 
 
 def add_roster_info(opportunity_df, roster_data):
     """Add roster information to opportunity data"""
     try:
         # nflreadpy uses 'gsis_id' and 'full_name' instead of 'player_id' and 'player_name'
-        # First, rename the roster columns to match what we expect
+        roster_columns = roster_data.collect_schema().names()
         roster_rename = {
             'gsis_id': 'player_id',
             'full_name': 'player_name'
         }
-        
-        # Only rename columns that exist
-        roster_rename_filtered = {k: v for k, v in roster_rename.items() if k in roster_data.columns}
-        roster_data = roster_data.rename(columns=roster_rename_filtered)
-        
-        # Get unique player info from roster (most recent info)
-        player_info = roster_data.groupby('player_id').agg({
-            'player_name': 'first',
-            'position': 'first',
-            'team': 'first'
-        }).reset_index()
-        
-        logger.info(f"Extracted info for {len(player_info)} players from roster")
-        
-        # Merge with opportunity data
-        # First, save the original team column
-        opportunity_df['opp_team'] = opportunity_df['team']
-        
-        # Merge on player_id
-        opportunity_df = opportunity_df.merge(
-            player_info, 
-            on='player_id', 
-            how='left',
-            suffixes=('', '_roster')
+        roster_rename_filtered = {k: v for k, v in roster_rename.items() if k in roster_columns}
+        
+        # Get unique player info from roster (first non-missing value per player)
+        player_info = (
+            roster_data.rename(roster_rename_filtered)
+            .select('player_id', 'player_name', 'position', 'team')
+            .filter(pl.col('player_id').is_not_null())
+            .group_by('player_id')
+            .agg(
+                pl.col('player_name').drop_nulls().first(),
+                pl.col('position').drop_nulls().first(),
+                pl.col('team').drop_nulls().first().alias('team_roster')
+            )
+            .collect()
         )
         
-        # Set player_display_name
-        opportunity_df['player_display_name'] = opportunity_df['player_name'].fillna(opportunity_df['player_id'])
-        
-        # Use roster team if available, otherwise use opportunity team
-        opportunity_df['team'] = opportunity_df['team_roster'].fillna(opportunity_df['opp_team'])
-        
-        # Clean up temporary columns
-        opportunity_df.drop(['opp_team', 'team_roster'], axis=1, inplace=True, errors='ignore')
-        
-        # Fill missing positions with 'Unknown'
-        if 'position' in opportunity_df.columns:
-            opportunity_df['position'] = opportunity_df['position'].fillna('Unknown')
-        else:
-            opportunity_df['position'] = 'Unknown'
+        logger.info(f"Extracted info for {player_info.height} players from roster")
+        
+        # Merge on player_id, keeping the opportunity row order
+        opportunity_df = (
+            opportunity_df.with_row_index('_row')
+            .join(player_info, on='player_id', how='left')
+            .sort('_row')
+            .drop('_row')
+            .with_columns(
+                # Set player_display_name
+                pl.col('player_name').fill_null(pl.col('player_id')).alias('player_display_name'),
+                # Use roster team if available, otherwise use opportunity team
+                pl.col('team_roster').fill_null(pl.col('team')).alias('team'),
+                # Fill missing positions with 'Unknown'
+                pl.col('position').fill_null('Unknown')
+            )
+            .drop('team_roster')
+        )
         
-        logger.info(f"Successfully added roster info to {len(opportunity_df)} opportunity records")
+        logger.info(f"Successfully added roster info to {opportunity_df.height} opportunity records")
         
         # Log some examples for debugging
-        sample = opportunity_df[['player_id', 'player_name', 'player_display_name', 'position', 'team']].head(10)
+        sample = opportunity_df.select('player_id', 'player_name', 'player_display_name', 'position', 'team').head(10)
         logger.info(f"Sample merged data:\n{sample}")
         
     except Exception as e:
@@ -268,99 +253,84 @@ def add_roster_info(opportunity_df, roster_data):
         logger.error(traceback.format_exc())
         
         # Add default columns if merge failed
-        if 'player_name' not in opportunity_df.columns:
-            opportunity_df['player_name'] = opportunity_df['player_id']
-        if 'player_display_name' not in opportunity_df.columns:
-            opportunity_df['player_display_name'] = opportunity_df['player_id']
-        if 'position' not in opportunity_df.columns:
-            opportunity_df['position'] = 'Unknown'
+        defaults = {
+            'player_name': pl.col('player_id'),
+            'player_display_name': pl.col('player_id'),
+            'position': pl.lit('Unknown')
+        }
+        opportunity_df = opportunity_df.with_columns(
+            expr.alias(name) for name, expr in defaults.items()
+            if name not in opportunity_df.columns
+        )
     
     return opportunity_df
 
 
+def _first_present(columns, *candidates, default):
+    """First row's value from the first candidate column that has one"""
+    exprs = [pl.col(col).first() for col in candidates if col in columns]
+    return pl.coalesce(*exprs, pl.lit(default)) if exprs else pl.lit(default)
+
+
 def calculate_opportunity_trends(opportunity_df, min_weeks=2):
     """Calculate trend analysis from opportunity data"""
     logger.info(f"Calculating trends (min {min_weeks} weeks)")
     
-    trend_records = []
+    if opportunity_df.height == 0:
+        return pl.DataFrame()
     
-    # Metrics to analyze
-    metrics = [
-        'targets', 'carries', 'touches', 'target_share', 'carry_share',
-        'red_zone_targets', 'red_zone_carries', 'goal_line_touches',
-        'deep_targets', 'short_targets'
+    columns = opportunity_df.columns
+    metrics = [metric for metric in TREND_METRICS if metric in columns]
+    
+    # Player info comes from the player's earliest week - prioritize
+    # player_display_name, then player_name, then player_id
+    aggregations = [
+        pl.coalesce(
+            _first_present(columns, 'player_display_name', 'player_name', default=None),
+            pl.col('player_id').first().cast(pl.String)
+        ).alias('player_name'),
+        _first_present(columns, 'position', default='Unknown').alias('position'),
+        _first_present(columns, 'team', default='Unknown').alias('team'),
+        pl.len().alias('weeks_played'),
+        pl.col('week').max().alias('latest_week'),
     ]
     
-    for player_id, player_data in opportunity_df.groupby('player_id'):
-        player_data = player_data.sort_values('week')
-        
-        if len(player_data) < min_weeks:
-            continue
-        
-        # Get player info - prioritize player_display_name, then player_name, then player_id
-        if 'player_display_name' in player_data.columns and pd.notna(player_data['player_display_name'].iloc[0]):
-            player_name = player_data['player_display_name'].iloc[0]
-        elif 'player_name' in player_data.columns and pd.notna(player_data['player_name'].iloc[0]):
-            player_name = player_data['player_name'].iloc[0]
-        else:
-            player_name = player_id
-        
-        # Get position - default to 'Unknown' if missing
-        if 'position' in player_data.columns and pd.notna(player_data['position'].iloc[0]):
-            position = player_data['position'].iloc[0]
-        else:
-            position = 'Unknown'
-        
-        # Get team
-        if 'team' in player_data.columns and pd.notna(player_data['team'].iloc[0]):
-            team = player_data['team'].iloc[0]
-        else:
-            team = 'Unknown'
-        
-        trend_record = {
-            'player_id': player_id,
-            'player_name': player_name,
-            'position': position,
-            'team': team,
-            'weeks_played': len(player_data),
-            'latest_week': player_data['week'].max()
-        }
-        
-        # Calculate stats for each metric
-        for metric in metrics:
-            if metric in player_data.columns:
-                values = player_data[metric].values
-                
-                # Basic stats
-                trend_record[f'{metric}_avg'] = np.mean(values)
-                trend_record[f'{metric}_latest'] = values[-1] if len(values) > 0 else 0
-                trend_record[f'{metric}_max'] = np.max(values)
-                
-                # Trend (recent vs early)
-                if len(values) >= 2:
-                    if len(values) >= 3:
-                        recent_avg = np.mean(values[-2:])
-                        early_avg = np.mean(values[:-2])
-                    else:
-                        recent_avg = values[-1]
-                        early_avg = values[0]
-                    
-                    trend_pct = ((recent_avg - early_avg) / max(early_avg, 0.1) * 100) if early_avg > 0 else 0
-                    trend_record[f'{metric}_trend'] = trend_pct
-                else:
-                    trend_record[f'{metric}_trend'] = 0
-                
-                # Consistency (coefficient of variation)
-                if np.mean(values) > 0:
-                    trend_record[f'{metric}_consistency'] = (np.std(values) / np.mean(values)) * 100
-                else:
-                    trend_record[f'{metric}_consistency'] = 0
+    n = pl.len()
+    for metric in metrics:
+        values = pl.col(metric).cast(pl.Float64)
+        mean = values.mean()
+        
+        # Trend (recent vs early): last two weeks vs the rest, or last vs first
+        recent_avg = pl.when(n >= 3).then(values.tail(2).mean()).otherwise(values.last())
+        early_avg = pl.when(n >= 3).then(values.slice(0, n - 2).mean()).otherwise(values.first())
+        trend = (
+            pl.when((n >= 2) & (early_avg > 0))
+            .then((recent_avg - early_avg) / pl.max_horizontal(early_avg, pl.lit(0.1)) * 100)
+            .otherwise(0.0)
+        )
         
-        trend_records.append(trend_record)
+        aggregations.extend([
+            mean.alias(f'{metric}_avg'),
+            pl.col(metric).last().alias(f'{metric}_latest'),
+            pl.col(metric).max().alias(f'{metric}_max'),
+            trend.alias(f'{metric}_trend'),
+            # Consistency (coefficient of variation)
+            pl.when(mean > 0).then(values.std(ddof=0) / mean * 100).otherwise(0.0)
+            .alias(f'{metric}_consistency'),
+        ])
+    
+    trend_data = (
+        opportunity_df.lazy()
+        .sort(['player_id', 'week'])
+        .group_by('player_id', maintain_order=True)
+        .agg(aggregations)
+        .filter(pl.col('weeks_played') >= min_weeks)
+        .collect()
+    )
     
-    logger.info(f"Calculated trends for {len(trend_records)} players")
+    logger.info(f"Calculated trends for {trend_data.height} players")
     
-    return pd.DataFrame(trend_records)
+    return trend_data
 
 
 @celery.task(name='nfl.opportunity.update_team_opportunities')
@@ -379,19 +349,16 @@ def update_team_opportunity_data(team, year):
             calculate_opportunity_data(year)
             return f"Triggered opportunity calculation for {season_display}"
         
-        # Load and filter to team
-        opp_data = pd.read_csv(opp_path)
-        trend_data = pd.read_csv(trend_path)
-        
-        team_opps = opp_data[opp_data['team'] == team]
-        team_trends = trend_data[trend_data['team'] == team]
+        # Filter to team while scanning, without loading every team
+        team_opps = pl.scan_csv(opp_path).filter(pl.col('team') == team)
+        team_trends = pl.scan_csv(trend_path).filter(pl.col('team') == team)
         
         # Save team-specific data
         team_dir = os.getcwd() + f'/nickknows/nfl/data/{team}/'
         os.makedirs(team_dir, exist_ok=True)
         
-        team_opps.to_csv(f'{team_dir}{year}_{team}_opportunities.csv', index=False)
-        team_trends.to_csv(f'{team_dir}{year}_{team}_opportunity_trends.csv', index=False)
+        publish_csv(team_opps, f'{team_dir}{year}_{team}_opportunities.csv', index=False)
+        publish_csv(team_trends, f'{team_dir}{year}_{team}_opportunity_trends.csv', index=False)
         
         logger.info(f"✅ Team opportunity data saved for {team} ({season_display})")
         return f"Updated opportunity data for {team} ({season_display})"
@@ -0,0 +1,168 @@
+"""
+Raw nflreadpy Download Cache
+Fetches each (dataset, season) from nflreadpy once into a local, versioned
+Parquet cache so every task reads the same download instead of calling
+nflreadpy again.
+
+Layout (under the shared data volume):
+    raw/<dataset>/<season>.v<version>.parquet
+    raw/<dataset>/<season>.manifest.json
+"""
+import json
+import os
+import time
+
+from celery.utils.log import get_task_logger
+
+from nickknows.lazy_imports import lazy_module
+
+from .datasets import fsync_replace, write_json_atomic
+from .redis_state import get_redis
+
+logger = get_task_logger(__name__)
+
+pl = lazy_module('polars')
+
+# dataset name -> nflreadpy loader
+RAW_DATASETS = {
+    'pbp': 'load_pbp',
+    'rosters_weekly': 'load_rosters_weekly',
+    'schedules': 'load_schedules',
+    'player_stats': 'load_player_stats',
+    'snap_counts': 'load_snap_counts',
+    'players': 'load_players',  # not season-specific
+}
+
+RAW_CACHE_KEEP_VERSIONS = 2
+# A full-season PBP download can take a while on a cold cache
+RAW_FETCH_LOCK_TIMEOUT = 10 * 60
+# Availability checks re-download anything cached longer ago than this, so a
+# season nflverse has published since the last fetch shows up
+AVAILABILITY_MAX_AGE = 15 * 60
+
+
+class RawDatasetError(KeyError):
+    """Raised for dataset names the cache doesn't know how to load"""
+
+
+def get_raw_cache_dir(dataset):
+    """Directory holding every cached season of a dataset"""
+    return os.getcwd() + f'/nickknows/nfl/data/raw/{dataset}/'
+
+
+def _season_label(season):
+    return 'all' if season is None else str(season)
+
+
+def _manifest_path(dataset, season):
+    return get_raw_cache_dir(dataset) + f'{_season_label(season)}.manifest.json'
+
+
+def _version_path(dataset, season, version):
+    return get_raw_cache_dir(dataset) + f'{_season_label(season)}.v{version}.parquet'
+
+
+def get_raw_dataset_info(dataset, season=None):
+    """Manifest for the current cached version, or None if never fetched"""
+    try:
+        with open(_manifest_path(dataset, season)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not os.path.exists(manifest.get('path', '')):
+        return None
+    return manifest
+
+
+def _download(dataset, season):
+    import nflreadpy as nfl
+
+    loader = getattr(nfl, RAW_DATASETS[dataset])
+    data = loader() if season is None else loader(seasons=[season])
+    # nflreadpy returns polars; normalise anything else so the cache is uniform
+    if not isinstance(data, pl.DataFrame):
+        data = pl.from_pandas(data)
+    return data
+
+
+def _prune_old_versions(dataset, season, current_version):
+    for version in range(1, current_version - RAW_CACHE_KEEP_VERSIONS + 1):
+        try:
+            os.remove(_version_path(dataset, season, version))
+        except FileNotFoundError:
+            pass
+
+
+def _store(dataset, season, data, previous):
+    version = (previous or {}).get('version', 0) + 1
+    os.makedirs(get_raw_cache_dir(dataset), exist_ok=True)
+
+    path = _version_path(dataset, season, version)
+    tmp_path = path + '.tmp'
+    data.write_parquet(tmp_path)
+    fsync_replace(tmp_path, path)
+
+    manifest = {
+        'dataset': dataset,
+        'season': season,
+        'version': version,
+        'rows': data.height,
+        'fetched_at': time.time(),
+        'path': path,
+    }
+    write_json_atomic(manifest, _manifest_path(dataset, season))
+
+    _prune_old_versions(dataset, season, version)
+    return manifest
+
+
+def fetch_raw_dataset(dataset, season=None, refresh=False, max_age=None):
+    """
+    Make sure a cached copy of (dataset, season) exists and return its manifest.
+
+    Without refresh, an existing cached version is reused - unless max_age is
+    given and it was fetched more than max_age seconds ago, which counts as a
+    refresh. With refresh, a new version is downloaded - unless another caller
+    finished a download after this call started, in which case that download
+    is shared rather than repeated. Downloads are single-flighted across
+    workers with a Redis lock.
+    """
+    if dataset not in RAW_DATASETS:
+        raise RawDatasetError(f"Unknown raw dataset: {dataset}")
+
+    requested_at = time.time()
+    manifest = get_raw_dataset_info(dataset, season)
+    if manifest and max_age is not None and requested_at - manifest['fetched_at'] > max_age:
+        refresh = True
+    if manifest and not refresh:
+        return manifest
+
+    lock_key = f"nfl:raw:{dataset}:{_season_label(season)}:lock"
+    with get_redis().lock(lock_key, timeout=RAW_FETCH_LOCK_TIMEOUT,
+                          blocking_timeout=RAW_FETCH_LOCK_TIMEOUT):
+        # Re-check: another worker may have downloaded while we waited.
+        manifest = get_raw_dataset_info(dataset, season)
+        if manifest and (not refresh or manifest['fetched_at'] >= requested_at):
+            return manifest
+
+        logger.info(f"Downloading {dataset} ({_season_label(season)}) from nflreadpy")
+        data = _download(dataset, season)
+        manifest = _store(dataset, season, data, manifest)
+        logger.info(f"✅ Cached {dataset} ({_season_label(season)}) "
+                    f"v{manifest['version']}: {manifest['rows']} rows")
+        return manifest
+
+
+def load_raw_dataset(dataset, season=None, refresh=False):
+    """Load (dataset, season) as a polars DataFrame, downloading only if needed"""
+    manifest = fetch_raw_dataset(dataset, season, refresh=refresh)
+    return pl.read_parquet(manifest['path'])
+
+
+def scan_raw_dataset(dataset, season=None, refresh=False):
+    """
+    Lazily scan (dataset, season). Column selections and filters are pushed
+    down into the Parquet read, so only the needed data is ever loaded.
+    """
+    manifest = fetch_raw_dataset(dataset, season, refresh=refresh)
+    return pl.scan_parquet(manifest['path'])
@@ -0,0 +1,32 @@
+"""
+Shared Redis connection for task-side bookkeeping
+(backfill progress, locks and other small pieces of workflow state)
+"""
+import os
+import threading
+
+import redis
+
+REDIS_HOST = os.environ.get('REDIS_ENV', 'redis')
+# Don't read REDIS_PORT from env: Kubernetes injects REDIS_PORT=tcp://<ip>:6379
+# for the `redis` Service, which collides.
+REDIS_PORT = 6379
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """Lazily create one Redis client per process (the pool is thread-safe)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    decode_responses=True,
+                    socket_timeout=5,
+                    socket_connect_timeout=5,
+                )
+    return _client
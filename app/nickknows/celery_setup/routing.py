@@ -0,0 +1,90 @@
+"""
+Task queues, routes and broker priorities
+
+Tasks are routed by name onto four queues so a one-team refresh from the
+web app never waits behind a multi-season backfill or a PBP download:
+
+    interactive  short, user-facing work: snap count summaries, health and
+                 status checks, workflow launchers and job markers, Hydrow
+    team         per-team pipelines (schedule, weekly data, snap counts,
+                 team opportunities)
+    render       matplotlib plots and HTML table bundles
+    ingest       nflreadpy downloads and season-wide crunching
+
+Each queue has its own worker pool and concurrency (worker.pools in the Helm
+values). Anything unrouted goes to the default `celery` queue, which the
+ingest pool also consumes. To run everything on one local worker:
+
+    celery -A nickknows.celery worker -Q interactive,team,render,ingest,celery
+
+A worker listening on several queues gives none of them precedence: the
+Redis transport polls them round-robin, whatever order -Q lists them in.
+That is why interactive work has a pool of its own rather than sharing one
+with a busier queue. Precedence only exists within a queue, where messages
+are taken by priority, 0 (highest) to 9. Work sent from the web app goes at
+the default 0; bulk work such as the multi-season backfill is sent at
+BULK_PRIORITY or lower, and every task it starts inherits that, so a
+backfill's per-team fan-out on the team queue still lets a user's refresh
+go first.
+
+A task routed for its bulk use can be sent elsewhere when a user asks for
+it: the season-wide opportunity crunch runs on ingest during a backfill,
+but the web app's refresh goes to render (start_job(..., queue=RENDER_QUEUE))
+so it doesn't wait behind PBP downloads. Not team: that pool runs two tasks
+at once, and two season-wide PBP crunches side by side won't fit its
+memory limit.
+"""
+from nickknows import celery
+
+INTERACTIVE_QUEUE = 'interactive'
+TEAM_QUEUE = 'team'
+RENDER_QUEUE = 'render'
+INGEST_QUEUE = 'ingest'
+DEFAULT_QUEUE = 'celery'
+
+QUEUES = (INTERACTIVE_QUEUE, TEAM_QUEUE, RENDER_QUEUE, INGEST_QUEUE, DEFAULT_QUEUE)
+
+# Redis priorities: 0 is taken first. Bulk work uses BULK_PRIORITY..9.
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 5
+
+# Exact names are matched before the globs, then globs in order
+TASK_ROUTES = {
+    # Per-team work that would otherwise match a broader pattern
+    'nfl.snaps.update_team_snap_counts': {'queue': TEAM_QUEUE},
+    'nfl.snaps.update_all_teams': {'queue': TEAM_QUEUE},
+    'nfl.opportunity.update_team_opportunities': {'queue': TEAM_QUEUE},
+    'nfl.team.process_team_fpa': {'queue': RENDER_QUEUE},
+    'nfl.update_team': {'queue': INTERACTIVE_QUEUE},
+    'nfl.update_all': {'queue': INTERACTIVE_QUEUE},
+    'nfl.core.check_data_availability': {'queue': INTERACTIVE_QUEUE},
+
+    'nfl.snaps.*': {'queue': INTERACTIVE_QUEUE},
+    'nfl.orchestrator.*': {'queue': INTERACTIVE_QUEUE},
+    'nfl.jobs.*': {'queue': INTERACTIVE_QUEUE},
+    'hydrow.*': {'queue': INTERACTIVE_QUEUE},
+    'nfl.team.*': {'queue': TEAM_QUEUE},
+    'nfl.stats.*': {'queue': RENDER_QUEUE},
+    'nfl.core.*': {'queue': INGEST_QUEUE},
+    'nfl.opportunity.*': {'queue': INGEST_QUEUE},
+}
+
+# Old-style names, like the CELERY_* keys the Flask config is loaded with:
+# Celery refuses to load a mix of old and new setting names.
+celery.conf.update(
+    CELERY_DEFAULT_QUEUE=DEFAULT_QUEUE,
+    CELERY_ROUTES=TASK_ROUTES,
+    # Chain steps and fan-outs keep the priority of the task that sends them
+    CELERY_INHERIT_PARENT_PRIORITY=True,
+    BROKER_TRANSPORT_OPTIONS={
+        # One Redis list per priority instead of the default four buckets
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+)
+
+
+def queue_for(task_name):
+    """Queue a task is sent to, e.g. queue_for('nfl.core.update_pbp') -> 'ingest'"""
+    return celery.amqp.router.route({}, task_name)['queue'].name
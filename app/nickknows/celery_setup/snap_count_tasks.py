@@ -3,14 +3,21 @@ NFL Snap Count Tasks
 Handles snap count data loading and processing
 """
 from nickknows import celery
+from nickknows.lazy_imports import lazy_module
 import os
-import pandas as pd
 from collections import defaultdict
 from celery.utils.log import get_task_logger
 from datetime import datetime
 
+from .datasets import publish_csv
+from .raw_data_cache import AVAILABILITY_MAX_AGE, fetch_raw_dataset, scan_raw_dataset
+
 logger = get_task_logger(__name__)
 
+pd = lazy_module('pandas')
+pl = lazy_module('polars')
+cs = lazy_module('polars.selectors')
+
 
 def get_data_path(year, data_type):
     """Get standardized data file path"""
@@ -38,54 +45,48 @@ def update_team_snap_counts(team, year):
         team_dir = os.getcwd() + f'/nickknows/nfl/data/{team}/'
         os.makedirs(team_dir, exist_ok=True)
         
-        # Check if global snap count data exists
-        snap_path = get_data_path(year, 'snap_counts')
-        
-        if not os.path.exists(snap_path):
-            # Load fresh data
-            import nflreadpy as nfl
-            logger.info(f"Loading snap count data for {year}")
-            snap_data = nfl.load_snap_counts(seasons=[year])
-        else:
-            # Use cached data
-            snap_data = pd.read_csv(snap_path, index_col=0)
-        
-        if snap_data.empty:
+        # Shared raw cache - only downloads if no task has fetched this season yet.
+        # The team filter is pushed into the Parquet scan.
+        if fetch_raw_dataset('snap_counts', year)['rows'] == 0:
             logger.warning(f"No snap count data available for {year}")
             return f"No snap count data for {year}"
         
         # Filter to team
-        team_snaps = snap_data[snap_data['team'] == team].copy()
+        team_snaps = scan_raw_dataset('snap_counts', year).filter(pl.col('team') == team).collect()
         
-        if team_snaps.empty:
+        if team_snaps.is_empty():
             logger.warning(f"No snap data for {team} in {year}")
             return f"No snap data for {team} in {year}"
         
-        # Clean and process
-        team_snaps = team_snaps.fillna(0)
-        
         # Ensure numeric columns
         numeric_cols = ['offense_snaps', 'defense_snaps', 'st_snaps', 
                        'offense_pct', 'defense_pct', 'st_pct']
-        for col in numeric_cols:
-            if col in team_snaps.columns:
-                team_snaps[col] = pd.to_numeric(team_snaps[col], errors='coerce').fillna(0)
+        team_snaps = team_snaps.with_columns(
+            pl.col(col).cast(pl.Float64, strict=False)
+            for col in numeric_cols
+            if col in team_snaps.columns and not team_snaps.schema[col].is_numeric()
+        )
+        
+        # Clean and process (missing text values are written as 0, as before)
+        team_snaps = team_snaps.with_columns(
+            cs.numeric().fill_null(0).fill_nan(0),
+            cs.string().fill_null('0')
+        )
         
         # Calculate total snaps
-        team_snaps['total_snaps'] = (
-            team_snaps['offense_snaps'] +
-            team_snaps['defense_snaps'] +
-            team_snaps['st_snaps']
+        team_snaps = team_snaps.with_columns(
+            (pl.col('offense_snaps') + pl.col('defense_snaps') + pl.col('st_snaps'))
+            .alias('total_snaps')
         )
         
         # Sort by week and player
-        team_snaps = team_snaps.sort_values(['week', 'player'])
+        team_snaps = team_snaps.sort(['week', 'player'])
         
         # Save
         output_path = get_team_data_path(team, year, 'snap_counts')
-        team_snaps.to_csv(output_path, index=False)
+        publish_csv(team_snaps, output_path, index=False)
         
-        logger.info(f"✅ Snap counts saved for {team} ({season_display}): {len(team_snaps)} records")
+        logger.info(f"✅ Snap counts saved for {team} ({season_display}): {team_snaps.height} records")
         return f"Updated snap counts for {team} ({season_display})"
         
     except Exception as e:
@@ -275,25 +276,28 @@ def check_snap_count_availability(year=None):
     
     for check_year in years_to_check:
         try:
-            import nflreadpy as nfl
             logger.info(f"Checking snap count availability for {check_year}")
-            df = nfl.load_snap_counts(seasons=[check_year])
+            manifest = fetch_raw_dataset('snap_counts', check_year, max_age=AVAILABILITY_MAX_AGE)
             
-            if len(df) > 0:
-                weeks = sorted(df['week'].unique())
-                teams = sorted(df['team'].unique())
+            if manifest['rows'] > 0:
+                # Only the three columns needed are read from the cache
+                df = scan_raw_dataset('snap_counts', check_year).select('week', 'team', 'position')
+                weeks, teams, positions = df.select(
+                    pl.col(col).drop_nulls().unique().sort().implode()
+                    for col in ('week', 'team', 'position')
+                ).collect().row(0)
                 
                 available_years[check_year] = {
                     'available': True,
-                    'total_records': len(df),
+                    'total_records': manifest['rows'],
                     'teams': len(teams),
                     'team_list': teams,
                     'weeks': weeks,
                     'week_range': f"{weeks[0]}-{weeks[-1]}" if weeks else "No weeks",
-                    'positions': sorted(df['position'].unique().tolist())
+                    'positions': positions
                 }
                 
-                logger.info(f"Year {check_year}: {len(df)} records, {len(teams)} teams")
+                logger.info(f"Year {check_year}: {manifest['rows']} records, {len(teams)} teams")
             else:
                 available_years[check_year] = {
                     'available': False,
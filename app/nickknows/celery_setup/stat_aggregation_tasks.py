@@ -1,26 +1,97 @@
 """
 NFL Statistical Aggregation Tasks
-Handles calculation of top 10 leaders and other aggregated statistics
+Handles calculation of top 10 leaders and other aggregated statistics.
+
+Besides the per-board CSVs, calculate_all_stat_leaders publishes a leaders
+bundle: one JSON file with every board already rendered to HTML, so the
+/NFL home page is served without any DataFrame work.
 """
-from nickknows import celery
+from nickknows import celery, metrics
+from nickknows.lazy_imports import lazy_module
 import os
-import pandas as pd
-import numpy as np
+import time
 from celery.utils.log import get_task_logger
 
+from .datasets import dataset_version, publish_csv, write_json_atomic
+from .raw_data_cache import scan_raw_dataset
+
 logger = get_task_logger(__name__)
 
+pd = lazy_module('pandas')
+pl = lazy_module('polars')
+
+# (bundle key, data type, table classes) in the order the home page shows them
+LEADER_BOARDS = [
+    ('pass_agg', 'qb_yards_top10_data', 'table'),
+    ('pass_td_agg', 'qb_tds_top10_data', None),
+    ('rush_yds_agg', 'rb_yds_top10_data', None),
+    ('rush_td_agg', 'rb_tds_top10_data', None),
+    ('rec_yds_agg', 'rec_yds_top10_data', None),
+    ('rec_td_agg', 'rec_tds_top10_data', None),
+]
+
 
 def get_data_path(year, data_type):
     """Get standardized data file path"""
     return os.getcwd() + f'/nickknows/nfl/data/{year}_{data_type}.csv'
 
 
+def get_leaders_bundle_path(year):
+    return os.getcwd() + f'/nickknows/nfl/data/{year}_leaders_bundle.json'
+
+
 def format_nfl_season(year):
     """Format NFL season display name"""
     return f"{year-1}-{year} Season"
 
 
+def build_stat_leaders(year, stat_column, stat_label, top_n=10):
+    """
+    Top N regular-season totals for one player_stats column.
+    Runs as a lazy scan over the raw cache, so only the three columns it
+    needs are read from disk.
+    """
+    return (
+        scan_raw_dataset('player_stats', year)
+        .filter(
+            (pl.col('season_type') == 'REG') &
+            pl.col(stat_column).is_not_null() &
+            pl.col('player_display_name').is_not_null()
+        )
+        .group_by('player_display_name')
+        .agg(pl.col(stat_column).sum())
+        .sort(stat_column, descending=True)
+        .head(top_n)
+        .rename({
+            'player_display_name': 'Player Name',
+            stat_column: stat_label
+        })
+        .collect()
+    )
+
+
+def render_leader_table(df, classes=None):
+    """HTML for one leader board, as the home page shows it"""
+    with metrics.span('styler_render'):
+        return df.style.hide(axis="index").format(precision=0).to_html(classes=classes)
+
+
+def publish_leaders_bundle(year):
+    """
+    Render every published leader board and write them as one JSON bundle:
+    {year, generated_at, sources: {key: dataset version}, tables: {key: html}}.
+    The route checks `sources` against the current versions, so a board
+    republished on its own is never shown stale.
+    """
+    bundle = {'year': year, 'generated_at': time.time(), 'sources': {}, 'tables': {}}
+    for key, data_type, classes in LEADER_BOARDS:
+        path = get_data_path(year, data_type)
+        bundle['sources'][key] = dataset_version(path)
+        bundle['tables'][key] = render_leader_table(pd.read_csv(path, index_col=0), classes)
+    write_json_atomic(bundle, get_leaders_bundle_path(year))
+    return bundle
+
+
 @celery.task(name='nfl.stats.calculate_qb_yards_leaders')
 def calculate_qb_yards_leaders(year):
     """Calculate top 10 QB passing yard leaders"""
@@ -30,33 +101,8 @@ def calculate_qb_yards_leaders(year):
     logger.info(f"Calculating QB yards leaders for {season_display}")
     
     try:
-        # Load player stats
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        # Filter to regular season and QBs with passing yards
-        qb_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['passing_yards'].notna())
-        ].copy()
-        
-        # Group by player and sum passing yards
-        qb_totals = qb_stats.groupby('player_display_name')['passing_yards'].sum().reset_index()
-        
-        # Sort and get top 10
-        qb_totals = qb_totals.sort_values('passing_yards', ascending=False).head(10)
-        
-        # Rename columns for display
-        qb_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'passing_yards': 'Total Passing Yards'
-        }, inplace=True)
-        
-        # Save results
-        qb_totals.to_csv(output_path)
+        qb_totals = build_stat_leaders(year, 'passing_yards', 'Total Passing Yards')
+        publish_csv(qb_totals, output_path)
         logger.info(f"✅ QB yards leaders for {season_display} saved")
         return f"Successfully calculated QB yards leaders for {season_display}"
         
@@ -74,26 +120,8 @@ def calculate_qb_td_leaders(year):
     logger.info(f"Calculating QB TD leaders for {season_display}")
     
     try:
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        qb_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['passing_tds'].notna())
-        ].copy()
-        
-        qb_totals = qb_stats.groupby('player_display_name')['passing_tds'].sum().reset_index()
-        qb_totals = qb_totals.sort_values('passing_tds', ascending=False).head(10)
-        
-        qb_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'passing_tds': "Total Passing TD's"
-        }, inplace=True)
-        
-        qb_totals.to_csv(output_path)
+        qb_totals = build_stat_leaders(year, 'passing_tds', "Total Passing TD's")
+        publish_csv(qb_totals, output_path)
         logger.info(f"✅ QB TD leaders for {season_display} saved")
         return f"Successfully calculated QB TD leaders for {season_display}"
         
@@ -111,26 +139,8 @@ def calculate_rb_yards_leaders(year):
     logger.info(f"Calculating RB yards leaders for {season_display}")
     
     try:
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        rb_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['rushing_yards'].notna())
-        ].copy()
-        
-        rb_totals = rb_stats.groupby('player_display_name')['rushing_yards'].sum().reset_index()
-        rb_totals = rb_totals.sort_values('rushing_yards', ascending=False).head(10)
-        
-        rb_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'rushing_yards': 'Total Rushing Yards'
-        }, inplace=True)
-        
-        rb_totals.to_csv(output_path)
+        rb_totals = build_stat_leaders(year, 'rushing_yards', 'Total Rushing Yards')
+        publish_csv(rb_totals, output_path)
         logger.info(f"✅ RB yards leaders for {season_display} saved")
         return f"Successfully calculated RB yards leaders for {season_display}"
         
@@ -148,26 +158,8 @@ def calculate_rb_td_leaders(year):
     logger.info(f"Calculating RB TD leaders for {season_display}")
     
     try:
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        rb_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['rushing_tds'].notna())
-        ].copy()
-        
-        rb_totals = rb_stats.groupby('player_display_name')['rushing_tds'].sum().reset_index()
-        rb_totals = rb_totals.sort_values('rushing_tds', ascending=False).head(10)
-        
-        rb_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'rushing_tds': "Total Rushing TD's"
-        }, inplace=True)
-        
-        rb_totals.to_csv(output_path)
+        rb_totals = build_stat_leaders(year, 'rushing_tds', "Total Rushing TD's")
+        publish_csv(rb_totals, output_path)
         logger.info(f"✅ RB TD leaders for {season_display} saved")
         return f"Successfully calculated RB TD leaders for {season_display}"
         
@@ -185,26 +177,8 @@ def calculate_rec_yards_leaders(year):
     logger.info(f"Calculating receiving yards leaders for {season_display}")
     
     try:
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        rec_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['receiving_yards'].notna())
-        ].copy()
-        
-        rec_totals = rec_stats.groupby('player_display_name')['receiving_yards'].sum().reset_index()
-        rec_totals = rec_totals.sort_values('receiving_yards', ascending=False).head(10)
-        
-        rec_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'receiving_yards': 'Total Receiving Yards'
-        }, inplace=True)
-        
-        rec_totals.to_csv(output_path)
+        rec_totals = build_stat_leaders(year, 'receiving_yards', 'Total Receiving Yards')
+        publish_csv(rec_totals, output_path)
         logger.info(f"✅ Receiving yards leaders for {season_display} saved")
         return f"Successfully calculated receiving yards leaders for {season_display}"
         
@@ -222,26 +196,8 @@ def calculate_rec_td_leaders(year):
     logger.info(f"Calculating receiving TD leaders for {season_display}")
     
     try:
-        stats_path = get_data_path(year, 'weekly_data')
-        if not os.path.exists(stats_path):
-            raise FileNotFoundError(f"Player stats not found for {year}")
-        
-        player_stats = pd.read_csv(stats_path, index_col=0)
-        
-        rec_stats = player_stats[
-            (player_stats['season_type'] == 'REG') &
-            (player_stats['receiving_tds'].notna())
-        ].copy()
-        
-        rec_totals = rec_stats.groupby('player_display_name')['receiving_tds'].sum().reset_index()
-        rec_totals = rec_totals.sort_values('receiving_tds', ascending=False).head(10)
-        
-        rec_totals.rename(columns={
-            'player_display_name': 'Player Name',
-            'receiving_tds': "Total Receiving TD's"
-        }, inplace=True)
-        
-        rec_totals.to_csv(output_path)
+        rec_totals = build_stat_leaders(year, 'receiving_tds', "Total Receiving TD's")
+        publish_csv(rec_totals, output_path)
         logger.info(f"✅ Receiving TD leaders for {season_display} saved")
         return f"Successfully calculated receiving TD leaders for {season_display}"
         
@@ -270,6 +226,8 @@ def calculate_all_stat_leaders(year):
         results['leaders']['rb_tds'] = calculate_rb_td_leaders(year)
         results['leaders']['rec_yards'] = calculate_rec_yards_leaders(year)
         results['leaders']['rec_tds'] = calculate_rec_td_leaders(year)
+
+        publish_leaders_bundle(year)
         
         logger.info(f"✅ All stat leaders calculated for {season_display}")
         return results
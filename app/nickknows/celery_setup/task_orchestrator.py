@@ -5,29 +5,46 @@ Main entry points for coordinating multi-step data updates
 from nickknows import celery
 from celery import chain, chord, group
 from celery.utils.log import get_task_logger
+import json
+import os
 import time
 
+from .job_status import job_complete, job_failed, job_stage_started
+from .redis_state import get_redis
+from .routing import BULK_PRIORITY
+
 logger = get_task_logger(__name__)
 
+# Multi-season backfill settings
+BACKFILL_KEY_PREFIX = 'nfl:backfill'
+BACKFILL_MAX_CONCURRENT_SEASONS = int(os.environ.get('NFL_BACKFILL_MAX_CONCURRENT', '2'))
+BACKFILL_STATE_TTL = 14 * 24 * 60 * 60  # keep progress around long enough to resume
+BACKFILL_LOCK_TIMEOUT = 30
+# A season still 'running' this long after launch is taken to be lost (worker
+# restarted, completion marker never ran) and is retried on resume
+BACKFILL_SEASON_TIMEOUT = int(os.environ.get('NFL_BACKFILL_SEASON_TIMEOUT', str(6 * 60 * 60)))
+
 
 def format_nfl_season(year):
     """Format NFL season display name"""
     return f"{year-1}-{year} Season"
 
 
-@celery.task(name='nfl.orchestrator.update_full_season')
-def update_full_season_data(year):
+# Stages of the full season workflow, as reported to job status
+FULL_SEASON_STAGES = ('core_data', 'stat_leaders', 'team_fpa', 'opportunities')
+
+
+def build_full_season_workflow(year, job_id=None):
     """
-    Complete season data update workflow
+    Build (but don't send) the full season workflow
     1. Core data (PBP, rosters, schedules, player stats, snap counts)
     2. Statistical aggregations (top 10 leaders)
     3. Team analysis (FPA for all teams)
     4. Opportunity tracking
-    """
-    season_display = format_nfl_season(year)
-    logger.info(f"Starting full season update for {season_display}")
     
-    # Import task modules
+    With a job_id, marker tasks record each stage (FULL_SEASON_STAGES) on
+    the job as it starts; the caller adds the job_failed errback.
+    """
     from .core_data_tasks import (
         update_pbp_data,
         update_roster_data,
@@ -39,8 +56,7 @@ def update_full_season_data(year):
     from .team_analysis_tasks import update_all_team_fpa
     from .opportunity_tasks import calculate_opportunity_data
     
-    # Create workflow
-    workflow = chain(
+    steps = [
         # Step 1: Core data (parallel)
         group(
             update_pbp_data.si(year),
@@ -58,9 +74,26 @@ def update_full_season_data(year):
         
         # Step 4: Opportunity tracking (depends on PBP and rosters)
         calculate_opportunity_data.si(year)
-    )
+    ]
+    if job_id is None:
+        return chain(*steps)
+    
+    workflow = []
+    for stage, step in zip(FULL_SEASON_STAGES, steps):
+        workflow += [job_stage_started.si(job_id, stage), step]
+    return chain(*workflow, job_complete.si(job_id))
+
+
+@celery.task(name='nfl.orchestrator.update_full_season')
+def update_full_season_data(year, job_id=None):
+    """Complete season data update workflow (see build_full_season_workflow)"""
+    season_display = format_nfl_season(year)
+    logger.info(f"Starting full season update for {season_display}")
     
     # Execute workflow
+    workflow = build_full_season_workflow(year, job_id)
+    if job_id is not None:
+        workflow.on_error(job_failed.si(job_id))
     result = workflow.apply_async()
     
     logger.info(f"Full season update workflow started for {season_display}")
@@ -68,6 +101,7 @@ def update_full_season_data(year):
         'year': year,
         'season_display': season_display,
         'task_id': result.id,
+        'job_id': job_id,
         'message': f"Full update workflow initiated for {season_display}"
     }
 
@@ -286,35 +320,193 @@ def system_health_check(year):
     return health_status
 
 
+def _backfill_key(start_year, end_year):
+    """Redis hash holding per-season progress for one backfill range"""
+    return f"{BACKFILL_KEY_PREFIX}:{start_year}-{end_year}"
+
+
+def _season_priority(year, end_year):
+    """
+    Newest seasons go first. The Redis transport treats 0 as the highest
+    priority; backfills stay in the bulk range below interactive work, so
+    the most recent season gets BULK_PRIORITY and older ones count up to 9.
+    """
+    return min(9, BULK_PRIORITY + max(0, end_year - year))
+
+
+def _read_backfill_state(key):
+    """Decode the backfill hash into (config, {year: season_state})"""
+    raw = get_redis().hgetall(key)
+    config = json.loads(raw.pop('_config', '{}'))
+    seasons = {int(year): json.loads(value) for year, value in raw.items()}
+    return config, seasons
+
+
+def _write_season_state(key, year, season_state):
+    r = get_redis()
+    r.hset(key, str(year), json.dumps(season_state))
+    r.expire(key, BACKFILL_STATE_TTL)
+
+
+def _summarize_backfill(key, config, seasons):
+    counts = {'pending': 0, 'running': 0, 'complete': 0, 'failed': 0}
+    for season_state in seasons.values():
+        counts[season_state['status']] = counts.get(season_state['status'], 0) + 1
+    return {
+        'backfill_id': key,
+        'start_year': config.get('start_year'),
+        'end_year': config.get('end_year'),
+        'max_concurrent': config.get('max_concurrent'),
+        'counts': counts,
+        'done': counts['pending'] == 0 and counts['running'] == 0,
+        'seasons': {year: seasons[year] for year in sorted(seasons)}
+    }
+
+
+def _pump_backfill(key):
+    """
+    Launch pending seasons until the concurrency window is full.
+    Called when a backfill starts and whenever a season finishes, so the next
+    season goes out as soon as a slot frees up - no sleeps, no blocked worker.
+    """
+    r = get_redis()
+    launched = []
+    with r.lock(f"{key}:lock", timeout=BACKFILL_LOCK_TIMEOUT, blocking_timeout=BACKFILL_LOCK_TIMEOUT):
+        config, seasons = _read_backfill_state(key)
+        if not config:
+            logger.warning(f"Backfill {key} has no state; nothing to schedule")
+            return launched
+        
+        running = sum(1 for s in seasons.values() if s['status'] == 'running')
+        free_slots = config['max_concurrent'] - running
+        pending = sorted(
+            (year for year, s in seasons.items() if s['status'] == 'pending'),
+            reverse=True
+        )
+        
+        for year in pending[:max(0, free_slots)]:
+            workflow = chain(
+                build_full_season_workflow(year),
+                backfill_season_complete.si(key, year)
+            )
+            # Errbacks with more than one argument run inline on the failing
+            # worker, so the failure is recorded even if the queue is backed up.
+            workflow.on_error(backfill_season_failed.si(key, year))
+            result = workflow.apply_async(priority=_season_priority(year, config['end_year']))
+            
+            _write_season_state(key, year, {
+                'status': 'running',
+                'task_id': result.id,
+                'attempts': seasons[year].get('attempts', 0) + 1,
+                'started_at': time.time(),
+                'finished_at': None,
+                'error': None
+            })
+            launched.append(year)
+            logger.info(f"Backfill {key}: launched {format_nfl_season(year)} ({result.id})")
+    return launched
+
+
+@celery.task(name='nfl.orchestrator.backfill_season_complete')
+def backfill_season_complete(backfill_key, year):
+    """Mark a backfill season as finished and start the next pending one"""
+    _, seasons = _read_backfill_state(backfill_key)
+    season_state = seasons.get(year, {})
+    season_state.update({'status': 'complete', 'finished_at': time.time(), 'error': None})
+    _write_season_state(backfill_key, year, season_state)
+    logger.info(f"Backfill {backfill_key}: {format_nfl_season(year)} complete")
+    
+    launched = _pump_backfill(backfill_key)
+    return {'year': year, 'status': 'complete', 'launched': launched}
+
+
+@celery.task(name='nfl.orchestrator.backfill_season_failed')
+def backfill_season_failed(backfill_key, year):
+    """Record a failed backfill season; a later resume will retry it"""
+    _, seasons = _read_backfill_state(backfill_key)
+    season_state = seasons.get(year, {})
+    # A chain can report several failing steps - only the first one counts.
+    if season_state.get('status') != 'running':
+        return {'year': year, 'status': season_state.get('status')}
+    season_state.update({
+        'status': 'failed',
+        'finished_at': time.time(),
+        'error': 'Season workflow failed; see task logs'
+    })
+    _write_season_state(backfill_key, year, season_state)
+    logger.error(f"❌ Backfill {backfill_key}: {format_nfl_season(year)} failed")
+    
+    launched = _pump_backfill(backfill_key)
+    return {'year': year, 'status': 'failed', 'launched': launched}
+
+
 @celery.task(name='nfl.orchestrator.multi_year_update')
-def update_multiple_years(start_year, end_year):
+def update_multiple_years(start_year, end_year, max_concurrent=None, resume=True):
     """
-    Update data for multiple years sequentially
-    Useful for backfilling historical data
+    Backfill several seasons as a windowed workflow
+    
+    At most `max_concurrent` seasons run at once (newest first, sent with a
+    higher broker priority). Progress is kept in Redis per season, so calling
+    this again for the same range with resume=True skips completed seasons,
+    retries failed ones and leaves in-flight ones alone - unless they were
+    started over BACKFILL_SEASON_TIMEOUT ago, which counts as failed.
+    resume=False starts over.
     """
-    logger.info(f"Starting multi-year update: {start_year} to {end_year}")
-    
-    years = range(start_year, end_year + 1)
-    results = []
-    
-    for year in years:
-        logger.info(f"Scheduling update for {year}")
-        result = update_full_season_data.delay(year)
-        results.append({
-            'year': year,
-            'task_id': result.id
-        })
+    if max_concurrent is None:
+        max_concurrent = BACKFILL_MAX_CONCURRENT_SEASONS
+    max_concurrent = max(1, int(max_concurrent))
+    
+    key = _backfill_key(start_year, end_year)
+    logger.info(f"Starting multi-year backfill: {start_year} to {end_year} "
+                f"({max_concurrent} season(s) at a time)")
+    
+    r = get_redis()
+    with r.lock(f"{key}:lock", timeout=BACKFILL_LOCK_TIMEOUT, blocking_timeout=BACKFILL_LOCK_TIMEOUT):
+        _, seasons = _read_backfill_state(key) if resume else ({}, {})
+        now = time.time()
+        
+        for year in range(start_year, end_year + 1):
+            season_state = seasons.get(year)
+            if season_state and season_state['status'] == 'running':
+                if now - (season_state.get('started_at') or 0) < BACKFILL_SEASON_TIMEOUT:
+                    continue
+                logger.warning(f"❌ Backfill {key}: {format_nfl_season(year)} has been running since "
+                               f"{season_state.get('started_at')}; treating it as failed")
+            elif season_state and season_state['status'] == 'complete':
+                continue
+            _write_season_state(key, year, {
+                'status': 'pending',
+                'task_id': None,
+                'attempts': (season_state or {}).get('attempts', 0),
+                'started_at': None,
+                'finished_at': None,
+                'error': None
+            })
         
-        # Add delay between years to avoid overwhelming the system
-        time.sleep(5)
+        config = {'start_year': start_year, 'end_year': end_year, 'max_concurrent': max_concurrent}
+        r.hset(key, '_config', json.dumps(config))
+        r.expire(key, BACKFILL_STATE_TTL)
     
-    return {
-        'start_year': start_year,
-        'end_year': end_year,
-        'years_updated': len(results),
-        'results': results,
-        'message': f"Multi-year update initiated for {start_year}-{end_year}"
-    }
+    launched = _pump_backfill(key)
+    
+    config, seasons = _read_backfill_state(key)
+    status = _summarize_backfill(key, config, seasons)
+    status['launched'] = launched
+    status['message'] = f"Multi-year backfill running for {start_year}-{end_year}"
+    return status
+
+
+@celery.task(name='nfl.orchestrator.backfill_status')
+def get_backfill_status(start_year, end_year):
+    """Per-season progress for a multi-year backfill"""
+    key = _backfill_key(start_year, end_year)
+    config, seasons = _read_backfill_state(key)
+    if not config:
+        return {
+            'backfill_id': key,
+            'error': f"No backfill recorded for {start_year}-{end_year}"
+        }
+    return _summarize_backfill(key, config, seasons)
 
 
 # Convenience wrappers for backwards compatibility
@@ -68,7 +68,8 @@ from .task_orchestrator import (
     update_opportunities_only,
     update_snap_counts_only,
     system_health_check,
-    update_multiple_years
+    update_multiple_years,
+    get_backfill_status
 )
 
 # Backwards compatibility aliases for old function names
@@ -140,6 +141,7 @@ __all__ = [
     'update_snap_counts_only',
     'system_health_check',
     'update_multiple_years',
+    'get_backfill_status',
     
     # Old names (for backwards compatibility)
     'update_PBP_data',
@@ -2,18 +2,25 @@
 NFL Team Analysis Tasks
 Handles team-specific data processing, FPA calculations, and visualizations
 """
-from nickknows import celery
+from nickknows import celery, metrics
+from nickknows.lazy_imports import lazy_module
 import os
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from celery import chain, chord
 from celery.utils.log import get_task_logger
 
+from .datasets import publish_csv
+from .job_status import job_complete, job_failed, job_stage_started
+
 logger = get_task_logger(__name__)
 
+pd = lazy_module('pandas')
+np = lazy_module('numpy')
+
 SITE_DOMAIN = "https://www.nickknows.net"
 
+# Stages of update_all_team_fpa, as reported to job status
+ALL_TEAM_FPA_STAGES = ('team_fpa',)
+
 
 def get_data_path(year, data_type):
     """Get standardized data file path"""
@@ -66,7 +73,7 @@ def update_team_schedule(team, year):
         
         # Save team schedule
         output_path = get_team_data_path(team, year, 'schedule')
-        team_schedule.to_csv(output_path)
+        publish_csv(team_schedule, output_path)
         
         logger.info(f"✅ Team schedule for {team} ({season_display}) saved")
         return f"Successfully updated schedule for {team} ({season_display})"
@@ -170,7 +177,7 @@ def update_weekly_team_data(team, year):
         
         # Save team data
         output_path = get_team_data_path(team, year, 'data')
-        weekly_team_data.to_csv(output_path)
+        publish_csv(weekly_team_data, output_path)
         
         logger.info(f"✅ Weekly team data for {team} ({season_display}) saved to {output_path}")
         logger.info(f"Processed {len(weekly_team_data)} player-week records")
@@ -222,8 +229,14 @@ def process_team_fpa(team, year):
         raise
 
 
+@metrics.timed('matplotlib')
 def generate_team_fpa_plots(team, team_data, year):
     """Generate FPA visualization plots for a team"""
+    # Imported here so web processes that load this module never pay for it
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     positions = {
         'QB': team_data[team_data['position'] == 'QB'],
         'RB': team_data[team_data['position'] == 'RB'],
@@ -238,7 +251,7 @@ def generate_team_fpa_plots(team, team_data, year):
     WIDTH = 10
     
     # Create plots directory
-    plots_dir = f'/NickKnows/app/nickknows/static/images/{team}/'
+    plots_dir = os.getcwd() + f'/nickknows/static/images/{team}/'
     os.makedirs(plots_dir, exist_ok=True)
     
     for pos, data in positions.items():
@@ -280,8 +293,11 @@ def generate_team_fpa_plots(team, team_data, year):
 
 
 @celery.task(name='nfl.team.update_all_team_fpa')
-def update_all_team_fpa(year):
-    """Update FPA data for all teams"""
+def update_all_team_fpa(year, job_id=None):
+    """
+    Update FPA data for all teams. With a job_id (start_job with
+    ALL_TEAM_FPA_STAGES), the job stays running until the summary is saved.
+    """
     season_display = format_nfl_season(year)
     logger.info(f"Starting FPA update for all teams ({season_display})")
     
@@ -304,7 +320,15 @@ def update_all_team_fpa(year):
         )
     
     # Execute in parallel and aggregate results
-    chord(team_chains)(save_fpa_summary.s(year))
+    workflow = chord(team_chains, save_fpa_summary.s(year))
+    if job_id is not None:
+        workflow = chain(
+            job_stage_started.si(job_id, ALL_TEAM_FPA_STAGES[0]),
+            workflow,
+            job_complete.si(job_id)
+        )
+        workflow.on_error(job_failed.si(job_id))
+    workflow.apply_async()
     
     logger.info(f"Scheduled FPA updates for all teams ({season_display})")
     return f"FPA update scheduled for all teams ({season_display})"
@@ -319,7 +343,7 @@ def save_fpa_summary(results, year):
     try:
         fpa_path = get_data_path(year, 'FPA')
         df = pd.DataFrame(results)
-        df.to_csv(fpa_path)
+        publish_csv(df, fpa_path)
         
         logger.info(f"FPA data for {len(results)} teams saved for {season_display}")
         return f"Updated FPA data for {len(results)} teams ({season_display})"
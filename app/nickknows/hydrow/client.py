@@ -8,18 +8,25 @@ and uses them to make read-only data calls against the Hydrow API.
 import hashlib
 import hmac
 import os
+import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 BROKER_URL = os.environ.get("HYDROW_BROKER_URL", "http://hydrow-broker")
 BROKER_HMAC_SECRET = os.environ.get("HYDROW_BROKER_HMAC_SECRET", "")
 HYDROW_API_BASE = "https://v2.api.prod.hydrow-external.net"
 FEATURE_FLAGS = "new-music,preferences-filter,top-left,single-sets"
 REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 3.05
+HTTP_POOL_SIZE = int(os.environ.get("HYDROW_HTTP_POOL_SIZE", "8"))
 TOKEN_LEEWAY_SECONDS = 5 * 60
 
+log = logging.getLogger(__name__)
+
 _lock = threading.Lock()
 _token_cache = {"access_token": None, "expires_at": 0.0, "rower_id": None}
 
@@ -28,6 +35,21 @@ class HydrowError(RuntimeError):
     """Raised when the broker or the Hydrow API cannot satisfy a request."""
 
 
+def _make_session(scheme):
+    """Keep-alive session with a bounded connection pool (one per upstream)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+    session.mount(f"{scheme}://", adapter)
+    return session
+
+
+# Reused across requests so calls skip the TCP/TLS handshake.
+_broker_http = _make_session(BROKER_URL.split("://", 1)[0])
+_api_http = _make_session("https")
+# fetch_stats fans its reads out here; sized to match the API connection pool
+_executor = ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix="hydrow-fetch")
+
+
 def _sign(timestamp, body):
     msg = f"{timestamp}\n{body}".encode("utf-8")
     return hmac.new(BROKER_HMAC_SECRET.encode("utf-8"), msg, hashlib.sha256).hexdigest()
@@ -51,11 +73,11 @@ def _fetch_token_from_broker():
         "X-Broker-Signature": _sign(timestamp, body),
     }
     try:
-        resp = requests.post(
+        resp = _broker_http.post(
             f"{BROKER_URL}/token",
             headers=headers,
             data=body,
-            timeout=REQUEST_TIMEOUT,
+            timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT),
         )
     except requests.RequestException as exc:
         raise HydrowError(f"broker unreachable: {exc}") from exc
@@ -92,17 +114,20 @@ def _get(path):
     with _lock:
         _ensure_token()
         rower_id = _token_cache["rower_id"]
+        used_token = _token_cache["access_token"]
         headers = _auth_headers()
 
     url = f"{HYDROW_API_BASE}{path}"
-    resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    resp = _api_http.get(url, headers=headers, timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT))
     if resp.status_code == 401:
         with _lock:
-            _token_cache["access_token"] = None
+            # Concurrent calls that hit the same 401 share one new token.
+            if _token_cache["access_token"] == used_token:
+                _token_cache["access_token"] = None
             _ensure_token()
             headers = _auth_headers()
             rower_id = _token_cache["rower_id"]
-        resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        resp = _api_http.get(url, headers=headers, timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT))
     if resp.status_code >= 400:
         # Hydrow error bodies can echo identifiers; log status only.
         raise HydrowError(f"GET {path} failed: status={resp.status_code}")
@@ -110,18 +135,33 @@ def _get(path):
 
 
 def fetch_stats(today_iso):
-    """Fetch summary, personal records, and recent progress."""
+    """Fetch summary, personal records, and recent progress.
+
+    The three reads run concurrently on one token. A failed read comes back
+    as None with its error under "errors"; HydrowError is raised only when
+    every read fails.
+    """
     with _lock:
         _ensure_token()
         rower_id = _token_cache["rower_id"]
     if not rower_id:
         raise HydrowError("broker did not return a rower id")
 
-    summary, _ = _get(f"/progress/{rower_id}/summary")
-    recent, _ = _get(f"/rower/{rower_id}/v2/progress?today={today_iso}")
-    profile, _ = _get(f"/rower/{rower_id}")
-    return {
-        "summary": summary,
-        "recent": recent,
-        "profile": profile,
+    paths = {
+        "summary": f"/progress/{rower_id}/summary",
+        "recent": f"/rower/{rower_id}/v2/progress?today={today_iso}",
+        "profile": f"/rower/{rower_id}",
     }
+    futures = {name: _executor.submit(_get, path) for name, path in paths.items()}
+
+    results = {"errors": {}}
+    for name, future in futures.items():
+        try:
+            results[name], _ = future.result()
+        except Exception as exc:  # noqa: BLE001 — isolate each endpoint
+            log.warning("hydrow %s fetch failed: %s", name, exc)
+            results[name] = None
+            results["errors"][name] = str(exc)
+    if len(results["errors"]) == len(paths):
+        raise HydrowError(f"all Hydrow reads failed: {results['errors']}")
+    return results
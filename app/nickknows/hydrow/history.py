@@ -0,0 +1,196 @@
+"""
+Local Hydrow workout history.
+
+Workouts are synced incrementally into a SQLite file on the data volume, and
+streaks, rolling distance and personal records are answered from that file.
+The store takes workouts from whatever source sync_workouts() is given, in
+one fixed shape (see _normalize); there is no live source yet - the Hydrow
+workout list endpoint isn't one this app has confirmed, so nothing calls
+the sync until a client for it is pinned against a recorded response.
+
+Only whitelisted numeric fields are stored — never the raw source payload,
+which can carry identifiers.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, timedelta
+
+HISTORY_DB_PATH = os.environ.get(
+    "HYDROW_HISTORY_DB",
+    os.path.join(os.getcwd(), "nickknows", "nfl", "data", "hydrow", "workouts.sqlite3"),
+)
+# First sync starts here and walks forward one window at a time
+HISTORY_START = os.environ.get("HYDROW_HISTORY_START", "2019-01-01")
+SYNC_WINDOW_DAYS = 90
+# Re-read the cursor day and the one before it: late-uploaded workouts land there
+SYNC_OVERLAP_DAYS = 1
+
+CURSOR_KEY = "cursor"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    workout_id   TEXT PRIMARY KEY,
+    workout_date TEXT NOT NULL,
+    started_at   TEXT,
+    meters       REAL,
+    seconds      REAL,
+    calories     REAL
+);
+CREATE INDEX IF NOT EXISTS workouts_by_date ON workouts (workout_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Writes come from one sync at a time; this guards threads within a process
+_write_lock = threading.Lock()
+
+
+def _connect(db_path=None):
+    path = db_path or HISTORY_DB_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize(workout):
+    """
+    Workout dict -> row tuple, or None if it has no id or start time.
+    Sources map their payloads to {"id", "started_at" (ISO 8601), "meters",
+    "seconds", "calories"}; the numbers may be strings or missing.
+    """
+    workout_id = workout.get("id")
+    started_at = workout.get("started_at")
+    if workout_id is None or not started_at:
+        return None
+    return (
+        str(workout_id),
+        str(started_at)[:10],
+        str(started_at),
+        _number(workout.get("meters")),
+        _number(workout.get("seconds")),
+        _number(workout.get("calories")),
+    )
+
+
+def get_cursor(db_path=None):
+    """Last date fully synced (ISO string), or None before the first sync"""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (CURSOR_KEY,)).fetchone()
+    return row[0] if row else None
+
+
+def sync_workouts(fetch, today=None, db_path=None):
+    """
+    Pull workouts from the cursor up to today and upsert them.
+
+    fetch(start_iso, end_iso) returns the workouts between two dates
+    (inclusive) as dicts in the shape _normalize takes. The cursor only
+    moves after a window is committed, so an interrupted sync resumes where
+    it stopped. Returns {"windows", "upserted", "cursor"}.
+    """
+    today = today or date.today()
+    stats = {"windows": 0, "upserted": 0, "cursor": None}
+
+    with _write_lock, closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (CURSOR_KEY,)).fetchone()
+        if row:
+            start = date.fromisoformat(row[0]) - timedelta(days=SYNC_OVERLAP_DAYS)
+        else:
+            start = date.fromisoformat(HISTORY_START)
+
+        while start <= today:
+            end = min(start + timedelta(days=SYNC_WINDOW_DAYS - 1), today)
+            rows = [r for r in map(_normalize, fetch(start.isoformat(), end.isoformat())) if r]
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO workouts "
+                    "(workout_id, workout_date, started_at, meters, seconds, calories) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                    (CURSOR_KEY, end.isoformat()),
+                )
+            stats["windows"] += 1
+            stats["upserted"] += len(rows)
+            stats["cursor"] = end.isoformat()
+            start = end + timedelta(days=1)
+    return stats
+
+
+# ── Queries ─────────────────────────────────────────────────────────────────────
+
+def daily_totals(start, end, db_path=None):
+    """[(date, workouts, meters, seconds, calories)] for each active day in [start, end]"""
+    with closing(_connect(db_path)) as conn:
+        return conn.execute(
+            "SELECT workout_date, COUNT(*), COALESCE(SUM(meters), 0), "
+            "COALESCE(SUM(seconds), 0), COALESCE(SUM(calories), 0) "
+            "FROM workouts WHERE workout_date BETWEEN ? AND ? "
+            "GROUP BY workout_date ORDER BY workout_date",
+            (start.isoformat(), end.isoformat()),
+        ).fetchall()
+
+
+def rolling_distance(days, end=None, db_path=None):
+    """Meters rowed in the `days` days ending on `end` (inclusive)"""
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+    with closing(_connect(db_path)) as conn:
+        (meters,) = conn.execute(
+            "SELECT COALESCE(SUM(meters), 0) FROM workouts WHERE workout_date BETWEEN ? AND ?",
+            (start.isoformat(), end.isoformat()),
+        ).fetchone()
+    return meters
+
+
+def streaks(today=None, db_path=None):
+    """{"current": days, "longest": days} of consecutive active days.
+    A streak still counts as current if today has no workout yet."""
+    today = today or date.today()
+    with closing(_connect(db_path)) as conn:
+        active = [date.fromisoformat(d) for (d,) in conn.execute(
+            "SELECT DISTINCT workout_date FROM workouts ORDER BY workout_date")]
+
+    longest = run = 0
+    previous = None
+    for day in active:
+        run = run + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous and today - previous <= timedelta(days=1) else 0
+    return {"current": current, "longest": longest}
+
+
+def personal_records(db_path=None):
+    """Best single workout by distance, time and calories, plus the biggest day.
+    Each is {"value", "date"} or None when there's no history."""
+    queries = {
+        "longest_row": "SELECT meters, workout_date FROM workouts "
+                       "WHERE meters IS NOT NULL ORDER BY meters DESC LIMIT 1",
+        "longest_session": "SELECT seconds, workout_date FROM workouts "
+                           "WHERE seconds IS NOT NULL ORDER BY seconds DESC LIMIT 1",
+        "most_calories": "SELECT calories, workout_date FROM workouts "
+                         "WHERE calories IS NOT NULL ORDER BY calories DESC LIMIT 1",
+        "biggest_day": "SELECT SUM(meters) AS total, workout_date FROM workouts "
+                       "GROUP BY workout_date HAVING total IS NOT NULL ORDER BY total DESC LIMIT 1",
+    }
+    records = {}
+    with closing(_connect(db_path)) as conn:
+        for name, sql in queries.items():
+            row = conn.execute(sql).fetchone()
+            records[name] = {"value": row[0], "date": row[1]} if row else None
+    return records
@@ -0,0 +1,37 @@
+"""
+Background refresh of the /hydrow-stats cache.
+
+Celery beat refreshes the hydrow:stats:* cache ahead of CACHE_TTL_SECONDS, and the
+route enqueues an on-demand refresh when it finds the cache missing or old.
+Either way the Hydrow fetch happens on a worker, never inside a request.
+"""
+from celery.utils.log import get_task_logger
+
+from nickknows import celery
+
+logger = get_task_logger(__name__)
+
+# Comfortably inside the 10 minute CACHE_TTL_SECONDS, so the cache is renewed
+# before the route would consider it old.
+REFRESH_INTERVAL_SECONDS = 8 * 60
+
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    'hydrow-refresh-stats': {
+        'task': 'hydrow.refresh_stats',
+        'schedule': REFRESH_INTERVAL_SECONDS,
+        # A missed run is superseded by the next one
+        'options': {'expires': REFRESH_INTERVAL_SECONDS},
+    },
+}
+
+
+@celery.task(name='hydrow.refresh_stats')
+def refresh_stats(lock_token=None):
+    """Fetch from Hydrow and rewrite the stats cache (single-flighted)"""
+    # Imported here: the views module imports this one to enqueue refreshes
+    from nickknows.hydrow.views import refresh_stats_cache
+
+    result = refresh_stats_cache(lock_token)
+    logger.info(f"Hydrow stats refresh: {result}")
+    return result
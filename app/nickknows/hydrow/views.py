@@ -1,6 +1,7 @@
 import json
 import os
 import time
+import uuid
 from datetime import date
 
 import redis
@@ -8,9 +9,28 @@ from flask import render_template
 
 from nickknows import app
 from nickknows.hydrow import client
-
-CACHE_KEY = "hydrow:stats:cache"
+from nickknows.hydrow.tasks import refresh_stats
+
+# The view model is cached as small per-fragment keys, so the home tile can
+# read the profile alone. fetched_at is written with them in one transaction.
+FETCHED_AT_KEY = "hydrow:stats:fetched_at"
+FRAGMENT_KEYS = {
+    "profile": "hydrow:stats:profile",
+    "lifetime_cards": "hydrow:stats:lifetime_cards",
+    "recent_periods": "hydrow:stats:recent_periods",
+    # streak_weeks, active_days_count, active_days_lookback
+    "activity": "hydrow:stats:activity",
+}
 CACHE_TTL_SECONDS = 10 * 60
+# Past this age the page says it's showing old numbers
+STALE_AFTER_SECONDS = 3 * CACHE_TTL_SECONDS
+# One refresh in flight at a time, across web pods, beat and workers
+REFRESH_LOCK_KEY = "hydrow:stats:refresh_lock"
+REFRESH_LOCK_TTL = 60
+# A refresh enqueued by the web tier is dropped by Celery (expires=) if it
+# hasn't started by then, and the lock it holds outlasts that wait plus a
+# run - so the lock can't lapse while its task is still queued or running.
+REFRESH_QUEUE_WAIT = 4 * 60
 
 _redis = redis.Redis(
     host=os.environ.get("REDIS_ENV", "redis"),
@@ -20,6 +40,12 @@ _redis = redis.Redis(
     socket_connect_timeout=2,
 )
 
+# Delete the lock only if we still own it
+_release_lock = _redis.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
 
 def _to_number(value):
     """Hydrow returns numbers as strings (e.g. "11523"). Coerce."""
@@ -146,57 +172,125 @@ def _build_view_model(raw):
     }
 
 
+# fragment name -> (fetched_at, decoded value), per process
+_fragment_memo = {}
+
+
 def get_cached_profile():
     """Read the cached profile from Redis without triggering a Hydrow fetch.
     Used by the home page tile so the home render never blocks on Hydrow."""
-    cached = _read_cache()
+    cached = _read_cache(["profile"])
     if not cached:
         return None
-    vm = cached.get("view_model") or {}
-    return vm.get("profile")
+    return cached["view_model"].get("profile")
+
 
+def _read_cache(fragments=tuple(FRAGMENT_KEYS)):
+    """{"fetched_at", "view_model"} for the requested fragments, or None.
 
-def _read_cache():
+    Only fetched_at is read on every call. Fragments are fetched and decoded
+    again only when it has moved since this process last saw them.
+    """
     try:
-        raw = _redis.get(CACHE_KEY)
+        fetched_at = _redis.get(FETCHED_AT_KEY)
+        if fetched_at is None:
+            return None
+        outdated = [name for name in fragments
+                    if _fragment_memo.get(name, (None,))[0] != fetched_at]
+        raws = _redis.mget([FRAGMENT_KEYS[name] for name in outdated]) if outdated else []
     except redis.RedisError as exc:
         app.logger.warning("hydrow cache read failed: %s", exc)
         return None
-    if not raw:
-        return None
-    try:
-        return json.loads(raw)
-    except (TypeError, json.JSONDecodeError):
-        return None
+    for name, raw in zip(outdated, raws):
+        try:
+            value = json.loads(raw) if raw else None
+        except (TypeError, json.JSONDecodeError):
+            value = None
+        _fragment_memo[name] = (fetched_at, value)
+
+    view_model = {}
+    for name in fragments:
+        value = _fragment_memo[name][1]
+        if name == "activity":
+            view_model.update(value or {})
+        else:
+            view_model[name] = value
+    return {"fetched_at": float(fetched_at), "view_model": view_model}
 
 
 def _write_cache(view_model):
-    payload = json.dumps({"fetched_at": time.time(), "view_model": view_model})
+    fragments = {
+        "profile": view_model.get("profile"),
+        "lifetime_cards": view_model.get("lifetime_cards"),
+        "recent_periods": view_model.get("recent_periods"),
+        "activity": {
+            "streak_weeks": view_model.get("streak_weeks"),
+            "active_days_count": view_model.get("active_days_count"),
+            "active_days_lookback": view_model.get("active_days_lookback"),
+        },
+    }
     try:
         # No Redis TTL — we keep the last-good payload indefinitely so we can
         # serve it stale on broker errors. Freshness is decided by fetched_at.
-        _redis.set(CACHE_KEY, payload)
+        pipe = _redis.pipeline(transaction=True)
+        for name, value in fragments.items():
+            pipe.set(FRAGMENT_KEYS[name], json.dumps(value))
+        pipe.set(FETCHED_AT_KEY, repr(time.time()))
+        pipe.execute()
     except redis.RedisError as exc:
         app.logger.warning("hydrow cache write failed: %s", exc)
 
 
+def refresh_stats_cache(lock_token=None):
+    """Fetch from Hydrow and rewrite the cache. Runs on a Celery worker.
+
+    lock_token is passed when the web tier already took the refresh lock
+    while enqueuing this refresh; otherwise the lock is taken here, and the
+    refresh is skipped if another one is in flight.
+    """
+    token = lock_token or uuid.uuid4().hex
+    if lock_token is None and not _redis.set(REFRESH_LOCK_KEY, token, nx=True, ex=REFRESH_LOCK_TTL):
+        return "skipped: refresh already in flight"
+    try:
+        raw = client.fetch_stats(date.today().isoformat())
+        if raw["errors"] and _read_cache(()):
+            # A partial refresh shouldn't replace a complete cached copy
+            raise client.HydrowError(f"partial fetch: {sorted(raw['errors'])}")
+        _write_cache(_build_view_model(raw))
+        return "refreshed"
+    finally:
+        _release_lock(keys=[REFRESH_LOCK_KEY], args=[token])
+
+
+def _request_refresh():
+    """Enqueue an on-demand refresh unless one is already in flight."""
+    token = uuid.uuid4().hex
+    try:
+        if not _redis.set(REFRESH_LOCK_KEY, token, nx=True, ex=REFRESH_QUEUE_WAIT + REFRESH_LOCK_TTL):
+            return
+    except redis.RedisError as exc:
+        app.logger.warning("hydrow refresh lock failed: %s", exc)
+        return
+    try:
+        refresh_stats.apply_async((token,), expires=REFRESH_QUEUE_WAIT)
+    except Exception as exc:  # noqa: BLE001 — the page still renders from cache
+        app.logger.warning("hydrow refresh enqueue failed: %s", exc)
+        _release_lock(keys=[REFRESH_LOCK_KEY], args=[token])
+
+
 def _get_cached_stats():
-    """Returns (view_model, error_message, stale_flag)."""
+    """Returns (view_model, error_message, stale_flag). Never calls Hydrow:
+    a missing or old cache only enqueues a background refresh."""
     cached = _read_cache()
-    if cached and (time.time() - cached.get("fetched_at", 0)) < CACHE_TTL_SECONDS:
-        return cached["view_model"], None, False
+    age = time.time() - cached.get("fetched_at", 0) if cached else None
+    if age is None or age >= CACHE_TTL_SECONDS:
+        _request_refresh()
 
-    today_iso = date.today().isoformat()
-    try:
-        raw = client.fetch_stats(today_iso)
-        view_model = _build_view_model(raw)
-        _write_cache(view_model)
-        return view_model, None, False
-    except Exception as exc:  # noqa: BLE001 — keep the page up regardless of failure mode
-        app.logger.warning("hydrow stats fetch failed: %s", exc)
-        if cached:
-            return cached["view_model"], "Showing cached stats — Hydrow API is unreachable.", True
-        return None, "Hydrow stats are temporarily unavailable.", False
+    if not cached:
+        return None, "Hydrow stats are loading — check back in a minute.", False
+    if age >= STALE_AFTER_SECONDS:
+        return cached["view_model"], "Showing cached stats — Hydrow API is unreachable.", True
+    return cached["view_model"], None, False
 
 
 @app.route("/hydrow-stats")
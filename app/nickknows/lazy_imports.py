@@ -0,0 +1,67 @@
+"""
+Deferred imports for heavy libraries.
+
+pandas, numpy and polars take most of the app's import time, and many
+processes never touch them: a web worker serving the main or Hydrow pages,
+or the /NFL home page (served from the pre-rendered leaders bundle). Modules
+bind them with lazy_module() instead of a top-level import:
+
+    pd = lazy_module('pandas')
+
+The real import happens on the first attribute access (pd.read_csv, ...),
+under the normal import lock, so it is safe from any thread. Names must only
+be used inside functions; a module-level pd.anything triggers the import.
+"""
+import importlib
+import threading
+
+_proxies = {}
+_proxies_lock = threading.RLock()
+
+
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._on_load = []
+
+    def _load(self):
+        module = importlib.import_module(self._name)
+        for callback in self._on_load:
+            callback(module)
+        self._module = module
+        return module
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with _proxies_lock:
+                module = self._module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_module(name, on_load=None):
+    """
+    Proxy for module `name`, imported on first use. Every caller gets the
+    same proxy; on_load(module) runs once, right after the import (or
+    immediately if the proxy has already loaded).
+    """
+    with _proxies_lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = _LazyModule(name)
+        if on_load is not None:
+            if proxy._module is not None:
+                on_load(proxy._module)
+            else:
+                proxy._on_load.append(on_load)
+    return proxy
+
+
+def loaded_modules():
+    """Names of the lazy modules that have been imported so far"""
+    return sorted(name for name, proxy in _proxies.items() if proxy._module is not None)
@@ -0,0 +1,150 @@
+"""
+Cached image catalog for the photo galleries.
+
+A directory is scanned once and rescanned only when its mtime changes
+(checked at most every RESCAN_CHECK_SECONDS). Each image gets its
+dimensions, a content hash used in its URL (so responses can be cached
+forever), and a small JPEG thumbnail. Thumbnails need Pillow; without it
+the catalog still works and thumb_url points at the original.
+"""
+import hashlib
+import os
+import threading
+import time
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # thumbnails and dimensions are optional
+    Image = None
+
+VALID_EXTS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+THUMB_MAX_SIZE = (800, 800)
+THUMB_QUALITY = 80
+RESCAN_CHECK_SECONDS = 10
+
+
+def _content_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def _make_thumbnail(source, dest):
+    """Write a JPEG thumbnail (kept from earlier runs if already there);
+    returns (width, height, thumb_width, thumb_height)"""
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)  # phone photos are often rotated via EXIF
+        width, height = img.size
+        if os.path.exists(dest):
+            with Image.open(dest) as thumb:
+                return width, height, thumb.width, thumb.height
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(THUMB_MAX_SIZE)
+        tmp = f'{dest}.{os.getpid()}.tmp'
+        img.save(tmp, 'JPEG', quality=THUMB_QUALITY, optimize=True)
+        os.replace(tmp, dest)
+        return width, height, img.width, img.height
+
+
+class ImageCatalog:
+    """Images in one directory, served under `url_prefix/<digest>[.thumb].<ext>`."""
+
+    def __init__(self, directory, thumb_dir, url_prefix):
+        self.directory = directory
+        self.thumb_dir = thumb_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        self._checked_at = 0.0
+        self._entries = []
+        self._by_file = {}    # served file name -> path on disk
+        self._known = {}      # name -> ((mtime_ns, size), entry), reused across rescans
+
+    def images(self, wait=False):
+        """
+        Sorted list of image entries (dicts), rescanning only if needed.
+        While another thread is scanning, the entries from the last scan are
+        returned straight away (empty before the first) unless `wait`.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= RESCAN_CHECK_SECONDS:
+            if not self._lock.acquire(blocking=wait):
+                return self._entries
+            try:
+                if now - self._checked_at >= RESCAN_CHECK_SECONDS:
+                    self._refresh()
+                    self._checked_at = now
+            finally:
+                self._lock.release()
+        return self._entries
+
+    def first(self):
+        entries = self.images()
+        return entries[0] if entries else None
+
+    def resolve(self, filename):
+        """Disk path for a served file name, or None"""
+        self.images()
+        path = self._by_file.get(filename)
+        if path is None and self._lock.locked():
+            # Scan under way (e.g. just after start-up): the file may be in it
+            self.images(wait=True)
+            path = self._by_file.get(filename)
+        return path
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._by_file, self._dir_mtime = [], {}, None
+            return
+        if mtime == self._dir_mtime:
+            return
+
+        entries, by_file, known = [], {}, {}
+        for name in sorted(os.listdir(self.directory)):
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in VALID_EXTS:
+                continue
+            path = os.path.join(self.directory, name)
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            previous = self._known.get(name)
+            entry = previous[1] if previous and previous[0] == stamp else self._build_entry(name, path, ext)
+            known[name] = (stamp, entry)
+            entries.append(entry)
+            by_file[entry['file']] = path
+            if entry['thumb_file'] != entry['file']:
+                by_file[entry['thumb_file']] = os.path.join(self.thumb_dir, entry['thumb_file'])
+
+        self._entries, self._by_file, self._known = entries, by_file, known
+        self._dir_mtime = mtime
+
+    def _build_entry(self, name, path, ext):
+        digest = _content_digest(path)
+        entry = {
+            'name': name,
+            'file': f'{digest}{ext}',
+            'thumb_file': f'{digest}{ext}',
+            'width': None,
+            'height': None,
+            'thumb_width': None,
+            'thumb_height': None,
+        }
+        # Animated GIFs keep their original; a JPEG would freeze them
+        if Image is not None and ext != '.gif':
+            thumb_file = f'{digest}.thumb.jpg'
+            try:
+                os.makedirs(self.thumb_dir, exist_ok=True)
+                sizes = _make_thumbnail(path, os.path.join(self.thumb_dir, thumb_file))
+            except OSError:
+                pass  # unreadable image: serve the original
+            else:
+                entry['thumb_file'] = thumb_file
+                entry['width'], entry['height'], entry['thumb_width'], entry['thumb_height'] = sizes
+        entry['url'] = f"{self.url_prefix}/{entry['file']}"
+        entry['thumb_url'] = f"{self.url_prefix}/{entry['thumb_file']}"
+        return entry
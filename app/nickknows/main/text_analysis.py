@@ -0,0 +1,81 @@
+"""
+Text analysis for the job description / resume tools.
+
+One regex pass tokenizes the text, a Counter counts the terms, and lookups
+go through sets, so large job descriptions and resumes are handled in
+linear time. Optional n-grams count short phrases ("machine learning")
+alongside single words.
+"""
+import ast
+import json
+import re
+from collections import Counter
+
+STOPWORDS = frozenset({
+    'and', 'to', 'of', 'in', 'the', 'with', 'or', 'as', 'by', 'for', 'on',
+    'not', 'but', 'is', 'be', 'us', 'ie', 'eg', 'etc',
+})
+MAX_NGRAM = 3
+
+# Apostrophes and dots vanish inside words ("don't" -> "dont", "i.e." -> "ie");
+# tokens keep +, # and inner - / & so "c++", "c#", "full-stack" and "r&d" survive.
+_DROP_CHARS = re.compile(r"'|\.(?=\w)")
+_TOKEN = re.compile(r"[\w+#]+(?:[-&][\w+#]+)*")
+# Phrases never run across these
+_CLAUSE_BREAK = re.compile(r"[.!?;:,()\[\]\n\u2022]+")
+
+
+def _clauses(text):
+    cleaned = _DROP_CHARS.sub('', (text or '').lower())
+    return [_TOKEN.findall(clause) for clause in _CLAUSE_BREAK.split(cleaned)]
+
+
+def tokenize(text):
+    """Lowercased word tokens, in order"""
+    return [token for clause in _clauses(text) for token in clause]
+
+
+def _is_term(word):
+    return len(word) > 1 and word not in STOPWORDS
+
+
+def iter_terms(text, max_ngram=1):
+    """Words (and phrases up to max_ngram words) worth counting. A phrase may
+    contain stopwords but can't start or end with one."""
+    max_ngram = max(1, min(max_ngram, MAX_NGRAM))
+    for tokens in _clauses(text):
+        for i, word in enumerate(tokens):
+            if not _is_term(word):
+                continue
+            yield word
+            for n in range(2, min(max_ngram, len(tokens) - i) + 1):
+                if _is_term(tokens[i + n - 1]):
+                    yield ' '.join(tokens[i:i + n])
+
+
+def count_terms(text, max_ngram=1):
+    """Counter of terms, most common first when iterated via most_common()"""
+    return Counter(iter_terms(text, max_ngram))
+
+
+def missing_terms(job_counts, resume_text):
+    """[(term, count)] from job_counts that never appear in the resume, in
+    job_counts order"""
+    longest = max((term.count(' ') + 1 for term in job_counts), default=1)
+    resume_terms = set(iter_terms(resume_text, longest))
+    return [(term, count) for term, count in job_counts.items()
+            if len(term) > 1 and term not in resume_terms]
+
+
+def load_counts(raw):
+    """Parse the counts round-tripped through the pages' hidden form field.
+    Current pages send JSON (keys sorted by tojson); pages rendered before
+    that sent a dict repr. Returned most common first."""
+    if not raw:
+        return {}
+    try:
+        counts = json.loads(raw)
+    except json.JSONDecodeError:
+        counts = ast.literal_eval(raw)
+    counts = {str(term): int(count) for term, count in dict(counts).items()}
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
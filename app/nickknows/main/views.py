@@ -1,17 +1,40 @@
-from flask import redirect, url_for, render_template, request
-import json
+from flask import abort, redirect, url_for, render_template, request, send_file
 import os
+import threading
 from nickknows import app
+from nickknows.main import text_analysis
+from nickknows.main.image_catalog import ImageCatalog
+
+# Gallery files are content-hashed, so browsers may cache them for good
+GALLERY_MAX_AGE = 365 * 24 * 60 * 60
+
+fishing_catalog = ImageCatalog(
+    directory=os.path.join(app.static_folder, 'fishing'),
+    thumb_dir=os.path.join(app.static_folder, 'thumbs', 'fishing'),
+    url_prefix='/gallery/fishing',
+)
+
+def warm_gallery():
+    """
+    Hash and thumbnail the gallery in a background thread. Called by the web
+    server only (wsgi.py), not on import, so Celery workers and beat never
+    scan it. The home page doesn't wait on the scan: until it finishes,
+    first() returns nothing rather than blocking on the catalog lock.
+    """
+    threading.Thread(target=fishing_catalog.images, name='gallery-warm', daemon=True).start()
+
+@app.route('/gallery/fishing/<filename>')
+def fishing_gallery_file(filename):
+    path = fishing_catalog.resolve(filename)
+    if path is None:
+        abort(404)
+    response = send_file(path, max_age=GALLERY_MAX_AGE, conditional=True)
+    response.cache_control.immutable = True
+    return response
 
 @app.route('/')
 def home():
-    fishing_dir = os.path.join(app.static_folder, 'fishing')
-    valid_exts = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
-    fishing_images = sorted([
-        f for f in os.listdir(fishing_dir)
-        if os.path.splitext(f)[1].lower() in valid_exts
-    ])
-    fishing_preview = fishing_images[0] if fishing_images else None
+    fishing_preview = fishing_catalog.first()
     try:
         from nickknows.hydrow.views import get_cached_profile
         hydrow_profile = get_cached_profile()
@@ -73,12 +96,8 @@ def brown_banana():
 
 @app.route('/fishing')
 def fishing():
-    fishing_dir = os.path.join(app.static_folder, 'fishing')
-    valid_exts = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
-    images = sorted([
-        f for f in os.listdir(fishing_dir)
-        if os.path.splitext(f)[1].lower() in valid_exts
-    ])
+    # The gallery is the whole page, so this one waits for a scan in progress
+    images = fishing_catalog.images(wait=True)
     youtube_url = 'https://www.youtube.com/embed/U1c-Fx13hSA?si=q0tltUx866xImAGK'
     return render_template('fishing.html', images=images, youtube_url=youtube_url)
 
@@ -88,90 +107,20 @@ def job_parse():
         return render_template('job-parse.html')
     elif request.method == 'POST':
         description = request.form.get('job_desc')
-        job_words = {}
-        omit_words = ['and', 'to', 'of', 'in', 'the', 'with', 'or', 'and/or', 'i.e.', 'etc.', 'as', 'by', 'for', 'on', 'not', 'but', 'is', 'be', 'us']
-        description = description.split(' ')
-        for words in description:
-            words = words.strip()
-            words = words.replace('/', ' ')
-            words = words.replace('\n', ' ')
-            if len(words) == 0:
-                pass
-            else:
-                words_list = words.split(' ')
-                for word in words_list:
-                    word = word.lower()
-                    word = word.strip()
-                    word = word.replace(',','')
-                    word = word.replace("'",'')
-                    word = word.replace(':','')
-                    word = word.replace('.','')
-                    word = word.replace(')','')
-                    word = word.replace('(','')
-                    if len(word) <= 1:
-                        pass
-                    elif word in omit_words:
-                        pass
-                    else:
-                        if word not in job_words:
-                            job_words[word] = 1
-                        elif word in job_words:
-                            job_words[word] += 1
-        sorted_words = sorted(job_words.items(), key=lambda kv: kv[1], reverse=True)
-        sorted_words = dict(sorted_words)
-        return render_template('job-parse-count.html', job_count = sorted_words)
+        max_ngram = request.form.get('ngrams', 1, type=int)
+        job_count = dict(text_analysis.count_terms(description, max_ngram).most_common())
+        return render_template('job-parse-count.html', job_count = job_count)
 
 @app.route('/job_parse/post_resume', methods=['POST'])
 def job_post_resume():
     if request.method == 'POST':
-        job_count = request.form.get('job_count')
-        job_count = job_count.replace("'",'"')
-        job_count = job_count.replace("'","'")
-        job_count = json.loads(job_count)
+        job_count = text_analysis.load_counts(request.form.get('job_count'))
         return render_template('resume-compare.html', job_count = job_count)
 
 @app.route('/job_parse/resume', methods=['GET','POST'])
 def job_parse_resume():
     if request.method == 'POST':
-        resume_words = []
-        job_words = []
-        missing_words = []
-        miss_word_count = []
-        omit_words = ['and', 'to', 'of', 'in', 'the', 'with', 'or', 'and/or', 'i.e.', 'etc.', 'as', 'by', 'for', 'on', 'not', 'but', 'is', 'be', 'us']
-        job_count = request.form.get('job_count')
-        job_count = job_count.replace("{'",'{"')
-        job_count = job_count.replace(", '",', "')
-        job_count = job_count.replace("':",'":')
-        job_count = job_count.replace("'","'")
-        job_count = json.loads(job_count)
-        for word in job_count:
-            if len(word) <= 1:
-                pass
-            else:
-                job_words.append(word)
-        resume_count = request.form.get('resume')
-        resume_count = resume_count.replace('\n',' ')
-        resume_count = resume_count.replace('/',' ')
-        resume_count = resume_count.replace(',','')
-        resume_count = resume_count.split(' ')
-        for words in resume_count:
-            words = words.lower()
-            words = words.strip()
-            if len(words) <= 1:
-                pass
-            elif words in omit_words:
-                pass
-            else:
-                resume_words.append(words)
-        for values in job_words:
-            if values not in resume_words:
-                missing_words.append(values)
-        for items in missing_words:
-            if items in resume_words:
-                missing_words.remove(items)
-        for final in missing_words:
-            try:
-                miss_word_count.append(final + ' : ' + str(job_count[final]))
-            except IndexError:
-                pass
-        return render_template('resume-comp.html', missing_words = miss_word_count)
\ No newline at end of file
+        job_count = text_analysis.load_counts(request.form.get('job_count'))
+        missing = text_analysis.missing_terms(job_count, request.form.get('resume'))
+        miss_word_count = [f'{term} : {count}' for term, count in missing]
+        return render_template('resume-comp.html', missing_words = miss_word_count)
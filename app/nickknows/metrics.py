@@ -0,0 +1,271 @@
+"""
+Timing instrumentation, exposed at /metrics in the Prometheus text format.
+
+Histograms:
+
+    nickknows_request_duration_seconds{route, method, status}
+        every Flask request, labelled with the URL rule (not the raw path)
+    nickknows_span_duration_seconds{span, scope}
+        instrumented sections - CSV reads, table/Styler rendering, matplotlib,
+        NFL-API calls - labelled with the route or task they ran under
+    nickknows_task_duration_seconds{task, state}
+        every Celery task
+    nickknows_task_span_duration_seconds{span, scope}
+        the same sections when they run inside a task
+
+Request and span timings from web requests live in the web process. Task
+timings, and spans that run inside tasks, are recorded by the workers into
+a Redis hash so /metrics on any web process reports them for all workers.
+
+/metrics is for the in-cluster Prometheus scrape (the prometheus.io/*
+annotations on the webapp pods), which reaches the pod directly. Requests
+that came through the ingress carry proxy headers and get a 404.
+
+Set NICKKNOWS_SLOW_REQUEST_MS to log requests slower than that, with the
+time spent in each span.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from celery.signals import task_postrun, task_prerun
+from celery.utils.log import get_task_logger
+from flask import Response, abort, g, request
+
+logger = get_task_logger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+SLOW_REQUEST_SECONDS = float(os.environ.get('NICKKNOWS_SLOW_REQUEST_MS', '0')) / 1000
+TASK_METRICS_KEY = 'metrics:tasks'
+# Set by the ingress on every request it forwards; a direct scrape has none
+PROXY_HEADERS = ('X-Forwarded-For', 'X-Real-IP', 'Forwarded')
+
+# (kind, name): a running request ('route', rule) or task ('task', name)
+_scope = contextvars.ContextVar('metrics_scope', default=None)
+_request_spans = contextvars.ContextVar('metrics_request_spans', default=None)
+
+
+def _redis():
+    # Imported on use: the celery_setup package imports this module
+    from nickknows.celery_setup.redis_state import get_redis
+    return get_redis()
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}'
+
+
+def _render_histogram(name, help_text, label_names, series):
+    """series: {label values: (bucket counts, count, sum)}, counts not cumulative"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for values, (counts, count, total) in sorted(series.items()):
+        running = 0
+        for bound, n in zip(BUCKETS, counts):
+            running += n
+            le = 'le="%s"' % bound
+            lines.append(f'{name}_bucket{_labels(label_names, values, le)} {running}')
+        le = 'le="+Inf"'
+        lines.append(f'{name}_bucket{_labels(label_names, values, le)} {count}')
+        lines.append(f'{name}_count{_labels(label_names, values)} {count}')
+        lines.append(f'{name}_sum{_labels(label_names, values)} {total:.6f}')
+    return lines
+
+
+class Histogram:
+    """In-process histogram keyed on a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values, seconds):
+        index = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            counts, count, total = self._series.get(values) or ([0] * len(BUCKETS), 0, 0.0)
+            if index < len(BUCKETS):
+                counts[index] += 1
+            self._series[values] = (counts, count + 1, total + seconds)
+
+    def totals(self):
+        """{label values: (count, total seconds)}"""
+        with self._lock:
+            return {values: (count, total) for values, (_, count, total) in self._series.items()}
+
+    def render(self):
+        with self._lock:
+            series = {k: (list(c), n, s) for k, (c, n, s) in self._series.items()}
+        return _render_histogram(self.name, self.help_text, self.label_names, series)
+
+
+class RedisHistogram:
+    """Histogram shared by every worker process through one Redis hash"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+
+    def observe(self, values, seconds):
+        series = '\t'.join([self.name, *map(str, values)])
+        index = bisect_left(BUCKETS, seconds)
+        try:
+            pipe = _redis().pipeline(transaction=False)
+            if index < len(BUCKETS):
+                pipe.hincrby(TASK_METRICS_KEY, f'{series}\tb{index}', 1)
+            pipe.hincrby(TASK_METRICS_KEY, f'{series}\tcount', 1)
+            pipe.hincrbyfloat(TASK_METRICS_KEY, f'{series}\tsum', seconds)
+            pipe.execute()
+        except Exception as e:  # metrics must never fail a task
+            logger.warning(f"❌ Could not record {self.name}{values}: {e}")
+
+    def render(self, fields):
+        series = {}
+        for field, raw in fields.items():
+            name, *rest = field.split('\t')
+            if name != self.name or len(rest) != len(self.label_names) + 1:
+                continue
+            values, part = tuple(rest[:-1]), rest[-1]
+            counts, count, total = series.get(values) or ([0] * len(BUCKETS), 0, 0.0)
+            if part == 'count':
+                count = int(raw)
+            elif part == 'sum':
+                total = float(raw)
+            elif part.startswith('b') and int(part[1:]) < len(BUCKETS):
+                counts[int(part[1:])] = int(raw)
+            series[values] = (counts, count, total)
+        return _render_histogram(self.name, self.help_text, self.label_names, series)
+
+
+REQUEST_SECONDS = Histogram('nickknows_request_duration_seconds',
+                            'Flask request latency by URL rule', ('route', 'method', 'status'))
+SPAN_SECONDS = Histogram('nickknows_span_duration_seconds',
+                         'Time in instrumented sections of web requests', ('span', 'scope'))
+TASK_SECONDS = RedisHistogram('nickknows_task_duration_seconds',
+                              'Celery task run time', ('task', 'state'))
+TASK_SPAN_SECONDS = RedisHistogram('nickknows_task_span_duration_seconds',
+                                   'Time in instrumented sections of Celery tasks', ('span', 'scope'))
+
+
+@contextmanager
+def span(name):
+    """Time a section of a request or task: `with metrics.span('csv_read'):`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        scope = _scope.get()
+        if scope is not None and scope[0] == 'task':
+            TASK_SPAN_SECONDS.observe((name, scope[1]), elapsed)
+        else:
+            SPAN_SECONDS.observe((name, scope[1] if scope else 'none'), elapsed)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def timed(name):
+    """Decorator form of span()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ── Flask ──────────────────────────────────────────────────────────────────────
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    _scope.set(('route', _route_label()))
+    _request_spans.set([])
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    REQUEST_SECONDS.observe((_route_label(), request.method, str(response.status_code)), elapsed)
+    if SLOW_REQUEST_SECONDS and elapsed >= SLOW_REQUEST_SECONDS:
+        _log_slow_request(response.status_code, elapsed)
+    return response
+
+
+def _reset_request_context(exc=None):
+    started = g.pop('metrics_started', None)
+    if started is not None:  # after_request never ran: the view raised
+        REQUEST_SECONDS.observe((_route_label(), request.method, '500'), time.perf_counter() - started)
+    # Server threads are reused across requests
+    _scope.set(None)
+    _request_spans.set(None)
+
+
+def _log_slow_request(status, elapsed):
+    totals = {}
+    for name, seconds in _request_spans.get() or []:
+        calls, total = totals.get(name, (0, 0.0))
+        totals[name] = (calls + 1, total + seconds)
+    breakdown = ', '.join(f'{name}={total * 1000:.0f}ms x{calls}'
+                          for name, (calls, total) in sorted(totals.items(), key=lambda i: -i[1][1]))
+    logger.warning(f"⚠️ Slow request {request.method} {request.full_path.rstrip('?')} -> {status} "
+                   f"in {elapsed * 1000:.0f}ms" + (f" ({breakdown})" if breakdown else ""))
+
+
+def metrics_view():
+    if any(header in request.headers for header in PROXY_HEADERS):
+        abort(404)
+    lines = REQUEST_SECONDS.render() + SPAN_SECONDS.render()
+    try:
+        fields = _redis().hgetall(TASK_METRICS_KEY)
+    except Exception as e:
+        logger.warning(f"❌ Task metrics unavailable: {e}")
+        fields = {}
+    lines += TASK_SECONDS.render(fields) + TASK_SPAN_SECONDS.render(fields)
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_reset_request_context)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+# ── Celery ─────────────────────────────────────────────────────────────────────
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, task=None, **kwargs):
+    _scope.set(('task', task.name))
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    _scope.set(None)
+    if started is not None:
+        TASK_SECONDS.observe((task.name, state or 'UNKNOWN'), time.perf_counter() - started)
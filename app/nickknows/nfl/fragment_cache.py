@@ -0,0 +1,134 @@
+"""
+Rendered-HTML fragment cache for the NFL pages.
+
+Building a table with df.style...to_html() is one of the slowest things a
+request can do, and the result only changes when the dataset behind it is
+republished. Fragments are keyed on (route, args, dataset versions): a
+publish bumps the manifest version, so the next request misses and
+re-renders, and stale entries are never looked up again.
+
+Lookups go to a per-process LRU first, then Redis (shared by every web
+process, entries expire after FRAGMENT_TTL_SECONDS). Redis being down only
+costs the renders; it is skipped for REDIS_RETRY_SECONDS after an error.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from celery.utils.log import get_task_logger
+
+from nickknows import metrics
+
+from ..celery_setup.datasets import get_dataset_manifest
+
+logger = get_task_logger(__name__)
+
+MEMORY_CACHE_SIZE = 256
+FRAGMENT_TTL_SECONDS = 24 * 60 * 60
+REDIS_RETRY_SECONDS = 30
+KEY_PREFIX = "nfl:fragment:"
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_redis_down_until = 0.0
+
+_redis = redis.Redis(
+    host=os.environ.get("REDIS_ENV", "redis"),
+    port=6379,
+    decode_responses=True,
+    socket_connect_timeout=0.5,
+    socket_timeout=0.5,
+)
+
+
+def dataset_stamp(path):
+    """
+    Version of a dataset file for cache keys, or None if it doesn't exist.
+    Published files use their manifest; files from before manifests fall
+    back to mtime and size.
+    """
+    manifest = get_dataset_manifest(path)
+    if manifest:
+        return [manifest['version'], manifest['published_at']]
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return ['mtime', st.st_mtime_ns, st.st_size]
+
+
+def _cache_key(route, args, datasets, stamps):
+    # Each stamp is keyed by its file, so two datasets (say, two seasons of
+    # the same route) never share a key even if their stamps happen to match
+    versions = [[os.path.abspath(path), stamp] for path, stamp in zip(datasets, stamps)]
+    raw = json.dumps([route, list(args), versions], default=str)
+    return KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _redis_get(key):
+    global _redis_down_until
+    if time.monotonic() < _redis_down_until:
+        return None
+    try:
+        raw = _redis.get(key)
+    except redis.RedisError as e:
+        _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning(f"❌ Fragment cache read failed, rendering locally: {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def _redis_set(key, value):
+    global _redis_down_until
+    if time.monotonic() < _redis_down_until:
+        return
+    try:
+        _redis.set(key, json.dumps(value), ex=FRAGMENT_TTL_SECONDS)
+    except redis.RedisError as e:
+        _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning(f"❌ Fragment cache write failed: {e}")
+
+
+def _remember(key, value):
+    with _memory_lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def cached_fragment(route, args, datasets, render):
+    """
+    render() once per version of the given dataset files and return its
+    result (an HTML string, or any JSON-serializable value such as a dict of
+    fragments). Exceptions from render() propagate and nothing is cached;
+    if a dataset file is missing the result is rendered but not cached.
+    """
+    stamps = [dataset_stamp(path) for path in datasets]
+    if any(stamp is None for stamp in stamps):
+        with metrics.span('fragment_render'):
+            return render()
+
+    key = _cache_key(route, args, datasets, stamps)
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    value = _redis_get(key)
+    if value is None:
+        with metrics.span('fragment_render'):
+            value = render()
+        _redis_set(key, value)
+    _remember(key, value)
+    return value
+
+
+def clear_memory():
+    """Drop this process's fragments (Redis entries age out on their own)"""
+    with _memory_lock:
+        _memory.clear()
@@ -0,0 +1,107 @@
+"""
+Minimal HTML table renderer for DataFrames.
+
+A fast stand-in for df.style.hide(axis="index")...to_html() on the pages
+that build many small tables per request. Each column is formatted and
+wrapped in one vectorized pass, so cost grows with the number of columns
+rather than cells times Styler's per-cell machinery. It covers what the
+NFL pages use: hidden index, a column subset with display names, float
+precision, link columns and gradient (heat) classes.
+
+Gradient cells get class heat-0 (lowest) .. heat-<HEAT_STEPS-1> (highest),
+styled in design-system.css.
+"""
+from html import escape as _escape_html
+from urllib.parse import quote
+
+from nickknows import metrics
+from nickknows.lazy_imports import lazy_module
+
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
+
+HEAT_STEPS = 7
+
+
+def _escape(values):
+    """Vectorized HTML escape of a string array"""
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;')):
+        values = np.char.replace(values, char, entity)
+    return values
+
+
+def _format_column(column, precision, na_rep, escape):
+    """Object array of cell text for one column"""
+    values = column.to_numpy()
+    missing = pd.isna(values)
+    if pd.api.types.is_bool_dtype(column):
+        text = np.where(values, 'True', 'False')
+    elif pd.api.types.is_integer_dtype(column):
+        text = values.astype(str)
+    elif pd.api.types.is_float_dtype(column):
+        pattern = f'%.{precision}f' if precision is not None else '%g'
+        text = np.char.mod(pattern, np.nan_to_num(values.astype(float)))
+    else:
+        text = values.astype(str)
+        if escape:
+            text = _escape(text)
+    text = text.astype(object)
+    if missing.any():
+        text[missing] = na_rep
+    return text
+
+
+def _heat_classes(column, reverse):
+    """' class="heat-N"' per cell, scaled between the column's min and max"""
+    values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float)
+    finite = values[np.isfinite(values)]
+    low, high = (finite.min(), finite.max()) if finite.size else (0.0, 0.0)
+    span = (high - low) or 1.0
+    steps = np.clip(((values - low) / span * (HEAT_STEPS - 1)).round(), 0, HEAT_STEPS - 1)
+    if reverse:
+        steps = (HEAT_STEPS - 1) - steps
+    classes = np.char.add(np.char.add(' class="heat-', np.nan_to_num(steps).astype(int).astype(str)), '"')
+    return np.where(np.isnan(values), '', classes).astype(object)
+
+
+@metrics.timed('table_render')
+def render_table(df, columns=None, rename=None, precision=None, links=None, gradients=None,
+                 gradient_reverse=False, classes=None, escape=True, na_rep=''):
+    """
+    HTML <table> for df with no index column.
+
+    columns: subset (and order) of df's columns to show; defaults to all.
+    rename: {column: header text}.
+    precision: decimals for float columns, an int for all of them or a
+        {column: int} dict (floats not listed use %g).
+    links: {column: url template}; each cell becomes a link to
+        template.format(<url-quoted cell value>).
+    gradients: columns whose cells get heat classes by value
+        (gradient_reverse flips the scale so the highest value is heat-0).
+    classes: class attribute of the <table>.
+    escape: HTML-escape text cells; False leaves embedded markup alone.
+    """
+    columns = list(df.columns if columns is None else columns)
+    rename = rename or {}
+    links = links or {}
+    gradients = set(gradients or ())
+
+    header = ''.join(f'<th>{_escape_html(str(rename.get(col, col)))}</th>' for col in columns)
+    table_open = f'<table class="{_escape_html(classes)}">' if classes else '<table>'
+    if len(df) == 0:
+        return f'{table_open}<thead><tr>{header}</tr></thead><tbody></tbody></table>'
+
+    rows = np.full(len(df), '<tr>', dtype=object)
+    for col in columns:
+        column = df[col]
+        digits = precision.get(col) if isinstance(precision, dict) else precision
+        text = _format_column(column, digits, na_rep, escape)
+        if col in links:
+            present = column.notna().to_numpy()
+            hrefs = np.array([links[col].format(quote(str(v), safe='')) for v in column], dtype=str)
+            linked = '<a href="' + _escape(hrefs).astype(object) + '">' + text + '</a>'
+            text = np.where(present, linked, text)
+        cell_attrs = _heat_classes(column, gradient_reverse) if col in gradients else ''
+        rows = rows + '<td' + cell_attrs + '>' + text + '</td>'
+    body = '</tr>\n'.join(rows)
+    return f'{table_open}<thead><tr>{header}</tr></thead><tbody>\n{body}</tr>\n</tbody></table>'
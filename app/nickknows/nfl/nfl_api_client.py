@@ -12,6 +12,8 @@ import time
 
 import requests
 
+from nickknows import metrics
+
 DEFAULT_BASE_URL = "http://nfl-api.nfl-api.svc.cluster.local:8000"
 BASE_URL = os.environ.get("NFL_API_URL", DEFAULT_BASE_URL).rstrip("/")
 
@@ -41,7 +43,8 @@ def get(path, timeout=DEFAULT_TIMEOUT, **params):
     query = {k: v for k, v in params.items() if v is not None}
 
     try:
-        response = requests.get(url, params=query, timeout=timeout)
+        with metrics.span('nfl_api'):
+            response = requests.get(url, params=query, timeout=timeout)
     except requests.RequestException as e:
         raise NflApiError(f"NFL-API request failed: {url} ({e})") from e
 
@@ -1,5 +1,6 @@
 from flask import render_template, url_for, redirect, flash, request, session
-from nickknows import app
+from nickknows import app, metrics
+from nickknows.lazy_imports import lazy_module
 from ..celery_setup.tasks import (
     update_full_season_data,
     update_single_team_full,
@@ -30,7 +31,6 @@ from ..celery_setup.tasks import (
     update_rb_tds_top10,
     update_rec_yds_top10,
     update_rec_tds_top10,
-    update_fpa_data,
     process_team_data,
     update_snap_count_data,
     update_opportunity_data,
@@ -39,22 +39,31 @@ from ..celery_setup.tasks import (
     get_selected_year,
     format_nfl_season
 )
-from .plotting_functions import create_team_opportunity_plots, create_team_opportunity_plots_by_stat
+from ..celery_setup.datasets import read_dataset, read_dataset_rows, dataset_age, dataset_version, write_file_atomic
+from ..celery_setup.job_status import start_job, get_job_status
+from ..celery_setup.routing import RENDER_QUEUE
+from ..celery_setup.task_orchestrator import FULL_SEASON_STAGES
+from ..celery_setup.team_analysis_tasks import ALL_TEAM_FPA_STAGES
+from ..celery_setup.stat_aggregation_tasks import LEADER_BOARDS, get_leaders_bundle_path, render_leader_table
+from .fragment_cache import cached_fragment
+from .html_tables import render_table
 from . import nfl_api_client
-from celery import chain, chord
-import nflreadpy as nfl
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from IPython.display import HTML
 import os
 import json
-import time
 from pathlib import Path
 from celery.utils.log import get_task_logger
 from datetime import datetime
 logger = get_task_logger(__name__)
-pd.options.mode.chained_assignment = None
+
+pd = lazy_module('pandas', on_load=lambda pd: pd.set_option('mode.chained_assignment', None))
+np = lazy_module('numpy')
+
+def _figure(**kwargs):
+    """A standalone matplotlib Figure - no pyplot state shared between
+    request threads. Imported on first use: matplotlib is slow to load and
+    only the FPA chart needs it."""
+    from matplotlib.figure import Figure
+    return Figure(**kwargs)
 
 def _current_nfl_season():
     """Current NFL season year.
@@ -119,6 +128,29 @@ def set_nfl_year(year):
     
     return redirect(request.referrer or url_for('NFL'))
 
+_leaders_bundle_memo = {}
+
+def _load_leaders_bundle(selected_year, files):
+    """Pre-rendered leader tables from the stats pipeline, or {} when the
+    bundle is missing or older than any of the board datasets."""
+    path = get_leaders_bundle_path(selected_year)
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    memo = _leaders_bundle_memo.get(path)
+    if memo is None or memo[0] != stamp:
+        try:
+            with open(path) as f:
+                memo = (stamp, json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        _leaders_bundle_memo[path] = memo
+    bundle = memo[1]
+    if any(bundle['sources'].get(name) != dataset_version(files[name]) for name in files):
+        return {}
+    return dict(bundle['tables'])
+
 @app.route('/NFL')
 def NFL():
     """
@@ -140,20 +172,18 @@ def NFL():
         ]
         
         week_threshold = 7 * 24 * 60 * 60  # 7 days
-        current_time = time.time()
         
+        # Age comes from each dataset's publish manifest, not the file mtime
         for file_path in core_files:
-            if not os.path.exists(file_path):
-                update_needed = True
-                break
-            elif (current_time - os.path.getmtime(file_path)) > week_threshold:
+            age = dataset_age(file_path)
+            if age is None or age > week_threshold:
                 update_needed = True
                 break
     
     if update_needed:
-        # NEW: Single orchestrated update instead of multiple task calls
-        update_full_season_data.delay(selected_year)
-        flash(f'Data for {selected_year} season is updating. Refresh in a few minutes.')
+        # Single orchestrated update; a burst of page views shares one job
+        job_id = start_job('full_season', update_full_season_data, selected_year, stages=FULL_SEASON_STAGES)
+        _flash_job(job_id, f'Data for {selected_year} season is updating. Refresh in a few minutes.')
         return render_template('nfl-home.html', 
                              years=available_years, 
                              selected_year=selected_year)
@@ -169,22 +199,27 @@ def NFL():
             'rec_td_agg': f'{base_path}_rec_tds_top10_data.csv'
         }
         
-        data = {}
-        for name, path in files.items():
-            if os.path.exists(path):
-                df = pd.read_csv(path, index_col=0)
-                data[name] = df.style.hide(axis="index").format(precision=0)
-            else:
-                raise FileNotFoundError(f"Missing file: {path}")
+        data = _load_leaders_bundle(selected_year, files)
+        if not data:
+            # No current bundle from the stats pipeline yet: render from the CSVs
+            table_classes = {key: classes for key, _, classes in LEADER_BOARDS}
+            for name, path in files.items():
+                if os.path.exists(path):
+                    data[name] = cached_fragment(
+                        'NFL', [name], [path],
+                        lambda name=name, path=path: render_leader_table(read_dataset(path, index_col=0),
+                                                                         table_classes[name]))
+                else:
+                    raise FileNotFoundError(f"Missing file: {path}")
         
         return render_template(
             'nfl-home.html',
-            pass_yards_data=data['pass_agg'].to_html(classes="table"),
-            pass_td_data=data['pass_td_agg'].to_html(),
-            rush_yards_data=data['rush_yds_agg'].to_html(),
-            rush_td_data=data['rush_td_agg'].to_html(),
-            rec_yards_data=data['rec_yds_agg'].to_html(),
-            rec_td_data=data['rec_td_agg'].to_html(),
+            pass_yards_data=data['pass_agg'],
+            pass_td_data=data['pass_td_agg'],
+            rush_yards_data=data['rush_yds_agg'],
+            rush_td_data=data['rush_td_agg'],
+            rec_yards_data=data['rec_yds_agg'],
+            rec_td_data=data['rec_td_agg'],
             years=available_years,
             selected_year=selected_year
         )
@@ -195,33 +230,51 @@ def NFL():
                              years=available_years, 
                              selected_year=selected_year)
       
+def _json_response(payload, status=200):
+    return json.dumps(payload), status, {'Content-Type': 'application/json'}
+
+def _flash_job(job_id, message):
+    """Flash `message` tagged with the job, so the page polls it (static/js/job-status.js) and says when it's done"""
+    flash(message, f'job:{job_id}')
+
+def _job_started(job_id, message, endpoint, **values):
+    """202 with the job id for API clients (Accept: application/json), otherwise flash and redirect"""
+    if request.accept_mimetypes.best == 'application/json':
+        return _json_response({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('job_status', job_id=job_id),
+            'message': message
+        }, 202)
+    _flash_job(job_id, message)
+    return redirect(url_for(endpoint, **values))
+
+@app.route('/NFL/jobs/<job_id>')
+def job_status(job_id):
+    """Poll a job started by one of the update routes or the snap count API"""
+    try:
+        status = get_job_status(job_id)
+    except Exception as e:
+        logger.error(f"Error reading job {job_id}: {str(e)}")
+        return _json_response({'success': False, 'error': str(e), 'job_id': job_id}, 500)
+    if status is None:
+        return _json_response({'success': False, 'error': 'Unknown or expired job', 'job_id': job_id}, 404)
+    return _json_response({'success': True, **status})
+
 @app.route('/NFL/update')
 def NFLupdate():
     selected_year = get_selected_year()
-    update_full_season_data.delay(selected_year)  # One call does it all
-    return redirect(url_for('NFL'))
+    # One call does it all; the job reports each stage of the workflow
+    job_id = start_job('full_season', update_full_season_data, selected_year, stages=FULL_SEASON_STAGES)
+    return _job_started(job_id, f'Data for {selected_year} season is updating. Refresh in a few minutes.', 'NFL')
 
 @app.route('/NFL/FPA/update')
 def FPAupdate():
     selected_year = get_selected_year()
-    teams = ['ARI','ATL','BAL','BUF','CAR','CHI','CIN','CLE','DAL','DEN','DET','GB','HOU','IND','JAX','KC','LA','LAC','LV','MIA','MIN','NE','NO','NYG','NYJ','PHI','PIT','SEA','SF','TB','TEN','WAS']
-    
-    # Create chains for each team that include graph generation with year
-    team_chains = []
-    for team in teams:
-        team_chains.append(
-            chain(
-                update_team_schedule.si(team, selected_year),
-                update_weekly_team_data.si(team, selected_year),
-                process_team_data.si(team, selected_year)
-            )
-        )
-    
-    # Execute all chains in parallel and collect results
-    chord(team_chains)(update_fpa_data.s(selected_year))
-    
-    flash('All team data is updating in the background. Changes should be reflected on the pages shortly')
-    return redirect(url_for('NFL', year=selected_year))
+    # Schedule, weekly data and FPA for all 32 teams, then the season summary
+    job_id = start_job('fpa', update_all_team_fpa, selected_year, stages=ALL_TEAM_FPA_STAGES)
+    return _job_started(job_id, 'All team data is updating in the background. Changes should be reflected on the pages shortly',
+                        'NFL', year=selected_year)
 
 # Columns the schedule table needs, display + hidden. NFL-API responses are
 # reindexed to this set so a payload missing a column (e.g. still backed by
@@ -293,7 +346,7 @@ def schedule():
     if week_schedule is None:
         try:
             file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_schedule.csv'
-            schedule_csv = pd.read_csv(file_path, index_col=0)
+            schedule_csv = read_dataset(file_path, index_col=0)
             week_schedule = schedule_csv.loc[schedule_csv['week'] == int(week)]
         except FileNotFoundError:
             flash(f'Schedule data for {selected_year} not found. Please update data.')
@@ -301,7 +354,7 @@ def schedule():
 
     styled = _style_week_schedule(week_schedule, selected_year)
     return render_template('weekly.html',
-                         week_schedule = HTML(styled.to_html(render_links=True,escape=False,classes="table")),
+                         week_schedule = styled.to_html(render_links=True,escape=False,classes="table"),
                          weeks = available_weeks,
                          week = week,
                          years=available_years,
@@ -394,7 +447,7 @@ def roster(team,fullname):
     if team_roster is None:
         try:
             file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_rosters.csv'
-            roster_data = pd.read_csv(file_path, index_col=0)
+            roster_data = read_dataset(file_path, index_col=0)
             team_roster = roster_data.loc[roster_data['team'] == team]
         except FileNotFoundError:
             flash(f'Roster data for {fullname} ({selected_year}) not found. Please update data.')
@@ -973,16 +1026,10 @@ def game_pbp(game):
         selected_year = get_selected_year()
         available_years = get_available_years()
         file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_pbp_data.csv'
-        pbp_data = pd.read_csv(file_path, index_col=0)
-        game_data = pbp_data.loc[pbp_data['game_id'] == game]
-        game_data.rename(columns={'posteam':'Possession','defteam':'Defense','side_of_field':'Field Side','yardline_100':'Distance from EndZone','quarter_seconds_remaining':'Seconds left in Quarter','half_seconds_remaining':'Seconds left in Half','game_seconds_remaining':'Seconds left in Game','drive':'Drive #'}, inplace=True)
-        game_data = game_data.style.hide(axis="index")
-        game_data = game_data.set_table_attributes({'border-collapse' : 'collapse','border-spacing' : '0px'})
-        game_data = game_data.set_table_styles([{'selector': 'th', 'props' : 'background-color : gainsboro; color:black; border: 2px solid black;padding : 2.5px;margin : 0 auto; font-size : 12px'}])
-        game_data = game_data.set_properties(**{'background-color' : 'gainsboro', 'color' :'black', 'border': '2px solid black','padding' : '2.5px','margin' : '0 auto', 'font-size' : '12px'})
-        game_data = game_data.hide(['play_id','game_id','old_game_id','home_team','away_team','season_type','week','game_date','posteam_type','game_half','quarter_end','sp','qtr','goal_to_go','ydsnet','qb_kneel','qb_spike','qb_scramble'], axis="columns")
+        game_html = cached_fragment('game_pbp', [game], [file_path],
+                                    lambda: _render_game_pbp(file_path, game))
         return render_template('pbp.html', 
-                             game_data = game_data.to_html(), 
+                             game_data = game_html, 
                              game = game,
                              years=available_years,
                              selected_year=selected_year)
@@ -990,33 +1037,56 @@ def game_pbp(game):
         flash(f'Play-by-play data for {selected_year} not found.')
         return redirect(url_for('NFL', year=selected_year))
 
+def _render_game_pbp(file_path, game):
+    # Only this game's plays: the season file is too big to parse (or cache) whole
+    game_data = read_dataset_rows(file_path, 'game_id', game, index_col=0)
+    game_data.rename(columns={'posteam':'Possession','defteam':'Defense','side_of_field':'Field Side','yardline_100':'Distance from EndZone','quarter_seconds_remaining':'Seconds left in Quarter','half_seconds_remaining':'Seconds left in Half','game_seconds_remaining':'Seconds left in Game','drive':'Drive #'}, inplace=True)
+    game_data = game_data.style.hide(axis="index")
+    game_data = game_data.set_table_attributes({'border-collapse' : 'collapse','border-spacing' : '0px'})
+    game_data = game_data.set_table_styles([{'selector': 'th', 'props' : 'background-color : gainsboro; color:black; border: 2px solid black;padding : 2.5px;margin : 0 auto; font-size : 12px'}])
+    game_data = game_data.set_properties(**{'background-color' : 'gainsboro', 'color' :'black', 'border': '2px solid black','padding' : '2.5px','margin' : '0 auto', 'font-size' : '12px'})
+    # play_id is the file's first column, so it is read as the (hidden) index
+    hidden = ['play_id','game_id','old_game_id','home_team','away_team','season_type','week','game_date','posteam_type','game_half','quarter_end','sp','qtr','goal_to_go','ydsnet','qb_kneel','qb_spike','qb_scramble']
+    game_data = game_data.hide([col for col in hidden if col in game_data.columns], axis="columns")
+    return game_data.to_html()
+
+def _render_player_stats(file_path, name):
+    """Weekly stats table, headshot and position for a player. Raises
+    IndexError when the player has no weekly rows."""
+    player_data = read_dataset_rows(file_path, 'player_display_name', name, index_col=0)
+    headshot = '<img src="' + player_data['headshot_url'] + '" width="360" >'
+    headshot = headshot.unique()
+    position = player_data['position'].unique()
+    player_data.target_share = player_data.target_share * 100
+    player_data.air_yards_share = player_data.air_yards_share * 100
+    player_data = player_data.rename(columns={'recent_team':'Team','week':'Week','opponent_team':'Opponent','completions':'Completions','attempts':'Attempts','passing_yards':'Pass Yards','passing_tds':'Pass TDs','interceptions':'INTs','sacks':'Sacks','sack_yards':'Sack Yards','sack_fumbles':'Sack Fumbles','sack_fumbles_lost':'Lost Sack','passing_air_yards':'Air Yards','passing_yards_after_catch':'YAC','passing_first_downs':'Pass 1sts','passing_epa':'Pass EPA','passing_2pt_conversions':'Pass 2pt','pacr':'PACR','carries':'Carries','rushing_yards':'Rush Yards','rushing_tds':'Rush TD','rushing_fumbles':'Rush Fumbles','rushing_fumbles_lost':'Lost Rush','rushing_first_downs':'Rush 1sts','rushing_epa':'Rush EPA','rushing_2pt_conversions':'Rush 2pt','receptions':'Rec','targets':"Tgts",'receiving_yards':'Rec Yards','receiving_tds':'Rec TDs','receiving_fumbles':'Rec Fumble','receiving_fumbles_lost':'Lost Rec','receiving_air_yards':'Rec Air Yards','receiving_yards_after_catch':'Rec YAC','receiving_first_downs':'Rec 1sts','receiving_epa':'Rec EPA','receiving_2pt_conversions':'Rec 2pts','racr':'RACR','target_share':'Target Share','air_yards_share':'Air Yds Share','wopr':'WOPR','special_teams_tds':'Special Teams TDs','fantasy_points':'STD Points','fantasy_points_ppr':'PPR Points'})
+    player_data = player_data.style.hide(['player_id','player_name','player_display_name','position','position_group','headshot_url','season','season_type','dakota'], axis="columns").hide(axis="index")
+    player_data = player_data.format(subset=['Pass Yards','INTs','Sacks','Sack Yards','Air Yards','Sacks','Sack Yards','Air Yards','YAC','Pass 1sts','Rush Yards','Lost Sack','Rush Fumbles','Lost Rush','Rush 1sts','Rec Yards','Rec Fumble','Lost Rec','Rec Air Yards','Rec YAC','Rec 1sts','Special Teams TDs'],precision=0).format(subset=['Pass EPA','PACR','Rush EPA','Rec EPA','STD Points','PPR Points','RACR','WOPR','Target Share','Air Yds Share'],precision=2)
+    return {
+        'table': player_data.to_html(classes="table"),
+        'headshot': str(headshot[0]),
+        'position': str(position[0]),
+    }
+
 @app.route('/NFL/Player/<name>')
 def player_stats(name):
     selected_year = get_selected_year()
     available_years = get_available_years()
     try:
         file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_weekly_data.csv'
-        weekly_data = pd.read_csv(file_path, index_col=0)
-        player_data = weekly_data.loc[weekly_data['player_display_name'] == name]
-        headshot = '<img src="' + player_data['headshot_url'] + '" width="360" >'
-        headshot = headshot.unique()
-        position = player_data['position'].unique()
-        player_data.target_share = player_data.target_share * 100
-        player_data.air_yards_share = player_data.air_yards_share * 100
-        player_data = player_data.rename(columns={'recent_team':'Team','week':'Week','opponent_team':'Opponent','completions':'Completions','attempts':'Attempts','passing_yards':'Pass Yards','passing_tds':'Pass TDs','interceptions':'INTs','sacks':'Sacks','sack_yards':'Sack Yards','sack_fumbles':'Sack Fumbles','sack_fumbles_lost':'Lost Sack','passing_air_yards':'Air Yards','passing_yards_after_catch':'YAC','passing_first_downs':'Pass 1sts','passing_epa':'Pass EPA','passing_2pt_conversions':'Pass 2pt','pacr':'PACR','carries':'Carries','rushing_yards':'Rush Yards','rushing_tds':'Rush TD','rushing_fumbles':'Rush Fumbles','rushing_fumbles_lost':'Lost Rush','rushing_first_downs':'Rush 1sts','rushing_epa':'Rush EPA','rushing_2pt_conversions':'Rush 2pt','receptions':'Rec','targets':"Tgts",'receiving_yards':'Rec Yards','receiving_tds':'Rec TDs','receiving_fumbles':'Rec Fumble','receiving_fumbles_lost':'Lost Rec','receiving_air_yards':'Rec Air Yards','receiving_yards_after_catch':'Rec YAC','receiving_first_downs':'Rec 1sts','receiving_epa':'Rec EPA','receiving_2pt_conversions':'Rec 2pts','racr':'RACR','target_share':'Target Share','air_yards_share':'Air Yds Share','wopr':'WOPR','special_teams_tds':'Special Teams TDs','fantasy_points':'STD Points','fantasy_points_ppr':'PPR Points'})
-        player_data = player_data.style.hide(['player_id','player_name','player_display_name','position','position_group','headshot_url','season','season_type','dakota'], axis="columns").hide(axis="index")
-        player_data = player_data.format(subset=['Pass Yards','INTs','Sacks','Sack Yards','Air Yards','Sacks','Sack Yards','Air Yards','YAC','Pass 1sts','Rush Yards','Lost Sack','Rush Fumbles','Lost Rush','Rush 1sts','Rec Yards','Rec Fumble','Lost Rec','Rec Air Yards','Rec YAC','Rec 1sts','Special Teams TDs'],precision=0).format(subset=['Pass EPA','PACR','Rush EPA','Rec EPA','STD Points','PPR Points','RACR','WOPR','Target Share','Air Yds Share'],precision=2)
+        player = cached_fragment('player_stats', [name], [file_path],
+                                 lambda: _render_player_stats(file_path, name))
         return render_template('player-stats.html', 
-                             player_stats = player_data.to_html(classes="table"), 
+                             player_stats = player['table'], 
                              name = name, 
-                             headshot = headshot[0], 
-                             position = position[0],
+                             headshot = player['headshot'], 
+                             position = player['position'],
                              years=available_years,
                              selected_year=selected_year)
     except IndexError:
         try:
             file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_rosters.csv'
-            weekly_data = pd.read_csv(file_path, index_col=0)
+            weekly_data = read_dataset(file_path, index_col=0)
             player_data = weekly_data.loc[weekly_data['player_name'] == name]
             headshot = '<img src="' + player_data['headshot_url'] + '" width="360" >'
             headshot = headshot.unique()
@@ -1032,33 +1102,35 @@ def player_stats(name):
             flash(f'Player data for {name} in {selected_year} not found.')
             return redirect(url_for('NFL', year=selected_year))
 
+def _render_fpa_table(fpa_path):
+    fpa_data = read_dataset(fpa_path, index_col=0).sort_values(by=['Team Name'])
+
+    # Color each position column from fewest (green) to most (red) points allowed
+    return render_table(fpa_data, precision=2, gradients=['QB', 'RB', 'WR', 'TE'], classes='table')
+
 @app.route('/NFL/FPA')
 def fpa():
     selected_year = get_selected_year()
     available_years = get_available_years()
     fpa_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_FPA.csv'
+    # One chart per season, redrawn only when the FPA dataset is newer
+    plot_file = f'images/{selected_year}_FPA.png'
+    plot_path = os.path.join(app.static_folder, plot_file)
     try:
-        fpa_data = pd.read_csv(fpa_path, index_col=0)
-        fpa_data.sort_values(by=['Team Name'], inplace=True)
-        
-        # Create plots
-        cols = list(fpa_data.columns.values)
-        cols.pop(0)
-        fpa_data.set_index('Team Name').plot.bar(subplots=True, figsize=(8, 16), sharex=False)
-        plt.tight_layout()
-        plt.savefig('nickknows/static/images/FPA.png')
-        
-        # Style the table with color gradients for each column
-        fpa_data = fpa_data.style\
-            .hide(axis="index")\
-            .format(precision=2)\
-            .background_gradient(subset=['QB'], cmap='RdYlGn_r')\
-            .background_gradient(subset=['RB'], cmap='RdYlGn_r')\
-            .background_gradient(subset=['WR'], cmap='RdYlGn_r')\
-            .background_gradient(subset=['TE'], cmap='RdYlGn_r')
-        
+        if not os.path.exists(plot_path) or os.path.getmtime(plot_path) < os.path.getmtime(fpa_path):
+            fpa_data = read_dataset(fpa_path, index_col=0).sort_values(by=['Team Name'])
+            with metrics.span('matplotlib'):
+                chart_data = fpa_data.set_index('Team Name')
+                fig = _figure(figsize=(8, 16))
+                axes = fig.subplots(nrows=len(chart_data.columns), squeeze=False)[:, 0]
+                chart_data.plot.bar(subplots=True, ax=axes, sharex=False)
+                fig.tight_layout()
+                # The chart lives on the shared volume: other pods must never see half a PNG
+                write_file_atomic(plot_path, lambda tmp_path: fig.savefig(tmp_path, format='png'))
+
         return render_template('fpa.html', 
-                             fpa_data=fpa_data.to_html(classes='table'),
+                             fpa_data=cached_fragment('fpa', [], [fpa_path], lambda: _render_fpa_table(fpa_path)),
+                             fpa_plot=plot_file,
                              years=available_years,
                              selected_year=selected_year)
     except Exception as e:
@@ -1074,15 +1146,16 @@ def team_schedule(team, fullname):
         file_path = team_dir + str(selected_year) + '_' + team + '_schedule.csv'
         
         if not os.path.exists(file_path):
-            update_team_schedule.delay(team, selected_year)
-            flash(f'Team schedule for {fullname} ({selected_year}) is updating. Please refresh in a moment.')
+            job_id = start_job('team_schedule', update_team_schedule, team, selected_year)
+            _flash_job(job_id, f'Team schedule for {fullname} ({selected_year}) is updating. Please refresh in a moment.')
             return redirect(url_for('NFL', year=selected_year))
         
-        team_schedule_data = pd.read_csv(file_path, index_col=0)
-        team_schedule_data = team_schedule_data.style.hide(axis="index")
+        team_schedule_html = cached_fragment(
+            'team_schedule', [team], [file_path],
+            lambda: read_dataset(file_path, index_col=0).style.hide(axis="index").to_html(classes="table", escape=False))
         
         return render_template('team-schedule.html', 
-                             team_schedule=team_schedule_data.to_html(classes="table", escape=False), 
+                             team_schedule=team_schedule_html, 
                              fullname=fullname,
                              years=available_years,
                              selected_year=selected_year)
@@ -1099,15 +1172,16 @@ def team_results(team, fullname):
         file_path = team_dir + str(selected_year) + '_' + team + '_data.csv'
         
         if not os.path.exists(file_path):
-            update_weekly_team_data.delay(team, selected_year)
-            flash(f'Team results for {fullname} ({selected_year}) are updating. Please refresh in a moment.')
+            job_id = start_job('team_results', update_weekly_team_data, team, selected_year)
+            _flash_job(job_id, f'Team results for {fullname} ({selected_year}) are updating. Please refresh in a moment.')
             return redirect(url_for('NFL', year=selected_year))
         
-        team_data = pd.read_csv(file_path, index_col=0)
-        team_data = team_data.style.hide(axis="index")
+        team_results_html = cached_fragment(
+            'team_results', [team], [file_path],
+            lambda: read_dataset(file_path, index_col=0).style.hide(axis="index").to_html(classes="table"))
         
         return render_template('team-results.html', 
-                             team_results=team_data.to_html(classes="table"), 
+                             team_results=team_results_html, 
                              fullname=fullname,
                              years=available_years,
                              selected_year=selected_year)
@@ -1115,6 +1189,40 @@ def team_results(team, fullname):
         flash(f'Error loading team results for {fullname} ({selected_year}): {str(e)}')
         return redirect(url_for('NFL', year=selected_year))
 
+def _render_team_fpa(file_path):
+    """Team FPA summary and per-position tables, plus the position averages"""
+    team_data = read_dataset(file_path, index_col=0)
+
+    # Calculate position aggregates with error handling
+    pass_agg = team_data[team_data['position'] == 'QB']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'QB']) > 0 else 0
+    rush_agg = team_data[team_data['position'] == 'RB']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'RB']) > 0 else 0
+    rec_agg = team_data[team_data['position'] == 'WR']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'WR']) > 0 else 0
+    te_agg = team_data[team_data['position'] == 'TE']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'TE']) > 0 else 0
+
+    # Break down by position for detailed tables
+    pass_data = team_data[team_data['position'] == 'QB'].style.hide(axis="index")
+    rush_data = team_data[team_data['position'] == 'RB'].style.hide(axis="index")
+    rec_data = team_data[team_data['position'] == 'WR'].style.hide(axis="index")
+    te_data = team_data[team_data['position'] == 'TE'].style.hide(axis="index")
+
+    # Overall team FPA summary
+    team_fpa_summary = pd.DataFrame({
+        'Position': ['QB', 'RB', 'WR', 'TE'],
+        'Avg Fantasy Points Against': [pass_agg, rush_agg, rec_agg, te_agg]
+    }).style.hide(axis="index")
+
+    return {
+        'team_fpa': team_fpa_summary.to_html(classes="table"),
+        'pass_data': pass_data.to_html(classes="table"),
+        'rush_data': rush_data.to_html(classes="table"),
+        'rec_data': rec_data.to_html(classes="table"),
+        'te_data': te_data.to_html(classes="table"),
+        'pass_agg': float(pass_agg),
+        'rush_agg': float(rush_agg),
+        'rec_agg': float(rec_agg),
+        'te_agg': float(te_agg),
+    }
+
 @app.route('/NFL/Team/FPA/<team>/<fullname>')
 def team_fpa(team, fullname):
     try:
@@ -1124,40 +1232,15 @@ def team_fpa(team, fullname):
         file_path = team_dir + str(selected_year) + '_' + team + '_data.csv'
         
         if not os.path.exists(file_path):
-            process_team_data.delay(team, selected_year)
-            flash(f'Team FPA data for {fullname} ({selected_year}) is updating. Please refresh in a moment.')
+            job_id = start_job('team_fpa', process_team_data, team, selected_year)
+            _flash_job(job_id, f'Team FPA data for {fullname} ({selected_year}) is updating. Please refresh in a moment.')
             return redirect(url_for('NFL', year=selected_year))
         
-        team_data = pd.read_csv(file_path, index_col=0)
-        
-        # Calculate position aggregates with error handling
-        pass_agg = team_data[team_data['position'] == 'QB']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'QB']) > 0 else 0
-        rush_agg = team_data[team_data['position'] == 'RB']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'RB']) > 0 else 0
-        rec_agg = team_data[team_data['position'] == 'WR']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'WR']) > 0 else 0
-        te_agg = team_data[team_data['position'] == 'TE']['fantasy_points_ppr'].mean() if len(team_data[team_data['position'] == 'TE']) > 0 else 0
-        
-        # Break down by position for detailed tables
-        pass_data = team_data[team_data['position'] == 'QB'].style.hide(axis="index")
-        rush_data = team_data[team_data['position'] == 'RB'].style.hide(axis="index")
-        rec_data = team_data[team_data['position'] == 'WR'].style.hide(axis="index")
-        te_data = team_data[team_data['position'] == 'TE'].style.hide(axis="index")
-        
-        # Overall team FPA summary
-        team_fpa_summary = pd.DataFrame({
-            'Position': ['QB', 'RB', 'WR', 'TE'],
-            'Avg Fantasy Points Against': [pass_agg, rush_agg, rec_agg, te_agg]
-        }).style.hide(axis="index")
+        fragments = cached_fragment('team_fpa', [team], [file_path],
+                                    lambda: _render_team_fpa(file_path))
         
         return render_template('team-fpa.html',
-                             team_fpa=team_fpa_summary.to_html(classes="table"),
-                             pass_data=pass_data.to_html(classes="table"),
-                             rush_data=rush_data.to_html(classes="table"),
-                             rec_data=rec_data.to_html(classes="table"),
-                             te_data=te_data.to_html(classes="table"),
-                             pass_agg=pass_agg,
-                             rush_agg=rush_agg,
-                             rec_agg=rec_agg,
-                             te_agg=te_agg,
+                             **fragments,
                              fullname=fullname,
                              team=team,
                              years=available_years,
@@ -1275,7 +1358,7 @@ def team_page(team):
         schedule_data = None
         if os.path.exists(schedule_file):
             try:
-                schedule_df = pd.read_csv(schedule_file, index_col=0)
+                schedule_df = read_dataset(schedule_file, index_col=0)
                 schedule_df = schedule_df.dropna(subset=['away_score'])  # Only completed games
                 
                 # Calculate record
@@ -1303,7 +1386,7 @@ def team_page(team):
         fpa_summary = None
         if os.path.exists(fpa_file):
             try:
-                fpa_df = pd.read_csv(fpa_file, index_col=0)
+                fpa_df = read_dataset(fpa_file, index_col=0)
                 
                 # Calculate position aggregates
                 pass_agg = fpa_df[fpa_df['position'] == 'QB']['fantasy_points_ppr'].mean() if len(fpa_df[fpa_df['position'] == 'QB']) > 0 else 0
@@ -1325,7 +1408,7 @@ def team_page(team):
         roster_summary = None
         if os.path.exists(roster_file):
             try:
-                roster_df = pd.read_csv(roster_file, index_col=0)
+                roster_df = read_dataset(roster_file, index_col=0)
                 team_roster = roster_df[roster_df['team'] == team]
                 
                 # Get position counts
@@ -1347,7 +1430,7 @@ def team_page(team):
         has_opportunity_data = False
         if os.path.exists(opp_file):
             try:
-                opp_df = pd.read_csv(opp_file)
+                opp_df = read_dataset(opp_file)
                 has_opportunity_data = len(opp_df[opp_df['team'] == team]) > 0
             except:
                 pass
@@ -1505,8 +1588,8 @@ def team_snap_counts(team, fullname):
         
         if not os.path.exists(snap_file_path):
             # Trigger data update
-            update_snap_count_data.delay(team, selected_year)
-            flash(f'Snap count data for {fullname} is being updated. Please refresh in a moment.')
+            job_id = start_job('team_snap_counts', update_snap_count_data, team, selected_year)
+            _flash_job(job_id, f'Snap count data for {fullname} is being updated. Please refresh in a moment.')
             return render_template('snap-counts-team.html',
                                  team=team,
                                  fullname=fullname,
@@ -1517,7 +1600,7 @@ def team_snap_counts(team, fullname):
         
         # Load and process snap count data
         try:
-            snap_data = pd.read_csv(snap_file_path)
+            snap_data = read_dataset(snap_file_path)
             
             # Check if the DataFrame is empty
             if snap_data.empty:
@@ -1731,28 +1814,37 @@ def team_snap_counts(team, fullname):
 def update_team_snap_counts(team):
     """Trigger snap count data update for a specific team"""
     selected_year = get_selected_year()
-    update_snap_count_data.delay(team, selected_year)
-    flash(f'Snap count data for {team} is updating in the background.')
-    return redirect(url_for('team_snap_counts', team=team, fullname=get_team_fullname(team)))
+    job_id = start_job('team_snap_counts', update_snap_count_data, team, selected_year)
+    return _job_started(job_id, f'Snap count data for {team} is updating in the background.',
+                        'team_snap_counts', team=team, fullname=get_team_fullname(team))
 
 @app.route('/NFL/SnapCounts/api/<team>')
 def snap_counts_api(team):
-    """API endpoint for snap count data"""
+    """
+    API endpoint for snap count data. The summary is built by a worker:
+    this returns 202 with a job id, and the summary is the `result` of
+    /NFL/jobs/<job_id> once its status is complete.
+    """
     try:
         selected_year = get_selected_year()
         position_filter = request.args.get('positions', '').split(',') if request.args.get('positions') else None
         
-        # Get formatted data
-        result = get_snap_count_summary.delay(team, selected_year, position_filter).get(timeout=30)
+        job_id = start_job('snap_count_summary', get_snap_count_summary, team, selected_year, position_filter)
         
-        return json.dumps(result), 200, {'Content-Type': 'application/json'}
+        return _json_response({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('job_status', job_id=job_id),
+            'team': team,
+            'year': selected_year
+        }, 202)
         
     except Exception as e:
-        return json.dumps({
+        return _json_response({
             'success': False,
             'error': str(e),
             'team': team
-        }), 500, {'Content-Type': 'application/json'}
+        }, 500)
 
 @app.route('/NFL/SnapCounts/player/<team>/<player_name>')
 def player_snap_history(team, player_name):
@@ -1765,11 +1857,11 @@ def player_snap_history(team, player_name):
         snap_file_path = os.getcwd() + f'/nickknows/nfl/data/{team}/{selected_year}_{team}_snap_counts.csv'
         
         if not os.path.exists(snap_file_path):
-            update_snap_count_data.delay(team, selected_year)
-            flash(f'Snap count data is being updated. Please refresh in a moment.')
+            job_id = start_job('team_snap_counts', update_snap_count_data, team, selected_year)
+            _flash_job(job_id, f'Snap count data is being updated. Please refresh in a moment.')
             return redirect(url_for('team_snap_counts', team=team, fullname=get_team_fullname(team)))
         
-        snap_data = pd.read_csv(snap_file_path, index_col=0)
+        snap_data = read_dataset(snap_file_path, index_col=0)
         player_data = snap_data[snap_data['player'] == player_name]
         
         if player_data.empty:
@@ -1820,9 +1912,9 @@ def player_snap_history(team, player_name):
 def update_all_snap_counts():
     """Trigger snap count data update for all teams"""
     selected_year = get_selected_year()
-    update_all_teams_snap_counts.delay(selected_year)
-    flash(f'Snap count data for all teams is updating in the background for {selected_year} season.')
-    return redirect(url_for('snap_counts_home', year=selected_year))
+    job_id = start_job('all_snap_counts', update_all_teams_snap_counts, selected_year)
+    return _job_started(job_id, f'Snap count data for all teams is updating in the background for {selected_year} season.',
+                        'snap_counts_home', year=selected_year)
 
 
 @app.route('/NFL/Opportunities')
@@ -1838,15 +1930,15 @@ def opportunities_home():
         trend_file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_opportunity_trends.csv'
         
         if not os.path.exists(trend_file_path):
-            update_opportunity_data.delay(selected_year)
-            flash(f'Opportunity data for {selected_year} is updating. Please refresh in a moment.')
+            job_id = start_job('opportunities', update_opportunity_data, selected_year, queue=RENDER_QUEUE)
+            _flash_job(job_id, f'Opportunity data for {selected_year} is updating. Please refresh in a moment.')
             return render_template('opportunities-home.html',
                                  years=available_years,
                                  selected_year=selected_year,
                                  loading=True)
         
         try:
-            trend_data = pd.read_csv(trend_file_path)
+            trend_data = read_dataset(trend_file_path)
             logger.info(f"Loaded trend data: {len(trend_data)} records")
         except Exception as e:
             logger.error(f"Error loading trend data: {str(e)}")
@@ -1978,22 +2070,8 @@ def get_leaderboard_view(trend_data, metric, top_n=15, min_weeks=2):
         if len(display_cols) == 0:
             return f"<p class='text-warning'>No displayable columns for {metric}</p>"
         
-        # Create display dataframe
-        leaders_display = leaders[display_cols].copy()
-        
-        # Round numeric columns
-        numeric_cols = leaders_display.select_dtypes(include=[np.number]).columns
-        leaders_display[numeric_cols] = leaders_display[numeric_cols].round(2)
-        
-        # Rename columns
-        leaders_display = leaders_display.rename(columns=col_rename)
-        
-        # Convert to HTML with styling
-        html = leaders_display.style\
-            .hide(axis="index")\
-            .to_html(classes="table table-sm table-striped", escape=False)
-        
-        return html
+        return render_table(leaders, columns=display_cols, rename=col_rename, precision=2,
+                            classes="table table-sm table-striped", escape=False)
         
     except Exception as e:
         logger.error(f"Error in get_leaderboard_view for {metric}: {str(e)}")
@@ -2077,16 +2155,8 @@ def get_trending_players_view(trend_data, metric, direction='up', min_trend=20,
         if len(display_cols) < 3:
             return f"<p class='text-warning'>Insufficient data columns for {metric} display</p>"
         
-        result_display = result[display_cols].copy()
-        
-        # Round numeric columns
-        numeric_cols = result_display.select_dtypes(include=[np.number]).columns
-        result_display[numeric_cols] = result_display[numeric_cols].round(2)
-        
-        # Rename columns
-        result_display = result_display.rename(columns=col_rename)
-        
-        return result_display.style.hide(axis="index").to_html(classes="table table-sm", escape=False)
+        return render_table(result, columns=display_cols, rename=col_rename, precision=2,
+                            classes="table table-sm", escape=False)
                
     except Exception as e:
         logger.error(f"Error in get_trending_players_view for {metric}: {str(e)}")
@@ -2112,6 +2182,7 @@ def team_opportunities(team):
         
         # Get team info for styling
         try:
+            import nflreadpy as nfl  # only this page needs it; slow to import
             team_desc = nfl.import_team_desc()
             team_mapping = {'LV': 'OAK', 'LAC': 'SD', 'LA': 'LAR'}
             lookup_abbr = team_mapping.get(team, team)
@@ -2135,8 +2206,8 @@ def team_opportunities(team):
         trend_file_path = os.getcwd() + '/nickknows/nfl/data/' + str(selected_year) + '_opportunity_trends.csv'
         
         if not os.path.exists(opp_file_path) or not os.path.exists(trend_file_path):
-            update_opportunity_data.delay(selected_year)
-            flash(f'Opportunity data for {fullname} is updating. Please refresh in a moment.')
+            job_id = start_job('opportunities', update_opportunity_data, selected_year, queue=RENDER_QUEUE)
+            _flash_job(job_id, f'Opportunity data for {fullname} is updating. Please refresh in a moment.')
             return render_template('team-opportunities.html',
                                  team=team,
                                  fullname=fullname,
@@ -2146,8 +2217,8 @@ def team_opportunities(team):
                                  loading=True)
         
         # Load data
-        opportunity_data = pd.read_csv(opp_file_path)
-        trend_data = pd.read_csv(trend_file_path)
+        opportunity_data = read_dataset(opp_file_path)
+        trend_data = read_dataset(trend_file_path)
         
         logger.info(f"Loaded opportunity data: {len(opportunity_data)} records")
         logger.info(f"Loaded trend data: {len(trend_data)} records")
@@ -2300,9 +2371,9 @@ def team_opportunities(team):
 def update_opportunities():
     """Trigger opportunity data update"""
     selected_year = get_selected_year()
-    update_opportunity_data.delay(selected_year)
-    flash(f'Opportunity data for {selected_year} is updating in the background.')
-    return redirect(url_for('opportunities_home'))
+    job_id = start_job('opportunities', update_opportunity_data, selected_year, queue=RENDER_QUEUE)
+    return _job_started(job_id, f'Opportunity data for {selected_year} is updating in the background.',
+                        'opportunities_home')
 
 def get_trending_players_view(trend_data, metric, direction='up', min_trend=20, min_avg=1):
     """Get trending players for view"""
@@ -2364,12 +2435,6 @@ def get_trending_players_view(trend_data, metric, direction='up', min_trend=20,
         if len(display_cols) < 3:
             return f"<p class='text-warning'>Insufficient data columns for {metric} display</p>"
         
-        result_display = result[display_cols].copy()
-        
-        # Round numeric columns
-        numeric_cols = result_display.select_dtypes(include=[np.number]).columns
-        result_display[numeric_cols] = result_display[numeric_cols].round(2)
-        
         # Format column names for display
         col_rename = {
             'player_name': 'Player',
@@ -2381,9 +2446,8 @@ def get_trending_players_view(trend_data, metric, direction='up', min_trend=20,
             f'{metric}_trend': 'Trend %'
         }
         
-        result_display = result_display.rename(columns=col_rename)
-        
-        return result_display.style.hide(axis="index").to_html(classes="table table-sm", escape=False)
+        return render_table(result, columns=display_cols, rename=col_rename, precision=2,
+                            classes="table table-sm", escape=False)
                
     except Exception as e:
         print(f"Error in get_trending_players_view: {str(e)}")
@@ -2434,12 +2498,6 @@ def get_opportunity_leaders_view(trend_data, metric, min_weeks=2):
         if len(display_cols) < 3:
             return f"<p class='text-warning'>Insufficient data for {metric} leaders</p>"
         
-        leaders_display = leaders[display_cols].copy()
-        
-        # Round numeric columns
-        numeric_cols = leaders_display.select_dtypes(include=[np.number]).columns
-        leaders_display[numeric_cols] = leaders_display[numeric_cols].round(2)
-        
         # Format column names
         col_rename = {
             'player_name': 'Player',
@@ -2451,9 +2509,8 @@ def get_opportunity_leaders_view(trend_data, metric, min_weeks=2):
             f'{metric}_max': 'Max'
         }
         
-        leaders_display = leaders_display.rename(columns=col_rename)
-        
-        return leaders_display.style.hide(axis="index").to_html(classes="table table-sm", escape=False)
+        return render_table(leaders, columns=display_cols, rename=col_rename, precision=2,
+                            classes="table table-sm", escape=False)
         
     except Exception as e:
         print(f"Error in get_opportunity_leaders_view: {str(e)}")
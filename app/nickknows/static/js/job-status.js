@@ -0,0 +1,44 @@
+// Polls the job behind an "is updating" flash message and says when the data
+// is ready. Any element with data-job-status="<status url>" is updated in
+// place from /NFL/jobs/<job_id>; polling stops once the job completes, fails
+// or can no longer be found.
+(function () {
+    const POLL_MS = 3000;
+
+    function describe(job) {
+        if (job.status === 'complete') return 'Done — reload to see the new data.';
+        if (job.status === 'failed') return 'Update failed' + (job.error ? ': ' + job.error : '.');
+        if (job.stages) {
+            const done = job.stages.filter(function (s) { return s.status === 'complete'; }).length;
+            const running = job.stages.find(function (s) { return s.status === 'running'; });
+            return 'Updating: ' + done + ' of ' + job.stages.length + ' steps done' +
+                (running ? ' (' + running.name.replace(/_/g, ' ') + ')' : '') + '…';
+        }
+        return job.status === 'running' ? 'Updating…' : 'Waiting for a worker…';
+    }
+
+    function poll(el) {
+        fetch(el.getAttribute('data-job-status'), { headers: { 'Accept': 'application/json' } })
+            .then(function (response) { return response.json(); })
+            .then(function (job) {
+                if (!job.success) {
+                    el.textContent = '';
+                    return;
+                }
+                el.textContent = describe(job);
+                if (job.status === 'complete') {
+                    const reload = document.createElement('a');
+                    reload.href = window.location.href;
+                    reload.textContent = ' Reload';
+                    el.appendChild(reload);
+                } else if (job.status !== 'failed') {
+                    setTimeout(function () { poll(el); }, POLL_MS);
+                }
+            })
+            .catch(function () {
+                setTimeout(function () { poll(el); }, POLL_MS * 2);
+            });
+    }
+
+    document.querySelectorAll('[data-job-status]').forEach(poll);
+})();
@@ -0,0 +1,36 @@
+"""
+Fragment cache key tests.
+Redis is skipped (as if it were down), so only the per-process cache is used.
+"""
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nickknows.nfl import fragment_cache
+
+
+@pytest.fixture(autouse=True)
+def memory_only():
+    fragment_cache.clear_memory()
+    with patch.object(fragment_cache, '_redis_down_until', float('inf')):
+        yield
+    fragment_cache.clear_memory()
+
+
+def test_datasets_with_matching_stamps_get_their_own_fragment(tmp_path):
+    paths = [str(tmp_path / f'{year}_FPA.csv') for year in (2024, 2025)]
+    for path in paths:
+        with open(path, 'w') as f:
+            f.write('a\n1\n')
+    # Same version stamp for both seasons, e.g. both at manifest version 1
+    with patch.object(fragment_cache, 'dataset_stamp', return_value=[1, 1700000000.0]):
+        rendered = [fragment_cache.cached_fragment('fpa', [], [path], lambda path=path: path)
+                    for path in paths]
+        again = fragment_cache.cached_fragment('fpa', [], [paths[0]], lambda: 'stale')
+
+    assert rendered == paths
+    assert again == paths[0]
@@ -0,0 +1,51 @@
+"""
+HTML table renderer tests.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nickknows.nfl.html_tables import render_table
+
+
+def _frame():
+    return pd.DataFrame({
+        'player_name': ['A <b>', 'B&C', None],
+        'weeks': [1, 2, 3],
+        'avg': [1.234, np.nan, 3.0],
+    }, index=[10, 20, 30])
+
+
+def test_columns_rename_and_precision():
+    html = render_table(_frame(), columns=['weeks', 'avg'], rename={'avg': 'Avg'}, precision=2,
+                        classes='table table-sm')
+    assert html.startswith('<table class="table table-sm"><thead><tr><th>weeks</th><th>Avg</th></tr>')
+    assert '<tr><td>1</td><td>1.23</td></tr>' in html
+    assert '<tr><td>2</td><td></td></tr>' in html
+    assert '10' not in html  # index hidden
+
+
+def test_escaping_and_links():
+    html = render_table(_frame(), columns=['player_name'], links={'player_name': '/NFL/Player/{}'})
+    assert '<a href="/NFL/Player/A%20%3Cb%3E">A &lt;b&gt;</a>' in html
+    assert '<a href="/NFL/Player/B%26C">B&amp;C</a>' in html
+    assert '<tr><td></td></tr>' in html  # missing values are not linked
+
+    raw = render_table(_frame(), columns=['player_name'], escape=False)
+    assert '<td>A <b></td>' in raw
+
+
+def test_gradient_classes():
+    html = render_table(_frame(), columns=['avg'], precision=1, gradients=['avg'])
+    assert '<td class="heat-0">1.2</td>' in html
+    assert '<td class="heat-6">3.0</td>' in html
+    assert '<td></td>' in html
+
+
+def test_empty_frame():
+    assert render_table(_frame().iloc[:0], columns=['weeks']) == \
+        '<table><thead><tr><th>weeks</th></tr></thead><tbody></tbody></table>'
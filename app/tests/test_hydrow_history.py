@@ -0,0 +1,72 @@
+"""
+Hydrow workout history store tests.
+A local stand-in feeds the sync, so no broker or network is needed.
+"""
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nickknows.hydrow import history
+
+
+class FakeWorkoutSource:
+    """Serves workouts by date range, as sync_workouts' fetch does."""
+
+    def __init__(self, workouts):
+        self.workouts = workouts
+        self.calls = []
+
+    def __call__(self, start_iso, end_iso):
+        self.calls.append((start_iso, end_iso))
+        return [w for w in self.workouts if start_iso <= w["started_at"][:10] <= end_iso]
+
+
+def _workout(workout_id, day, meters, seconds=1200, calories=200):
+    return {"id": workout_id, "started_at": f"{day.isoformat()}T07:00:00Z",
+            "meters": str(meters), "seconds": seconds, "calories": calories}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_START", "2026-01-01")
+    return str(tmp_path / "workouts.sqlite3")
+
+
+def test_sync_is_incremental(db_path):
+    today = date(2026, 6, 30)
+    api = FakeWorkoutSource([_workout("a", date(2026, 1, 5), 5000),
+                         _workout("b", date(2026, 6, 29), 6000)])
+
+    first = history.sync_workouts(api, today=today, db_path=db_path)
+    assert first["upserted"] == 2
+    assert first["cursor"] == today.isoformat()
+    assert history.get_cursor(db_path) == today.isoformat()
+
+    # Next sync only re-reads the overlap, and picks up late uploads there
+    api.calls.clear()
+    api.workouts.append(_workout("c", today, 4000))
+    second = history.sync_workouts(api, today=today + timedelta(days=1), db_path=db_path)
+    assert api.calls == [("2026-06-29", "2026-07-01")]
+    assert second["upserted"] == 2  # b (already stored) and c
+    assert len(history.daily_totals(date(2026, 1, 1), today, db_path=db_path)) == 3
+
+
+def test_streaks_rolling_distance_and_records(db_path):
+    today = date(2026, 3, 10)
+    days = [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3),   # 3-day run
+            date(2026, 3, 8), date(2026, 3, 9)]                      # current run
+    workouts = [_workout(f"w{i}", d, 1000 * (i + 1)) for i, d in enumerate(days)]
+    workouts.append(_workout("long", date(2026, 3, 9), 500, seconds=3600, calories=900))
+    history.sync_workouts(FakeWorkoutSource(workouts), today=today, db_path=db_path)
+
+    assert history.streaks(today=today, db_path=db_path) == {"current": 2, "longest": 3}
+    assert history.rolling_distance(3, end=today, db_path=db_path) == 4000 + 5000 + 500
+
+    records = history.personal_records(db_path=db_path)
+    assert records["longest_row"] == {"value": 5000, "date": "2026-03-09"}
+    assert records["longest_session"] == {"value": 3600, "date": "2026-03-09"}
+    assert records["biggest_day"] == {"value": 5500, "date": "2026-03-09"}
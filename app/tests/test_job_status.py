@@ -0,0 +1,250 @@
+"""
+Job status tests.
+A small in-memory stand-in replaces Redis and the Celery result backend, so
+no broker or worker is needed.
+"""
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nickknows.celery_setup import job_status
+from nickknows.celery_setup.task_orchestrator import FULL_SEASON_STAGES, build_full_season_workflow
+
+
+class FakeRedis:
+    """The handful of Redis calls job_status makes, on plain dicts."""
+
+    def __init__(self):
+        self.strings = {}
+        self.ttls = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value, ex=None):
+        self.strings[key] = value
+        self.ttls[key] = ex
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def register_script(self, script):
+        scripts = {
+            job_status._CLAIM_INFLIGHT: self._claim,
+            job_status._RELEASE_INFLIGHT: self._release,
+            job_status._RENEW_INFLIGHT: self._renew,
+        }
+        return scripts[script]
+
+    def _claim(self, keys, args):
+        if keys[0] in self.strings:
+            return self.strings[keys[0]]
+        self.set(keys[0], args[0], ex=args[1])
+        return None
+
+    def _release(self, keys, args):
+        if self.strings.get(keys[0]) != args[0]:
+            return 0
+        del self.strings[keys[0]]
+        return 1
+
+    def _renew(self, keys, args):
+        if self.strings.get(keys[0]) != args[0]:
+            return 0
+        return self.expire(keys[0], args[1])
+
+
+@pytest.fixture
+def fake_redis():
+    r = FakeRedis()
+    with patch.object(job_status, 'get_redis', return_value=r):
+        yield r
+
+
+def _task_state(state, result=None):
+    return patch.object(job_status.celery, 'AsyncResult',
+                        return_value=MagicMock(state=state, result=result))
+
+
+def _start_staged_job(fake_redis, job_id='job-1', args=(2025,)):
+    key = job_status._inflight_key('nfl.orchestrator.update_full_season', args)
+    assert job_status._track_job(job_id, 'full_season', key, args, FULL_SEASON_STAGES) is None
+    return key
+
+
+def test_unknown_job_is_none(fake_redis):
+    with _task_state('PENDING'):
+        assert job_status.get_job_status('nope') is None
+
+
+def test_staged_job_reports_stage_progress(fake_redis):
+    _start_staged_job(fake_redis)
+    # The launcher task succeeds straight away; the stages say how far the workflow is
+    with _task_state('SUCCESS', {'job_id': 'job-1'}):
+        assert job_status.get_job_status('job-1')['status'] == 'queued'
+
+        job_status.job_stage_started('job-1', 'core_data')
+        job_status.job_stage_started('job-1', 'stat_leaders')
+        status = job_status.get_job_status('job-1')
+
+    assert status['status'] == 'running'
+    assert [s['status'] for s in status['stages']] == ['complete', 'running', 'pending', 'pending']
+    assert [s['name'] for s in status['stages']] == list(FULL_SEASON_STAGES)
+    assert status['progress'] == 0.25
+    assert 'result' not in status
+
+
+def test_staged_job_complete_releases_marker(fake_redis):
+    key = _start_staged_job(fake_redis)
+    for stage in FULL_SEASON_STAGES:
+        job_status.job_stage_started('job-1', stage)
+    job_status.job_complete('job-1')
+
+    with _task_state('SUCCESS'):
+        status = job_status.get_job_status('job-1')
+    assert status['status'] == 'complete'
+    assert status['progress'] == 1.0
+    assert key not in fake_redis.strings
+
+
+def test_staged_job_failure(fake_redis):
+    key = _start_staged_job(fake_redis)
+    job_status.job_stage_started('job-1', 'core_data')
+    job_status.job_stage_started('job-1', 'stat_leaders')
+    job_status.job_failed('job-1', 'stat leaders blew up')
+    # Later failing steps of the same chain don't overwrite the first error
+    job_status.job_failed('job-1', 'second error')
+
+    with _task_state('SUCCESS'):
+        status = job_status.get_job_status('job-1')
+    assert status['status'] == 'failed'
+    assert status['error'] == 'stat leaders blew up'
+    assert [s['status'] for s in status['stages']] == ['complete', 'failed', 'pending', 'pending']
+    assert key not in fake_redis.strings
+
+
+def test_unstaged_job_failure_uses_task_state(fake_redis):
+    job_status._track_job('job-2', 'team_fpa', 'nfl:inflight:x', ['KC', 2025], None)
+    with _task_state('FAILURE', ValueError('no schedule')):
+        status = job_status.get_job_status('job-2')
+    assert status['status'] == 'failed'
+    assert status['error'] == 'no schedule'
+    assert 'stages' not in status
+
+
+def test_start_job_attaches_to_inflight_job(fake_redis):
+    task = MagicMock()
+    task.name = 'nfl.team.process_team_fpa'
+    with patch.object(job_status, '_redis_down_until', 0.0):
+        first = job_status.start_job('team_fpa', task, 'KC', 2025)
+        second = job_status.start_job('team_fpa', task, 'KC', 2025)
+        other = job_status.start_job('team_fpa', task, 'BUF', 2025)
+
+    assert second == first
+    assert other != first
+    assert task.apply_async.call_count == 2
+    key = job_status._inflight_key(task.name, ('KC', 2025))
+    assert fake_redis.strings[key] == first
+    assert task.apply_async.call_args_list[0].kwargs['headers'] == {job_status.INFLIGHT_HEADER: key}
+
+
+def test_stage_started_renews_marker(fake_redis):
+    key = _start_staged_job(fake_redis)
+    fake_redis.ttls[key] = 60  # most of INFLIGHT_TTL used up by the previous stage
+    job_status.job_stage_started('job-1', 'team_fpa')
+    assert fake_redis.ttls[key] == job_status.INFLIGHT_TTL
+
+    # Not once another job holds the marker
+    fake_redis.strings[key] = 'job-2'
+    fake_redis.ttls[key] = 60
+    job_status.job_stage_started('job-1', 'opportunities')
+    assert fake_redis.ttls[key] == 60
+
+
+def test_release_only_deletes_own_marker(fake_redis):
+    fake_redis.strings['nfl:inflight:x'] = 'job-2'
+    job_status._release_inflight('nfl:inflight:x', 'job-1')
+    assert fake_redis.strings['nfl:inflight:x'] == 'job-2'
+    job_status._release_inflight('nfl:inflight:x', 'job-2')
+    assert 'nfl:inflight:x' not in fake_redis.strings
+
+
+def _finish_task(fake_redis, state, kwargs=None, key='nfl:inflight:x', job_id='job-1'):
+    """Run the task_postrun handler for a task sent by start_job; True if its marker was released"""
+    fake_redis.strings[key] = job_id
+    task = SimpleNamespace(request={job_status.INFLIGHT_HEADER: key})
+    job_status._release_finished_job(task_id=job_id, task=task, kwargs=kwargs or {}, state=state)
+    return key not in fake_redis.strings
+
+
+def test_finished_task_releases_marker(fake_redis):
+    assert _finish_task(fake_redis, 'SUCCESS')
+    assert _finish_task(fake_redis, 'FAILURE')
+
+
+def test_retrying_task_keeps_marker(fake_redis):
+    assert not _finish_task(fake_redis, 'RETRY')
+
+
+def test_staged_launcher_success_keeps_marker(fake_redis):
+    # The workflow is still running; job_complete/job_failed release it
+    assert not _finish_task(fake_redis, 'SUCCESS', kwargs={'job_id': 'job-1'})
+    # ...unless the launcher itself failed, and no workflow was sent
+    assert _finish_task(fake_redis, 'FAILURE', kwargs={'job_id': 'job-1'})
+
+
+def test_finished_task_without_marker(fake_redis):
+    job_status._release_finished_job(task_id='job-1', task=SimpleNamespace(request={}), kwargs={}, state='SUCCESS')
+
+
+def test_release_survives_redis_errors(fake_redis):
+    fake_redis.register_script = MagicMock(side_effect=redis.ConnectionError('down'))
+    task = SimpleNamespace(request={job_status.INFLIGHT_HEADER: 'nfl:inflight:x'})
+    job_status._release_finished_job(task_id='job-1', task=task, kwargs={}, state='SUCCESS')
+
+
+def _flatten(sig):
+    """Task signatures of a canvas in run order (a chain turns group + next step into a chord)"""
+    if sig.task == 'celery.chord':
+        return [t for step in sig.tasks for t in _flatten(step)] + _flatten(sig.body)
+    if sig.task in ('celery.chain', 'celery.group'):
+        return [t for step in sig.tasks for t in _flatten(step)]
+    return [sig]
+
+
+def test_full_season_workflow_chains_markers():
+    steps = _flatten(build_full_season_workflow(2025, job_id='job-1'))
+    names = [s.task for s in steps]
+
+    markers = [(s.task, s.args) for s in steps if s.task.startswith('nfl.jobs.')]
+    assert markers == [('nfl.jobs.stage_started', ('job-1', stage)) for stage in FULL_SEASON_STAGES] \
+        + [('nfl.jobs.complete', ('job-1',))]
+    assert all(s.immutable for s in steps if s.task.startswith('nfl.jobs.'))
+
+    # Each stage marker runs right before its stage, and the chain ends on job_complete
+    assert names[0] == 'nfl.jobs.stage_started'
+    assert set(names[1:6]) == {'nfl.core.update_pbp', 'nfl.core.update_rosters', 'nfl.core.update_schedules',
+                               'nfl.core.update_player_stats', 'nfl.core.update_snap_counts'}
+    assert names[6:] == ['nfl.jobs.stage_started', 'nfl.stats.calculate_all_leaders',
+                         'nfl.jobs.stage_started', 'nfl.team.update_all_team_fpa',
+                         'nfl.jobs.stage_started', 'nfl.opportunity.calculate_opportunities',
+                         'nfl.jobs.complete']
+
+
+def test_full_season_workflow_without_job_has_no_markers():
+    steps = _flatten(build_full_season_workflow(2025))
+    assert not any(s.task.startswith('nfl.jobs.') for s in steps)
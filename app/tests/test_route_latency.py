@@ -0,0 +1,32 @@
+"""
+Route latency benchmark (benchmarks/bench_routes.py) run as a test.
+Skipped unless NICKKNOWS_BENCHMARK is set. Fails if a benchmarked page
+doesn't answer 200, or - with NICKKNOWS_ROUTE_BASELINE pointing at a saved
+report - if a page's p95 regressed by more than 25%.
+
+    NICKKNOWS_BENCHMARK=1 python -m pytest tests/test_route_latency.py
+    NICKKNOWS_BENCHMARK=1 NICKKNOWS_ROUTE_BASELINE=routes.json python -m pytest tests/test_route_latency.py
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.mark.skipif(not os.environ.get('NICKKNOWS_BENCHMARK'),
+                    reason='set NICKKNOWS_BENCHMARK=1 to run the route benchmark')
+def test_route_latency():
+    from benchmarks import bench_routes
+
+    report = bench_routes.run(repeat=10, alloc_repeat=2)
+    bench_routes.print_report(report)
+    assert bench_routes.failures(report) == []
+
+    baseline_path = os.environ.get('NICKKNOWS_ROUTE_BASELINE')
+    if baseline_path:
+        with open(baseline_path) as f:
+            comparison = bench_routes.compare(report, json.load(f), tolerance=0.25)
+        assert [row for row in comparison if row[-1]] == []
@@ -98,6 +98,32 @@ def test_job_parse_get(client):
     assert r.status_code == 200
 
 
+def test_job_parse_post(client):
+    r = client.post('/job_parse', data={'job_desc': 'Python and SQL. Python, C++', 'ngrams': '2'})
+    assert r.status_code == 200
+    assert b'c++' in r.data
+
+
+def test_job_parse_resume(client):
+    r = client.post('/job_parse/resume', data={'job_count': '{"python": 2, "sql": 1}',
+                                               'resume': 'Python developer'})
+    assert r.status_code == 200
+    assert b'sql : 1' in r.data
+    assert b'python :' not in r.data
+
+
+def test_metrics(client):
+    client.get('/job_parse')
+    r = client.get('/metrics')
+    assert r.status_code == 200
+    assert b'nickknows_request_duration_seconds_count{route="/job_parse",method="GET",status="200"}' in r.data
+
+
+def test_metrics_hidden_from_ingress(client):
+    r = client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.7'})
+    assert r.status_code == 404
+
+
 # ---------------------------------------------------------------------------
 # NFL routes
 # ---------------------------------------------------------------------------
@@ -172,6 +198,81 @@ def test_nfl_team_opportunities(client):
     assert r.status_code in (200, 302)
 
 
+def _job_redis(holder=None):
+    """Redis mock for start_job; `holder` is the job already holding the in-flight marker"""
+    redis_client = MagicMock()
+    redis_client.register_script.return_value.return_value = holder
+    return redis_client
+
+
+def test_nfl_snap_counts_api_returns_job(client):
+    redis_client = _job_redis()
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=redis_client), \
+            patch('nickknows.celery_setup.job_status._redis_down_until', 0.0), \
+            patch('nickknows.nfl.views.get_snap_count_summary') as summary:
+        r = client.get('/NFL/SnapCounts/api/KC?positions=QB,WR')
+    assert r.status_code == 202
+    body = r.get_json()
+    assert body['status_url'] == f"/NFL/jobs/{body['job_id']}"
+    # Sent with the job id as its task id, never waited on
+    assert summary.apply_async.call_args.kwargs['task_id'] == body['job_id']
+    assert summary.apply_async.call_args.args[0][2] == ['QB', 'WR']
+    summary.delay.assert_not_called()
+
+
+def test_nfl_snap_counts_api_attaches_to_inflight_job(client):
+    redis_client = _job_redis('in-flight-job')  # the same summary is in flight
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=redis_client), \
+            patch('nickknows.celery_setup.job_status._redis_down_until', 0.0), \
+            patch('nickknows.nfl.views.get_snap_count_summary') as summary:
+        r = client.get('/NFL/SnapCounts/api/KC')
+    assert r.status_code == 202
+    assert r.get_json()['job_id'] == 'in-flight-job'
+    summary.apply_async.assert_not_called()
+
+
+def test_nfl_job_status_unknown(client):
+    redis_client = MagicMock()
+    redis_client.hgetall.return_value = {}
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=redis_client), \
+            patch('nickknows.celery.AsyncResult', return_value=MagicMock(state='PENDING')):
+        r = client.get('/NFL/jobs/not-a-job')
+    assert r.status_code == 404
+    assert r.get_json()['success'] is False
+
+
+def test_nfl_update_page_polls_job(client):
+    redis_client = _job_redis()
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=redis_client), \
+            patch('nickknows.celery_setup.job_status._redis_down_until', 0.0), \
+            patch('nickknows.nfl.views.update_opportunity_data') as task:
+        r = client.get('/NFL/Opportunities/update', follow_redirects=True)
+    job_id = task.apply_async.call_args.kwargs['task_id']
+    # Browsers get the flash message plus a status line polling the job
+    assert f'data-job-status="/NFL/jobs/{job_id}"' in r.get_data(as_text=True)
+
+
+def test_nfl_fpa_update_is_one_job(client):
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=_job_redis()), \
+            patch('nickknows.celery_setup.job_status._redis_down_until', 0.0), \
+            patch('nickknows.nfl.views.update_all_team_fpa') as task:
+        r = client.get('/NFL/FPA/update', headers={'Accept': 'application/json'})
+    assert r.status_code == 202
+    job_id = r.get_json()['job_id']
+    # The launcher gets the job id, so the status covers all 32 team chains
+    assert task.apply_async.call_args.args[1] == {'job_id': job_id}
+    assert task.apply_async.call_args.kwargs['task_id'] == job_id
+
+
+def test_nfl_opportunity_refresh_skips_ingest_queue(client):
+    with patch('nickknows.celery_setup.job_status.get_redis', return_value=_job_redis()), \
+            patch('nickknows.celery_setup.job_status._redis_down_until', 0.0), \
+            patch('nickknows.nfl.views.update_opportunity_data') as task:
+        client.get('/NFL/Opportunities/update')
+    # Routed to ingest for backfills; a user's refresh goes to the single-slot render pool
+    assert task.apply_async.call_args.kwargs['queue'] == 'render'
+
+
 # ---------------------------------------------------------------------------
 # Navbar partials (loaded via jQuery .load())
 # ---------------------------------------------------------------------------
@@ -1,4 +1,6 @@
 from nickknows import app
+from nickknows.main.views import warm_gallery
 
 if __name__ == "__main__":
+    warm_gallery()
     app.run(host='0.0.0.0', port=8000)
\ No newline at end of file
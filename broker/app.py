@@ -6,6 +6,10 @@ the web pod over an HMAC-signed POST. Single-flights refreshes through a
 Redis lock because Hydrow invalidates the entire refresh-token chain on
 reuse — concurrent refreshes would force a re-login every time.
 
+Each worker keeps the current token in memory, checked against a Redis
+version counter, and a background thread renews it ahead of REFRESH_LEEWAY
+so /token requests don't wait on Hydrow.
+
 Logs status codes only. Never logs tokens, the password, signatures, or
 Hydrow response bodies (which can echo identifiers).
 """
@@ -14,13 +18,17 @@ import hmac
 import json
 import logging
 import os
+import threading
 import time
+import uuid
 
 import redis
 import requests
 from flask import Flask, jsonify, request
+from requests.adapters import HTTPAdapter
 
-HYDROW_API_BASE = "https://v2.api.prod.hydrow-external.net"
+# Overridable only so load tests can point at a local stand-in (loadtest.py)
+HYDROW_API_BASE = os.environ.get("HYDROW_API_BASE", "https://v2.api.prod.hydrow-external.net")
 FEATURE_FLAGS = "new-music,preferences-filter,top-left,single-sets"
 BASE_HEADERS = {
     "Content-Type": "application/json",
@@ -39,12 +47,25 @@ REFRESH_LOCK_KEY = "hydrow:refresh_lock"
 REFRESH_TOKEN_KEY = "hydrow:refresh_token"
 ACCESS_TOKEN_KEY = "hydrow:access_token"  # JSON {accessToken, expiresAt, rowerId}
 ROWER_ID_KEY = "hydrow:rower_id"
+# The refresh holder publishes the new access-token payload here ("" on failure)
+TOKEN_CHANNEL = "hydrow:access_token:published"
+# Bumped with every new access token; lets each process trust its in-memory copy
+TOKEN_VERSION_KEY = "hydrow:access_token:version"
 
-REFRESH_LOCK_TTL = 5  # seconds
+REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 3.05
+# Outlives the slowest holder: a failed refresh then a password login, each
+# up to CONNECT_TIMEOUT + REQUEST_TIMEOUT (~26s). A shorter lock could expire
+# while the holder is still talking to Hydrow and let a second refresh start.
+REFRESH_LOCK_TTL = 30  # seconds
 REFRESH_LEEWAY = 5 * 60  # serve a fresh token if at least this long until expiry
 HMAC_SKEW_SECONDS = 60
-WAIT_FOR_LOCK_TIMEOUT = 4.5  # less than REFRESH_LOCK_TTL
-REQUEST_TIMEOUT = 10
+# How long a /token request waits on another worker's refresh before giving up
+WAIT_FOR_LOCK_TIMEOUT = 4.5
+HTTP_POOL_SIZE = 4  # only the refresh-lock holder calls Hydrow, so this stays small
+TOKEN_VERSION_CHECK_INTERVAL = 1.0  # max age of a process's memory check against Redis
+PROACTIVE_REFRESH_AHEAD = 10 * 60  # background refresh starts this long before the leeway
+PROACTIVE_RETRY_DELAY = 15
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -52,6 +73,25 @@ log = app.logger
 
 _redis = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
 
+# Delete the lock only if we still own it
+_release_lock = _redis.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+def _make_session():
+    """Keep-alive session for Hydrow auth calls, so refreshes reuse one TLS
+    connection instead of handshaking every time."""
+    session = requests.Session()
+    session.headers.update(BASE_HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+    session.mount("https://", adapter)
+    return session
+
+
+_http = _make_session()
+
 
 class BrokerError(RuntimeError):
     pass
@@ -117,7 +157,12 @@ def _persist_session(session):
         "rowerId": _redis.get(ROWER_ID_KEY) or rower.get("id"),
     }
     ttl = max(1, expires_at - int(time.time()) - REFRESH_LEEWAY)
-    _redis.set(ACCESS_TOKEN_KEY, json.dumps(public_payload), ex=ttl)
+    # Token and version move together so no reader sees one without the other
+    pipe = _redis.pipeline(transaction=True)
+    pipe.set(ACCESS_TOKEN_KEY, json.dumps(public_payload), ex=ttl)
+    pipe.incr(TOKEN_VERSION_KEY)
+    _, version = pipe.execute()
+    _remember_token(version, public_payload)
     return public_payload
 
 
@@ -125,11 +170,10 @@ def _password_login():
     if not HYDROW_EMAIL or not HYDROW_PASSWORD:
         raise BrokerError("password fallback unavailable: credentials not set")
     try:
-        resp = requests.post(
+        resp = _http.post(
             f"{HYDROW_API_BASE}/rower/auth/login/unpw",
             json={"username": HYDROW_EMAIL, "password": HYDROW_PASSWORD},
-            headers=BASE_HEADERS,
-            timeout=REQUEST_TIMEOUT,
+            timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT),
         )
     except requests.RequestException as exc:
         raise BrokerError(f"login network error: {type(exc).__name__}") from exc
@@ -141,11 +185,10 @@ def _password_login():
 
 def _refresh_with(refresh_token):
     try:
-        resp = requests.post(
+        resp = _http.post(
             f"{HYDROW_API_BASE}/rower/auth/refresh",
             json={"refreshToken": refresh_token},
-            headers=BASE_HEADERS,
-            timeout=REQUEST_TIMEOUT,
+            timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT),
         )
     except requests.RequestException:
         return None
@@ -167,37 +210,147 @@ def _do_refresh_or_login():
     return _password_login()
 
 
+# ── In-process token cache ────────────────────────────────────────────────────
+
+_memo = {"version": None, "payload": None, "checked_at": 0.0}
+_memo_lock = threading.Lock()
+_refresher_wakeup = threading.Event()
+_background_started = False
+_background_start_lock = threading.Lock()
+
+
+def _is_fresh(payload):
+    return bool(payload) and payload.get("expiresAt", 0) - time.time() > REFRESH_LEEWAY
+
+
+def _remember_token(version, payload):
+    with _memo_lock:
+        previous = _memo["version"]
+        if previous is not None and version < previous:
+            return
+        _memo.update(version=version, payload=payload, checked_at=time.monotonic())
+    if version != previous:
+        # Let the background refresher reschedule around the new expiry
+        _refresher_wakeup.set()
+
+
+def _memory_token():
+    """This process's copy of the token, re-validated against the Redis
+    version counter at most once per TOKEN_VERSION_CHECK_INTERVAL."""
+    with _memo_lock:
+        version, payload, checked_at = _memo["version"], _memo["payload"], _memo["checked_at"]
+    if not _is_fresh(payload):
+        return None
+    if time.monotonic() - checked_at < TOKEN_VERSION_CHECK_INTERVAL:
+        return payload
+    current = _redis.get(TOKEN_VERSION_KEY)
+    if current is None or int(current) != version:
+        return None
+    with _memo_lock:
+        if _memo["version"] == version:
+            _memo["checked_at"] = time.monotonic()
+    return payload
+
+
 def _read_cached_access_token():
-    raw = _redis.get(ACCESS_TOKEN_KEY)
+    raw, version = _redis.mget(ACCESS_TOKEN_KEY, TOKEN_VERSION_KEY)
     if not raw:
         return None
     try:
-        return json.loads(raw)
+        payload = json.loads(raw)
     except json.JSONDecodeError:
         return None
+    _remember_token(int(version or 0), payload)
+    return payload
+
+
+# One subscription per process fans token publishes out to every local
+# waiter, so a refresh storm costs one Redis connection, not one per request.
+_token_events = threading.Condition()
+_token_feed = {"generation": 0, "data": None}
+_listener_ready = threading.Event()
+
+
+def _token_listener():
+    while True:
+        pubsub = _redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(TOKEN_CHANNEL)
+            _listener_ready.set()
+            for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                with _token_events:
+                    _token_feed["generation"] += 1
+                    _token_feed["data"] = message["data"]
+                    _token_events.notify_all()
+        except redis.RedisError as exc:
+            log.warning("token listener disconnected: %s", type(exc).__name__)
+            time.sleep(1)
+        finally:
+            _listener_ready.clear()
+            pubsub.close()
 
 
 def _wait_for_holder(deadline):
-    """Another worker is refreshing. Poll for the new access token to land."""
-    while time.time() < deadline:
-        time.sleep(0.1)
-        cached = _read_cached_access_token()
-        if cached:
-            return cached
-    return None
+    """Another worker is refreshing. Wait on the process's token listener
+    until the holder publishes the new access token (or reports that it
+    failed). Under gevent this parks the greenlet, not the worker."""
+    _ensure_background()
+    if not _listener_ready.wait(timeout=max(0, deadline - time.time())):
+        return None
+    with _token_events:
+        generation = _token_feed["generation"]
+    # Generation noted before re-checking, so a publish can't slip between the two.
+    cached = _read_cached_access_token()
+    if cached:
+        return cached
+    with _token_events:
+        while _token_feed["generation"] == generation:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            _token_events.wait(timeout=remaining)
+        data = _token_feed["data"]
+    if not data:
+        raise BrokerError("in-flight refresh failed")
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        return None
+
+
+def _publish_token(payload):
+    try:
+        _redis.publish(TOKEN_CHANNEL, json.dumps(payload) if payload else "")
+    except redis.RedisError:
+        # Waiters still fall back to their deadline
+        log.warning("token publish failed")
+
+
+def _refresh_as_holder():
+    """Refresh (or log in) while holding the refresh lock, then wake every
+    waiter with the result."""
+    payload = None
+    try:
+        payload = _do_refresh_or_login()
+        return payload
+    finally:
+        _publish_token(payload)
 
 
 def get_access_token():
     """Single-flight token retrieval. Concurrent callers funnel through one
     refresh; everyone else waits for the result rather than refreshing in
     parallel (which would trigger Hydrow's reuse-detection)."""
-    cached = _read_cached_access_token()
+    _ensure_background()
+    cached = _memory_token() or _read_cached_access_token()
     if cached:
         return cached
 
     # Acquire the refresh lock. If we get it, do the refresh; otherwise wait.
-    acquired = _redis.set(REFRESH_LOCK_KEY, "1", nx=True, ex=REFRESH_LOCK_TTL)
-    if not acquired:
+    token = uuid.uuid4().hex
+    if not _redis.set(REFRESH_LOCK_KEY, token, nx=True, ex=REFRESH_LOCK_TTL):
         result = _wait_for_holder(time.time() + WAIT_FOR_LOCK_TIMEOUT)
         if result:
             return result
@@ -207,9 +360,68 @@ def get_access_token():
         cached = _read_cached_access_token()
         if cached:
             return cached
-        return _do_refresh_or_login()
+        return _refresh_as_holder()
+    finally:
+        _release_lock(keys=[REFRESH_LOCK_KEY], args=[token])
+
+
+# ── Proactive refresh ──────────────────────────────────────────────────────────
+
+def _refresh_due_in(payload):
+    return payload["expiresAt"] - REFRESH_LEEWAY - PROACTIVE_REFRESH_AHEAD - time.time()
+
+
+def _refresh_ahead():
+    """Renew the token before it reaches REFRESH_LEEWAY, so requests never
+    land on the synchronous refresh path. Returns False if another worker
+    holds the refresh lock."""
+    token = uuid.uuid4().hex
+    if not _redis.set(REFRESH_LOCK_KEY, token, nx=True, ex=REFRESH_LOCK_TTL):
+        return False
+    try:
+        # Another process may have renewed since we last looked.
+        cached = _read_cached_access_token()
+        if cached and _refresh_due_in(cached) <= 0:
+            _refresh_as_holder()
+        return True
     finally:
-        _redis.delete(REFRESH_LOCK_KEY)
+        _release_lock(keys=[REFRESH_LOCK_KEY], args=[token])
+
+
+def _proactive_refresher():
+    """Only renews an existing token; the first login still happens on
+    demand so a misconfigured broker doesn't hammer the login endpoint."""
+    while True:
+        delay = PROACTIVE_RETRY_DELAY
+        try:
+            cached = _read_cached_access_token()
+            if cached:
+                delay = _refresh_due_in(cached)
+                if delay <= 0:
+                    _refresh_ahead()
+                    # Check back shortly either way: the renewed token (ours or
+                    # another worker's) sets the next deadline.
+                    _refresher_wakeup.clear()
+                    delay = PROACTIVE_RETRY_DELAY
+        except (BrokerError, redis.RedisError) as exc:
+            log.warning("proactive refresh failed: %s", exc)
+            delay = PROACTIVE_RETRY_DELAY
+        _refresher_wakeup.wait(timeout=delay)
+        _refresher_wakeup.clear()
+
+
+def _ensure_background():
+    """Start the token listener and the proactive refresher once per process.
+    Started lazily so they run in each gunicorn worker, not in the pre-fork
+    master. Under the gevent worker class these threads are greenlets."""
+    global _background_started
+    if _background_started:
+        return
+    with _background_start_lock:
+        if not _background_started:
+            threading.Thread(target=_token_listener, name="token-listener", daemon=True).start()
+            threading.Thread(target=_proactive_refresher, name="token-refresher", daemon=True).start()
+            _background_started = True
 
 
 # ── HTTP routes ────────────────────────────────────────────────────────────────
@@ -0,0 +1,18 @@
+"""
+Gunicorn settings for the broker.
+
+The default gevent worker class lets one worker hold hundreds of /token
+requests open while a single refresh is in flight: waiters park on the
+token listener instead of tying up a worker. Set BROKER_WORKER_CLASS=sync
+to fall back to plain sync workers.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('BROKER_PORT', '8080')}"
+workers = int(os.environ.get("BROKER_WORKERS", "2"))
+worker_class = os.environ.get("BROKER_WORKER_CLASS", "gevent")
+# Concurrent requests per gevent worker
+worker_connections = int(os.environ.get("BROKER_WORKER_CONNECTIONS", "500"))
+# Long enough for a slow upstream login (REQUEST_TIMEOUT) plus the lock wait
+timeout = 30
+accesslog = "-"
@@ -0,0 +1,185 @@
+"""
+Refresh-storm load test for the Hydrow broker.
+
+Fires signed POST /token requests from many concurrent clients while
+repeatedly invalidating the cached access token, so every burst lands on
+the single-flight refresh path at once. Reports throughput and latency
+percentiles, overall and for requests made while a refresh was in flight.
+
+Run against a local broker whose upstream is the stand-in below, never the
+real Hydrow API:
+
+    python loadtest.py fake-hydrow --port 9000 --delay 2
+    HYDROW_API_BASE=http://localhost:9000 HYDROW_BROKER_HMAC_SECRET=s \\
+        HYDROW_EMAIL=x HYDROW_PASSWORD=y REDIS_ENV=localhost \\
+        gunicorn -c gunicorn.conf.py app:app
+    python loadtest.py storm --url http://localhost:8080 --secret s \\
+        --redis-host localhost --concurrency 200 --duration 20
+
+Compare BROKER_WORKER_CLASS=sync against the default gevent class.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import redis
+import requests
+
+ACCESS_TOKEN_KEY = "hydrow:access_token"
+TOKEN_VERSION_KEY = "hydrow:access_token:version"
+
+
+# ── Stand-in Hydrow auth API ───────────────────────────────────────────────────
+
+def run_fake_hydrow(port, delay, token_lifetime):
+    """Answers login and refresh after `delay` seconds, like a slow upstream."""
+    counter = {"issued": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(delay)
+            with lock:
+                counter["issued"] += 1
+                n = counter["issued"]
+            body = json.dumps({
+                "accessToken": f"fake-access-{n}",
+                "refreshToken": f"fake-refresh-{n}",
+                "expiresAt": int(time.time()) + token_lifetime,
+                "rower": {"id": "fake-rower"},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            print(f"issued token #{n} for {self.path}", flush=True)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    print(f"fake Hydrow auth API on :{port} (delay {delay}s)", flush=True)
+    server.serve_forever()
+
+
+# ── Storm ──────────────────────────────────────────────────────────────────────
+
+def _signed_headers(secret):
+    timestamp = str(int(time.time()))
+    signature = hmac.new(secret.encode(), f"{timestamp}\n".encode(), hashlib.sha256).hexdigest()
+    return {
+        "Content-Type": "application/json",
+        "X-Broker-Timestamp": timestamp,
+        "X-Broker-Signature": signature,
+    }
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summarize(label, samples, elapsed):
+    latencies = [ms for ms, ok, _ in samples if ok]
+    errors = sum(1 for _, ok, _ in samples if not ok)
+    return {
+        "label": label,
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+
+
+def run_storm(url, secret, concurrency, duration, redis_host, invalidate_every, storm_window):
+    r = redis.Redis(host=redis_host, port=6379, decode_responses=True)
+    samples = []  # (latency_ms, ok, during_storm)
+    samples_lock = threading.Lock()
+    storm = {"until": 0.0}
+    stop_at = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < stop_at:
+            started = time.perf_counter()
+            in_storm = time.time() < storm["until"]
+            try:
+                resp = session.post(f"{url}/token", headers=_signed_headers(secret), data="", timeout=15)
+                ok = resp.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with samples_lock:
+                samples.append((elapsed_ms, ok, in_storm))
+
+    def invalidator():
+        while time.time() < stop_at:
+            # Drop the token and bump the version: every worker's memory copy
+            # goes stale and the next burst contends for one refresh.
+            pipe = r.pipeline(transaction=True)
+            pipe.delete(ACCESS_TOKEN_KEY)
+            pipe.incr(TOKEN_VERSION_KEY)
+            pipe.execute()
+            storm["until"] = time.time() + storm_window
+            time.sleep(invalidate_every)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    threads.append(threading.Thread(target=invalidator, daemon=True))
+    began = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - began
+
+    report = {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 1),
+        "overall": _summarize("overall", samples, elapsed),
+        "during_refresh": _summarize("during_refresh", [s for s in samples if s[2]], elapsed),
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fake = sub.add_parser("fake-hydrow", help="run a slow stand-in for the Hydrow auth API")
+    fake.add_argument("--port", type=int, default=9000)
+    fake.add_argument("--delay", type=float, default=2.0, help="seconds per login/refresh")
+    fake.add_argument("--token-lifetime", type=int, default=3600)
+
+    storm = sub.add_parser("storm", help="hammer /token while forcing refreshes")
+    storm.add_argument("--url", default="http://localhost:8080")
+    storm.add_argument("--secret", required=True, help="HYDROW_BROKER_HMAC_SECRET of the broker")
+    storm.add_argument("--redis-host", default="localhost")
+    storm.add_argument("--concurrency", type=int, default=100)
+    storm.add_argument("--duration", type=float, default=20.0)
+    storm.add_argument("--invalidate-every", type=float, default=5.0)
+    storm.add_argument("--storm-window", type=float, default=3.0,
+                       help="seconds after an invalidation counted as 'during refresh'")
+
+    args = parser.parse_args()
+    if args.command == "fake-hydrow":
+        run_fake_hydrow(args.port, args.delay, args.token_lifetime)
+    else:
+        run_storm(args.url, args.secret, args.concurrency, args.duration,
+                  args.redis_host, args.invalidate_every, args.storm_window)
+
+
+if __name__ == "__main__":
+    main()